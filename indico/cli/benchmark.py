@@ -0,0 +1,345 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import json
+import platform
+import random
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+import click
+from flask import current_app
+from pytz import utc
+from sqlalchemy.orm import subqueryload
+from terminaltables import AsciiTable
+
+import indico
+from indico.cli.core import cli_group
+from indico.core.config import config
+from indico.core.db import db
+from indico.modules.categories import Category
+from indico.modules.events import Event
+from indico.modules.events.contributions.models.contributions import Contribution
+from indico.modules.events.models.events import EventType
+from indico.modules.events.registration.models.forms import RegistrationForm
+from indico.modules.events.registration.models.items import PersonalDataType
+from indico.modules.events.registration.models.registrations import Registration, RegistrationData, RegistrationState
+from indico.modules.events.registration.util import create_personal_data_fields
+from indico.modules.events.timetable.models.entries import TimetableEntry, TimetableEntryType
+from indico.modules.rb.models.locations import Location
+from indico.modules.rb.models.reservations import RepeatFrequency, Reservation
+from indico.modules.rb.models.rooms import Room
+from indico.modules.users import User
+from indico.util.benchmark import BenchmarkSuite, compare_benchmark_results
+from indico.util.date_time import now_utc
+
+
+BENCHMARK_CATEGORY_TITLE = 'Benchmark data'
+BENCHMARK_LOCATION_NAME = 'Benchmark'
+WORDS = ('physics', 'computing', 'workshop', 'detector', 'seminar', 'meeting', 'conference', 'analysis',
+         'software', 'collaboration', 'accelerator', 'neutrino', 'summer', 'students', 'review')
+
+suite = BenchmarkSuite()
+
+
+@cli_group()
+def cli():
+    pass
+
+
+def _get_benchmark_category():
+    return Category.query.filter_by(title=BENCHMARK_CATEGORY_TITLE, is_deleted=False,
+                                    parent=Category.get_root()).first()
+
+
+def _get_benchmark_location():
+    return Location.query.filter_by(name=BENCHMARK_LOCATION_NAME, is_deleted=False).first()
+
+
+def _get_benchmark_events_query(category):
+    return Event.query.filter(Event.category_id.in_(c.id for c in category.children), ~Event.is_deleted)
+
+
+def _make_title(rng, suffix):
+    return f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} {rng.choice(WORDS)} #{suffix}'
+
+
+def _generate_events(rng, categories, num_events, num_contributions, creator):
+    today = date.today()
+    events = []
+    for i in range(num_events):
+        start_dt = utc.localize(datetime.combine(today + timedelta(days=rng.randint(-180, 180)), time(8)))
+        event = Event(category=categories[i % len(categories)], title=_make_title(rng, i), type_=EventType.conference,
+                      start_dt=start_dt, end_dt=start_dt + timedelta(days=rng.randint(0, 2), hours=10),
+                      timezone='UTC', creator=creator)
+        for n in range(num_contributions):
+            contrib = Contribution(event=event, title=_make_title(rng, n), duration=timedelta(minutes=20))
+            TimetableEntry(event=event, object=contrib, type=TimetableEntryType.CONTRIBUTION,
+                           start_dt=event.start_dt + timedelta(minutes=20 * (n % 30)))
+        events.append(event)
+    db.session.flush()
+    return events
+
+
+def _generate_registrations(rng, events, num_registrations):
+    regform_events = events[:max(1, len(events) // 10)]
+    for i, event in enumerate(regform_events):
+        regform = RegistrationForm(event=event, title='Registration', currency='EUR')
+        create_personal_data_fields(regform)
+        fields = {f.personal_data_type: f for f in regform.sections[0].fields}
+        for n in range(i, num_registrations, len(regform_events)):
+            first_name = rng.choice(('Alice', 'Bob', 'Carol', 'Dave', 'Eve', 'Mallory', 'Trent', 'Peggy'))
+            last_name = rng.choice(WORDS).title()
+            email = f'{first_name.lower()}.{n}@example.test'
+            values = {PersonalDataType.first_name: first_name, PersonalDataType.last_name: last_name,
+                      PersonalDataType.email: email, PersonalDataType.affiliation: 'Benchmark Institute'}
+            Registration(registration_form=regform, event=event, first_name=first_name, last_name=last_name,
+                         email=email, state=RegistrationState.complete, currency='EUR',
+                         data=[RegistrationData(field_data=fields[type_].current_data, data=value)
+                               for type_, value in values.items()])
+    db.session.flush()
+
+
+def _generate_bookings(rng, num_rooms, num_bookings, user):
+    location = Location(name=BENCHMARK_LOCATION_NAME)
+    rooms = [Room(location=location, building=str(100 + i // 10), floor=str(i % 10), number=f'{i:03d}',
+                  owner=user, capacity=rng.randint(5, 200))
+             for i in range(num_rooms)]
+    db.session.flush()
+    first_day = date.today() - timedelta(days=num_bookings // num_rooms // 8)
+    for i in range(num_bookings):
+        # four 2-hour slots per room and day ensure that there are no conflicts
+        slot = i // num_rooms
+        start_dt = datetime.combine(first_day + timedelta(days=slot // 4), time(8 + 2 * (slot % 4)))
+        reservation = Reservation(room=rooms[i % num_rooms], start_dt=start_dt, end_dt=start_dt + timedelta(hours=2),
+                                  repeat_frequency=RepeatFrequency.NEVER, repeat_interval=0,
+                                  booking_reason='Benchmark', booked_for_user=user, created_by_user=user)
+        reservation.create_occurrences(skip_conflicts=True)
+
+
+@cli.command()
+@click.option('--categories', 'num_categories', type=click.IntRange(1), default=20, show_default=True,
+              help='Number of categories')
+@click.option('--events', 'num_events', type=click.IntRange(1), default=500, show_default=True,
+              help='Number of events')
+@click.option('--contributions', 'num_contributions', type=click.IntRange(0), default=20, show_default=True,
+              help='Number of contributions per event')
+@click.option('--registrations', 'num_registrations', type=click.IntRange(0), default=2000, show_default=True,
+              help='Number of registrations (spread over 10% of the events)')
+@click.option('--rooms', 'num_rooms', type=click.IntRange(1), default=50, show_default=True, help='Number of rooms')
+@click.option('--bookings', 'num_bookings', type=click.IntRange(0), default=2000, show_default=True,
+              help='Number of bookings')
+@click.option('--seed', type=int, default=0, show_default=True, help='Seed for the random data')
+def generate(num_categories, num_events, num_contributions, num_registrations, num_rooms, num_bookings, seed):
+    """Generate a dataset for the benchmarks.
+
+    The data is created in a new top-level category and room booking
+    location.  Only use this on a development instance!
+    """
+    if _get_benchmark_category() or _get_benchmark_location():
+        click.secho(f'The benchmark data already exists. Delete the "{BENCHMARK_CATEGORY_TITLE}" category and '
+                    f'the "{BENCHMARK_LOCATION_NAME}" location if you want to generate it again.', fg='yellow')
+        sys.exit(1)
+    click.confirm(f'This will add lots of data to {config.BASE_URL}. Do you want to continue?', abort=True)
+    rng = random.Random(seed)
+    system_user = User.get_system_user()
+    category = Category(parent=Category.get_root(), title=BENCHMARK_CATEGORY_TITLE)
+    categories = [Category(parent=category, title=f'Category {i}') for i in range(num_categories)]
+    db.session.flush()
+    click.echo('Generating events')
+    events = _generate_events(rng, categories, num_events, num_contributions, system_user)
+    click.echo('Generating registrations')
+    _generate_registrations(rng, events, num_registrations)
+    click.echo('Generating bookings')
+    _generate_bookings(rng, num_rooms, num_bookings, system_user)
+    db.session.commit()
+    click.secho('Benchmark data generated', fg='green')
+
+
+def _get_dataset_info():
+    category = _get_benchmark_category()
+    location = _get_benchmark_location()
+    if not category or not location:
+        return None
+    events_query = _get_benchmark_events_query(category)
+    event_ids = events_query.with_entities(Event.id)
+    return {
+        'categories': len(category.children),
+        'events': events_query.count(),
+        'contributions': Contribution.query.filter(Contribution.event_id.in_(event_ids)).count(),
+        'registrations': (Registration.query
+                          .filter(Registration.event_id.in_(event_ids), Registration.is_active)
+                          .count()),
+        'rooms': len(location.rooms),
+        'bookings': Reservation.query.join(Room).filter(Room.location == location).count(),
+    }
+
+
+def _get_largest_regform_id(category):
+    return (db.session.query(RegistrationForm.id)
+            .join(Registration, Registration.registration_form_id == RegistrationForm.id)
+            .filter(RegistrationForm.event_id.in_(_get_benchmark_events_query(category).with_entities(Event.id)))
+            .group_by(RegistrationForm.id)
+            .order_by(db.func.count(Registration.id).desc(), RegistrationForm.id)
+            .limit(1)
+            .scalar())
+
+
+@suite.add('category_listing')
+def _bench_category_listing():
+    from indico.modules.categories.controllers.util import get_category_view_params
+    category_id = _get_benchmark_category().children[0].id
+    return lambda: get_category_view_params(Category.get(category_id), now_utc())
+
+
+@suite.add('search')
+def _bench_search():
+    from indico.modules.search.base import SearchTarget
+    from indico.modules.search.internal import InternalSearch
+    from indico.modules.search.result_schemas import ResultSchema
+    category_id = _get_benchmark_category().id
+
+    def _search():
+        for object_types in ([SearchTarget.event], [SearchTarget.contribution, SearchTarget.subcontribution]):
+            result = InternalSearch().search('physics', None, 1, object_types, category_id=category_id)
+            ResultSchema().dump(result)
+
+    return _search
+
+
+@suite.add('room_availability')
+def _bench_room_availability():
+    from indico.modules.rb.operations.bookings import get_rooms_availability
+    location_id = _get_benchmark_location().id
+    start_dt = datetime.combine(date.today(), time(8))
+
+    def _get_availability():
+        rooms = Room.query.filter_by(location_id=location_id, is_deleted=False).all()
+        get_rooms_availability(rooms, start_dt, start_dt + timedelta(days=6, hours=2), RepeatFrequency.DAY, 1, None)
+
+    return _get_availability
+
+
+@suite.add('timetable_serialization')
+def _bench_timetable_serialization():
+    from indico.modules.events.timetable.legacy import TimetableSerializer
+    event_id = _get_benchmark_events_query(_get_benchmark_category()).order_by(Event.id).first().id
+    return lambda: TimetableSerializer(Event.get(event_id)).serialize_timetable()
+
+
+@suite.add('registration_export')
+def _bench_registration_export():
+    from indico.modules.events.registration.util import generate_spreadsheet_from_registrations
+    from indico.util.spreadsheets import generate_csv
+    regform_id = _get_largest_regform_id(_get_benchmark_category())
+
+    def _export():
+        regform = RegistrationForm.get(regform_id)
+        registrations = (Registration.query.with_parent(regform)
+                         .filter(Registration.is_active)
+                         .order_by(*Registration.order_by_name)
+                         .options(subqueryload('data'))
+                         .all())
+        headers, rows = generate_spreadsheet_from_registrations(registrations, regform.active_fields,
+                                                                ['reg_date', 'state', 'price'])
+        generate_csv(headers, rows)
+
+    return _export
+
+
+@suite.add('ical_export')
+def _bench_ical_export():
+    from indico.modules.events.ical import events_to_ical
+    category_id = _get_benchmark_category().id
+    return lambda: events_to_ical(_get_benchmark_events_query(Category.get(category_id)).all())
+
+
+@suite.add('badge_generation')
+def _bench_badge_generation():
+    from indico.modules.events.registration.badges import RegistrantsListToBadgesPDF
+    from indico.modules.events.registration.controllers.management.tickets import DEFAULT_TICKET_PRINTING_SETTINGS
+    regform_id = _get_largest_regform_id(_get_benchmark_category())
+
+    def _generate_badges():
+        regform = RegistrationForm.get(regform_id)
+        registrations = (Registration.query.with_parent(regform)
+                         .filter(Registration.is_active)
+                         .order_by(*Registration.order_by_name)
+                         .options(subqueryload('data').joinedload('field_data'))
+                         .all())
+        pdf = RegistrantsListToBadgesPDF(regform.get_ticket_template(), DEFAULT_TICKET_PRINTING_SETTINGS,
+                                         regform.event, registrations, False)
+        pdf.get_pdf()
+
+    return _generate_badges
+
+
+@contextmanager
+def _benchmark_context():
+    # each run behaves like a separate request, i.e. it cannot rely on data
+    # loaded or cached during previous runs
+    db.session.expire_all()
+    with current_app.test_request_context(base_url=config.BASE_URL):
+        yield
+    db.session.rollback()
+
+
+def _format_ms(seconds):
+    return f'{seconds * 1000:.1f}ms'
+
+
+@cli.command()
+@click.option('-b', '--benchmark', 'names', multiple=True, type=click.Choice(list(suite.benchmarks)),
+              help='Only run the specified benchmark (can be used multiple times)')
+@click.option('-r', '--repeat', type=click.IntRange(1), default=5, show_default=True,
+              help='How often to run each benchmark')
+@click.option('-o', '--output', type=click.File('w'), help='Write the results as JSON to this file')
+@click.option('-c', '--compare', type=click.File(), help='Compare the results with those in this JSON file')
+@click.option('-t', '--threshold', type=float, default=0.1, show_default=True,
+              help='The relative slowdown considered a regression when comparing results')
+def run(names, repeat, output, compare, threshold):
+    """Run the benchmarks.
+
+    The benchmarks use the dataset created by `indico benchmark generate`.
+    """
+    dataset = _get_dataset_info()
+    if dataset is None:
+        click.secho('No benchmark data found; use `indico benchmark generate` to create it.', fg='yellow')
+        sys.exit(1)
+    reference = json.load(compare) if compare else None
+    if reference and reference['dataset'] != dataset:
+        click.secho('The results were created with a different dataset and may not be comparable', fg='yellow')
+
+    def _callback(name, result):
+        click.echo(f'{name}: {_format_ms(result["median"])} (±{_format_ms(result["stdev"])}), '
+                   f'{result["queries"]} queries')
+
+    results = suite.run(names, repeat=repeat, context=_benchmark_context, callback=_callback)
+    data = {
+        'indico_version': indico.__version__,
+        'python_version': platform.python_version(),
+        'timestamp': now_utc().isoformat(),
+        'repeat': repeat,
+        'dataset': dataset,
+        'results': results,
+    }
+    if output:
+        json.dump(data, output, indent=2, sort_keys=True)
+        output.write('\n')
+    if not reference:
+        return
+    table_data = [['Benchmark', 'Before', 'After', 'Change', 'Queries']]
+    comparison = compare_benchmark_results(reference['results'], results, threshold)
+    for row in comparison:
+        color = 'red' if row['regression'] else ('green' if row['change'] < -threshold else None)
+        table_data.append([row['name'], _format_ms(row['old_median']), _format_ms(row['new_median']),
+                           click.style(f'{row["change"]:+.1%}', fg=color),
+                           f'{row["old_queries"]} → {row["new_queries"]}'])
+    click.echo(AsciiTable(table_data).table)
+    if any(row['regression'] for row in comparison):
+        sys.exit(1)
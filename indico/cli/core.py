@@ -83,6 +83,11 @@ def maint():
     """Perform maintenance operations."""
 
 
+@cli.group(cls=LazyGroup, import_name='indico.cli.benchmark:cli')
+def benchmark():
+    """Run performance benchmarks."""
+
+
 @cli.command(context_settings={'ignore_unknown_options': True, 'allow_extra_args': True}, add_help_option=False)
 @click.option('--watchfiles', is_flag=True, help='Run celery inside watchfiles auto-reloader')
 @click.pass_context
@@ -129,6 +134,19 @@ def cleanup(temp, cache, verbose, dry_run, min_age):
     cleanup_cmd(temp, cache, min_age=min_age, dry_run=dry_run, verbose=(verbose or dry_run))
 
 
+@cli.command(short_help='Precompile the JS translation and config bundles.')
+@click.option('--verbose', '-v', is_flag=True, help='Show the generated bundles')
+def build_js_bundles(verbose):
+    """Precompile the JS translation and config bundles.
+
+    Run this whenever you install or update Indico or a plugin, or change
+    the config, so the bundles do not need to be generated on the first
+    requests hitting the server.
+    """
+    from indico.web.assets.bundles import build_js_bundles_cmd
+    build_js_bundles_cmd(verbose)
+
+
 @cli.command(with_appcontext=False)
 @click.option('--host', '-h', default='127.0.0.1', metavar='HOST', help='The ip/host to bind to.')
 @click.option('--port', '-p', default=None, type=int, metavar='PORT', help='The port to bind to.')
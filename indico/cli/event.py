@@ -124,20 +124,29 @@ def export(id, target_file, is_category, keep_uuids, use_pickle, dummy_files, ex
                    'but write the mapping to the indicated Pickle file to be processed afterwards. This is '
                    'an unsupported feature for very advanced use-cases; you almost certainly do not need '
                    'to use it.')
+@click.option('-C', '--checkpoint', 'checkpoint_path', type=click.Path(dir_okay=False, path_type=Path),
+              help='Commit the imported data after each data file of the archive and keep track of the progress '
+                   'in this file. If the import is interrupted, running the same command again resumes it. '
+                   'Implies --yes.')
 def import_(source_file, create_users, create_affiliations, force, verbose, yes, category_id,
-            id_map_path: Path | None = None, files_map_path: Path | None = None):
+            id_map_path: Path | None = None, files_map_path: Path | None = None,
+            checkpoint_path: Path | None = None):
     """Import an event exported from another Indico instance."""
     click.echo('Importing event/category...')
     obj, id_map, files_map = import_event(source_file, category_id, create_users=create_users,
                                           create_affiliations=create_affiliations, verbose=verbose, force=force,
-                                          skip_external_files=(files_map_path is not None))
+                                          skip_external_files=(files_map_path is not None),
+                                          checkpoint_file=checkpoint_path)
     if obj is None:
         click.secho('Import failed.', fg='red')
         sys.exit(1)
-    if not yes and not click.confirm(click.style('Import finished. Commit the changes?', fg='green'), default=True):
+    if (not yes and not checkpoint_path and
+            not click.confirm(click.style('Import finished. Commit the changes?', fg='green'), default=True)):
         db.session.rollback()
         sys.exit(1)
     db.session.commit()
+    if checkpoint_path:
+        checkpoint_path.unlink()
     click.secho(obj.external_url, fg='green', bold=True)
     if id_map_path:
         id_map_path.write_text(yaml.dump(id_map, indent=2))
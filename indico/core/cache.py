@@ -5,6 +5,7 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import functools
 from datetime import timedelta
 
 from cachelib.serializers import RedisSerializer
@@ -88,7 +89,7 @@ class ScopedCache:
     def add(self, key, value, timeout=None):
         if isinstance(timeout, timedelta):
             timeout = int(timeout.total_seconds())
-        self.cache.add(self._scoped(key), value, timeout=timeout)
+        return self.cache.add(self._scoped(key), value, timeout=timeout)
 
     def delete(self, key):
         self.cache.delete(self._scoped(key))
@@ -152,11 +153,12 @@ class IndicoCache(Cache):
         if isinstance(timeout, timedelta):
             timeout = int(timeout.total_seconds())
         try:
-            super().add(key, value, timeout=timeout)
+            return super().add(key, value, timeout=timeout)
         except RedisError:
             if config.DEBUG:
                 raise
             _logger.exception('add(%r) failed', key)
+            return False
 
     def delete(self, key):
         try:
@@ -213,6 +215,17 @@ class IndicoCache(Cache):
             return dict.fromkeys(keys, default)
 
 
+@functools.cache
+def get_redis_client():
+    """Get a client for the cache redis.
+
+    This is meant for code which needs to use redis data structures
+    directly instead of just caching values.  Unlike the cache, errors
+    are not silenced, so the caller needs to handle `RedisError`.
+    """
+    return redis_from_url(config.REDIS_CACHE_URL, socket_timeout=1)
+
+
 def make_scoped_cache(scope):
     """Create a new scoped cache.
 
@@ -76,6 +76,9 @@ DEFAULTS = {
     'NO_REPLY_EMAIL': None,
     'PLUGINS': set(),
     'PROFILE': False,
+    'PROFILE_LOG_FILE': None,
+    'PROFILE_METRICS_TOKEN': None,
+    'PROFILE_SAMPLE_RATE': 0,
     'PROVIDER_MAP': {},
     'PUBLIC_SUPPORT_EMAIL': None,
     'REDIS_CACHE_URL': None,
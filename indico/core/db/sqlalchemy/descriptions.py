@@ -99,6 +99,18 @@ class DescriptionMixin(RenderModeMixin):
     description = RenderModeMixin.create_hybrid_property('_description')
 
 
+def render_descriptions(objs):
+    """Render the markdown descriptions of many objects at once.
+
+    This is meant to be used for lists showing the descriptions of
+    many objects; afterwards their descriptions are displayed using
+    the cached HTML instead of rendering each of them separately.
+
+    :param objs: Objects using :class:`DescriptionMixin`
+    """
+    MarkdownText.render_many(desc for obj in objs if isinstance(desc := obj.description, MarkdownText))
+
+
 class SearchableDescriptionMixin(DescriptionMixin):
     @strict_classproperty
     @classmethod
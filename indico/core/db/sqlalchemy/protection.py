@@ -6,15 +6,20 @@
 # LICENSE file for more details.
 
 import itertools
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import cached_property, wraps
 
-from flask import has_request_context, session
+from flask import g, has_app_context, has_request_context, session
 from sqlalchemy import inspect
 from sqlalchemy.event import listens_for
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.orm.base import NEVER_SET, NO_VALUE
 
 from indico.core import signals
+from indico.core.config import config
 from indico.core.db import db
 from indico.core.db.sqlalchemy import PyIntEnum
 from indico.core.db.sqlalchemy.principals import EmailPrincipal, PrincipalType
@@ -23,10 +28,196 @@ from indico.util.caching import memoize_request
 from indico.util.enum import RichIntEnum
 from indico.util.i18n import _, orig_string
 from indico.util.signals import values_from_signal
-from indico.util.user import iter_acl
 from indico.web.util import jsonify_template
 
 
+def _memoize_access_check(f):
+    """Memoize an access check during the request or a bulk access check.
+
+    Outside :func:`filter_accessible` this behaves like
+    :func:`.memoize_request`.  During a bulk check, decisions are cached
+    in a plain dict (even outside a request), so objects sharing the same
+    protection parents only need to check the parents once.
+    """
+    memoized = memoize_request(f)
+
+    @wraps(f)
+    def wrapper(self, user, *args, **kwargs):
+        cache = g.get('access_check_cache') if has_app_context() else None
+        if cache is None:
+            return memoized(self, user, *args, **kwargs)
+        key = (f.__name__, self, user, args, frozenset(kwargs.items()))
+        try:
+            return cache[key]
+        except KeyError:
+            rv = cache[key] = f(self, user, *args, **kwargs)
+            return rv
+
+    return wrapper
+
+
+class UserPrincipals:
+    """The principals a user is a member of.
+
+    This is used to check ACL entries against a user without having
+    to load the principal of each entry and without running queries
+    for each local group or registration form found in an ACL.  Only
+    multipass groups and IP networks still need to be checked through
+    the principal itself; these results are cached as well.
+
+    Use :func:`get_user_principals` to get an instance which is shared
+    by all access checks during the current request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._checked = {}
+
+    @cached_property
+    def emails(self):
+        return set(self.user.all_emails) if self.user else set()
+
+    @cached_property
+    def local_groups(self):
+        return self.user.local_groups if self.user and config.LOCAL_GROUPS else set()
+
+    @cached_property
+    def event_roles(self):
+        return self.user.event_roles if self.user else set()
+
+    @cached_property
+    def category_roles(self):
+        return self.user.category_roles if self.user else set()
+
+    @cached_property
+    def registration_form_ids(self):
+        from indico.modules.events.registration.models.registrations import RegistrationState
+        if not self.user:
+            return set()
+        Registration = db.m.Registration  # noqa: N806
+        RegistrationForm = db.m.RegistrationForm  # noqa: N806
+        query = (db.session.query(Registration.registration_form_id)
+                 .join(Registration.registration_form)
+                 .filter(Registration.user == self.user,
+                         Registration.state.in_([RegistrationState.unpaid, RegistrationState.complete]),
+                         ~Registration.is_deleted,
+                         ~RegistrationForm.is_deleted))
+        return {regform_id for regform_id, in query}
+
+    def __contains__(self, entry):
+        """Check whether the user matches the principal of an ACL entry."""
+        if entry.type == PrincipalType.user:
+            return self.user is not None and entry.user == self.user
+        elif entry.type == PrincipalType.email:
+            return entry.email in self.emails
+        elif entry.type == PrincipalType.local_group:
+            return entry.local_group in self.local_groups
+        elif entry.type == PrincipalType.event_role:
+            return entry.event_role in self.event_roles
+        elif entry.type == PrincipalType.category_role:
+            return entry.category_role in self.category_roles
+        elif entry.type == PrincipalType.registration_form:
+            # the id is only set once a new entry has been flushed
+            regform_id = entry.registration_form_id
+            if regform_id is None:
+                regform_id = entry.registration_form.id
+            return regform_id in self.registration_form_ids
+        principal = entry.principal
+        try:
+            return self._checked[principal]
+        except KeyError:
+            rv = self._checked[principal] = self.user in principal
+            return rv
+
+    def contains_any(self, entries):
+        """Check whether the user matches any of the given ACL entries.
+
+        Multipass groups are checked last since checking them may
+        require a call to an external service.
+        """
+        entries = sorted(entries, key=lambda x: x.type == PrincipalType.multipass_group)
+        return any(entry in self for entry in entries)
+
+
+@memoize_request
+def get_user_principals(user):
+    """Get the :class:`UserPrincipals` of a user.
+
+    :param user: A :class:`.User` or ``None`` for anonymous users
+    """
+    return UserPrincipals(user)
+
+
+@contextmanager
+def bulk_access_check():
+    """Cache all access decisions made within the block.
+
+    Unlike the per-request memoization of :meth:`~ProtectionMixin.can_access`
+    and :meth:`~ProtectionManagersMixin.can_manage`, this cache is also
+    active outside requests (e.g. in scripts or background tasks).
+    Only use it around code which does not modify any ACLs.
+    """
+    if g.get('access_check_cache') is not None:
+        yield
+        return
+    g.access_check_cache = {}
+    try:
+        yield
+    finally:
+        del g.access_check_cache
+
+
+def preload_acl_entries(objects):
+    """Load the ACL entries of many protected objects at once.
+
+    This uses a single query for each type of object instead of one
+    query per object.  Objects which already have their ACL entries
+    loaded (or which are not persistent yet) are skipped.
+    """
+    objects_by_type = defaultdict(list)
+    for obj in objects:
+        state = inspect(obj)
+        if state.persistent and 'acl_entries' in state.unloaded:
+            objects_by_type[type(obj)].append(obj)
+    for cls, type_objects in objects_by_type.items():
+        prop = cls.acl_entries.property
+        (local_col, remote_col), = prop.local_remote_pairs
+        local_attr = prop.parent.get_property_by_column(local_col).key
+        remote_attr = prop.mapper.get_property_by_column(remote_col).key
+        entry_cls = prop.mapper.class_
+        entries = defaultdict(set)
+        ids = {getattr(obj, local_attr) for obj in type_objects}
+        for entry in entry_cls.query.filter(getattr(entry_cls, remote_attr).in_(ids)):
+            entries[getattr(entry, remote_attr)].add(entry)
+        for obj in type_objects:
+            set_committed_value(obj, 'acl_entries', entries[getattr(obj, local_attr)])
+
+
+def filter_accessible(objects, user, permission=None, *, allow_admin=True):
+    """Get the objects a user can access or manage.
+
+    This has the same result as checking each object individually, but
+    the ACL entries of all objects are loaded at once and the decisions
+    for protection parents shared by many objects are only made once.
+
+    :param objects: An iterable of protected objects
+    :param user: The :class:`.User` to check. May be None if the
+                 user is not logged in.
+    :param permission: If specified, check for this management
+                       permission (see :meth:`~ProtectionManagersMixin.can_manage`)
+                       instead of read access.
+    :param allow_admin: If admin users should always have access
+    :return: A list containing the objects which passed the check, in
+             their original order.
+    """
+    objects = list(objects)
+    preload_acl_entries(objects)
+    with bulk_access_check():
+        if permission is None:
+            return [obj for obj in objects if obj.can_access(user, allow_admin=allow_admin)]
+        return [obj for obj in objects if obj.can_manage(user, permission=permission, allow_admin=allow_admin)]
+
+
 class ProtectionMode(RichIntEnum):
     __titles__ = [_('Public'), _('Inheriting'), _('Protected')]
     public = 0
@@ -181,7 +372,7 @@ class ProtectionMixin:
     def is_user_admin(user):
         return user.is_admin
 
-    @memoize_request
+    @_memoize_access_check
     def can_access(self, user, allow_admin=True):
         """Check if the user can access the object.
 
@@ -281,7 +472,7 @@ class ProtectionMixin:
 
     def _check_principal_access(self, user):
         """Check whether the user is allowed per ACL entries."""
-        return any(user in entry.principal for entry in iter_acl(self.acl_entries))
+        return get_user_principals(user).contains_any(self.acl_entries)
 
     def set_session_access_key(self, access_key):
         """Store an access key for the object in the session.
@@ -371,7 +562,7 @@ class ProtectionManagersMixin(ProtectionMixin):
                 for p in self.acl_entries
                 if p.type == PrincipalType.user and p.has_management_permission()}
 
-    @memoize_request
+    @_memoize_access_check
     def can_manage(self, user, permission=None, allow_admin=True, check_parent=True, explicit_permission=False):
         """Check if the user can manage the object.
 
@@ -426,10 +617,9 @@ class ProtectionManagersMixin(ProtectionMixin):
         if not explicit_permission and allow_admin and type(self).is_user_admin(user):
             return True
 
-        if any(user in entry.principal
-               for entry in iter_acl(self.acl_entries)
-               if entry.has_management_permission(permission,
-                                                  explicit=(explicit_permission and permission is not None))):
+        explicit = explicit_permission and permission is not None
+        if get_user_principals(user).contains_any(entry for entry in self.acl_entries
+                                                  if entry.has_management_permission(permission, explicit=explicit)):
             return True
 
         if not check_parent or explicit_permission:
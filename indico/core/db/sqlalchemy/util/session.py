@@ -7,6 +7,9 @@
 
 from functools import wraps
 
+from flask import g
+
+from indico.core import signals
 from indico.core.db import db
 
 
@@ -17,3 +20,32 @@ def no_autoflush(fn):
         with db.session.no_autoflush:
             return fn(*args, **kwargs)
     return wrapper
+
+
+class AfterCommitQueue:
+    """Collect values and process them once the transaction has been committed.
+
+    This is mainly used to discard cached data affected by some changes;
+    doing so before the commit would allow a concurrent request to cache
+    the old data again.
+
+    :param name: A unique name used to store the pending values in `g`
+    :param callback: A function which is called with the set of pending
+                     values after a commit
+    """
+
+    def __init__(self, name, callback):
+        self.name = name
+        self.callback = callback
+
+    def connect(self):
+        """Connect the queue to the ``after_commit`` signal."""
+        signals.core.after_commit.connect(self._after_commit, weak=False)
+
+    def add(self, *values):
+        """Add values which should be processed after the next commit."""
+        g.setdefault(self.name, set()).update(values)
+
+    def _after_commit(self, sender, **kwargs):
+        if values := g.pop(self.name, None):
+            self.callback(values)
@@ -0,0 +1,31 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+
+from indico.core import signals
+from indico.core.db.sqlalchemy.util.session import AfterCommitQueue
+
+
+@pytest.mark.usefixtures('request_context')
+def test_after_commit_queue(mocker):
+    callback = mocker.Mock()
+    queue = AfterCommitQueue('test_after_commit_queue', callback)
+    queue.connect()
+    try:
+        signals.core.after_commit.send()
+        callback.assert_not_called()
+        queue.add(1, 2)
+        queue.add(2, 3)
+        callback.assert_not_called()
+        signals.core.after_commit.send()
+        callback.assert_called_once_with({1, 2, 3})
+        # the values are only processed once
+        signals.core.after_commit.send()
+        callback.assert_called_once()
+    finally:
+        signals.core.after_commit.disconnect(queue._after_commit)
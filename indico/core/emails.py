@@ -67,6 +67,30 @@ def send_email_task(task, email, log_entry=None):
             db.session.commit()
 
 
+@celery.task(name='send_email_batch')
+def send_email_batch_task(items):
+    """Send a batch of emails.
+
+    :param items: A list of ``(email, log_entry_id)`` tuples
+    """
+    from indico.modules.logs import EventLogEntry
+    log_entry_ids = {log_entry_id for __, log_entry_id in items if log_entry_id is not None}
+    log_entries = ({e.id: e for e in EventLogEntry.query.filter(EventLogEntry.id.in_(log_entry_ids))}
+                   if log_entry_ids else {})
+    items = [(email, log_entries.get(log_entry_id)) for email, log_entry_id in items]
+    try:
+        failed = do_send_email_batch(items)
+    except Exception as exc:
+        # we could not connect to the mail server at all
+        logger.warning('Could not send batch of %d emails; retrying them individually [%s]', len(items), exc)
+        failed = items
+    # emails which failed are retried one by one so they benefit from the backoff of the regular task
+    for email, log_entry in failed:
+        send_email_task.delay(email, log_entry)
+    # commit the log entry state changes
+    db.session.commit()
+
+
 def get_actual_sender_address(sender_address: str, reply_address: set[str]) -> tuple[str, set]:
     site_title = core_settings.get('site_title')
     if not sender_address:
@@ -108,21 +132,64 @@ def do_send_email(email, log_entry=None, _from_task=False):
                        the celery task responsible for sending emails.
     """
     with get_connection() as conn:
-        msg = EmailMessage(subject=email['subject'], body=email['body'], from_email=email['from'],
-                           to=email['to'], cc=email['cc'], bcc=email['bcc'], reply_to=email['reply_to'],
-                           attachments=email['attachments'], connection=conn)
-        if not msg.to:
-            msg.extra_headers['To'] = 'Undisclosed-recipients:;'
-        if email['html']:
-            msg.content_subtype = 'html'
-        msg.extra_headers['message-id'] = make_msgid(domain=urlsplit(config.BASE_URL).hostname)
-        msg.send()
+        _make_message(email, conn).send()
     if not _from_task:
         logger.info('Sent email "%s"', truncate(email['subject'], 100))
     if log_entry:
         update_email_log_state(log_entry)
 
 
+def do_send_email_batch(items):
+    """Send a batch of emails using a single connection.
+
+    Like :func:`do_send_email`, this function should usually not be
+    called directly; use `send_emails` instead.
+
+    :param items: A list of ``(email, log_entry)`` tuples
+    :return: A list containing the ``(email, log_entry)`` tuples of
+             the emails which could not be sent
+    """
+    failed = []
+    # if the connection cannot be opened, nothing has been sent yet and
+    # the exception is propagated so the caller can retry the whole batch
+    conn = get_connection()
+    try:
+        conn.open()
+    except Exception:
+        conn.close()
+        raise
+    try:
+        for email, log_entry in items:
+            try:
+                _make_message(email, conn).send()
+            except Exception as exc:
+                logger.warning('Could not send email "%s" [%s]', truncate(email['subject'], 100), exc)
+                failed.append((email, log_entry))
+            else:
+                if log_entry:
+                    update_email_log_state(log_entry)
+    finally:
+        try:
+            conn.close()
+        except Exception as exc:
+            # the emails have been sent already, so this must not cause them to be sent again
+            logger.warning('Could not close connection to the mail server [%s]', exc)
+    logger.info('Sent batch of %d emails (%d failed)', len(items) - len(failed), len(failed))
+    return failed
+
+
+def _make_message(email, connection):
+    msg = EmailMessage(subject=email['subject'], body=email['body'], from_email=email['from'],
+                       to=email['to'], cc=email['cc'], bcc=email['bcc'], reply_to=email['reply_to'],
+                       attachments=email['attachments'], connection=connection)
+    if not msg.to:
+        msg.extra_headers['To'] = 'Undisclosed-recipients:;'
+    if email['html']:
+        msg.content_subtype = 'html'
+    msg.extra_headers['message-id'] = make_msgid(domain=urlsplit(config.BASE_URL).hostname)
+    return msg
+
+
 def update_email_log_state(log_entry, failed=False):
     if failed:
         log_entry.data['state'] = 'failed'
@@ -8,6 +8,7 @@
 import re
 import time
 from functools import wraps
+from itertools import batched
 from types import GeneratorType
 
 from flask import g
@@ -21,6 +22,10 @@ from indico.util.string import truncate
 
 logger = Logger.get('emails')
 
+#: The number of emails sent using a single connection to the mail
+#: server (or a single celery task) when using :func:`send_emails`
+EMAIL_BATCH_SIZE = 100
+
 
 # XXX: Please don't use this in new code. Call `send_email()` directly.
 def email_sender(fn):
@@ -62,6 +67,66 @@ def send_email(email, event=None, module=None, user=None, log_metadata=None):
         fn(email, log_entry)
 
 
+def send_emails(emails, event=None, module=None, user=None):
+    """Send many emails created by :func:`make_email`.
+
+    This should be used instead of calling :func:`send_email` for
+    each email when sending the same notification to many people.
+    The emails are sent in batches, each of them using a single
+    connection to the mail server (and a single celery task), and
+    the result of each batch is logged.
+
+    Just like with :func:`send_email`, the emails are queued when
+    called while inside a RH.
+
+    :param emails: An iterable of ``(email, log_metadata)`` tuples,
+                   where `log_metadata` is a metadata dictionary to
+                   be saved in the event's log (or ``None``)
+    :param event: If specified, the emails will be saved in that
+                  event's log
+    :param module: The module name to show in the email log
+    :param user: The user to show in the email log
+    :return: The number of emails sent
+    """
+    fn = _queue_email_batch if config.SMTP_USE_CELERY else _send_email_batch
+    num_emails = num_batches = 0
+    for batch in batched(emails, EMAIL_BATCH_SIZE):
+        items = [(email, _log_email(email, event, module, user, log_metadata)) for email, log_metadata in batch]
+        num_emails += len(items)
+        num_batches += 1
+        if 'email_batch_queue' in g:
+            g.email_batch_queue.append((fn, items))
+        else:
+            fn(items)
+    if num_emails:
+        logger.info('Sending %d emails in %d batches', num_emails, num_batches)
+    return num_emails
+
+
+def _queue_email_batch(items):
+    from indico.core.emails import send_email_batch_task
+
+    # the log entries are loaded again in the task; passing them inside the list
+    # would pickle them as detached objects and any change to them would be lost
+    if any(log_entry and log_entry.id is None for __, log_entry in items):
+        db.session.flush()
+    send_email_batch_task.delay([(email, log_entry.id if log_entry else None) for email, log_entry in items])
+
+
+def _send_email_batch(items):
+    from indico.core.emails import do_send_email_batch
+    for email, log_entry in do_send_email_batch(items):
+        _handle_failed_email(email, log_entry)
+
+
+def _handle_failed_email(email, log_entry):
+    from indico.core.emails import store_failed_email, update_email_log_state
+    if log_entry:
+        update_email_log_state(log_entry, failed=True)
+    path = store_failed_email(email, log_entry)
+    logger.error('Sending email "%s" failed; stored data in %s', truncate(email['subject'], 100), path)
+
+
 def _log_email(email, event, module, user, meta=None):
     from indico.modules.logs import EventLogRealm, LogKind
     if not event:
@@ -85,6 +150,7 @@ def _log_email(email, event, module, user, meta=None):
 def init_email_queue():
     """Enable email queueing for the current context."""
     g.setdefault('email_queue', [])
+    g.setdefault('email_batch_queue', [])
 
 
 def flush_email_queue():
@@ -98,9 +164,10 @@ def flush_email_queue():
     """
     from indico.core.emails import store_failed_email, update_email_log_state
     queue = g.get('email_queue', [])
-    if not queue:
+    batch_queue = g.get('email_batch_queue', [])
+    if not queue and not batch_queue:
         return
-    logger.debug('Sending %d queued emails', len(queue))
+    logger.debug('Sending %d queued emails and %d queued batches', len(queue), len(batch_queue))
     for fn, email, log_entry in queue:
         try:
             fn(email, log_entry)
@@ -117,7 +184,17 @@ def flush_email_queue():
                              truncate(email['subject'], 100), path)
             # Wait for a short moment in case it's a very temporary issue
             time.sleep(0.25)
+    for fn, items in batch_queue:
+        try:
+            fn(items)
+        except Exception:
+            # Same as above; if a whole batch fails we most likely
+            # could not connect to the mail server (or to celery).
+            logger.exception('Flushing queued batch of %d emails failed', len(items))
+            for email, log_entry in items:
+                _handle_failed_email(email, log_entry)
     del queue[:]
+    del batch_queue[:]
     db.session.commit()
 
 
@@ -183,3 +260,25 @@ def make_email(to_list=None, cc_list=None, bcc_list=None, *, sender_address=None
         'body': body.strip(),
         'html': html,
     }
+
+
+class RenderedEmailTemplate:
+    """An email template whose subject and body have been rendered.
+
+    This can be passed to :func:`make_email` instead of the template
+    module when sending the same email to many recipients, so the
+    template is only rendered once instead of once per email.
+
+    :param template: A template module containing ``get_subject`` and
+                     ``get_body`` macros.
+    """
+
+    def __init__(self, template):
+        self.subject = template.get_subject()
+        self.body = template.get_body()
+
+    def get_subject(self):
+        return self.subject
+
+    def get_body(self):
+        return self.body
@@ -0,0 +1,124 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pickle
+from smtplib import SMTPConnectError, SMTPException
+
+import pytest
+from flask import g
+
+from indico.core.emails import do_send_email_batch, send_email_batch_task
+from indico.core.notifications import (RenderedEmailTemplate, flush_email_queue, init_email_queue, make_email,
+                                       send_emails)
+from indico.web.flask.templating import get_template_module
+
+
+def _make_emails(n):
+    return [make_email(f'user{i}@example.test', subject=f'Test {i}', body='Hello') for i in range(n)]
+
+
+@pytest.mark.usefixtures('request_context')
+def test_send_emails(mocker, smtp, dummy_event):
+    mocker.patch('indico.core.notifications.EMAIL_BATCH_SIZE', 2)
+    send_batch = mocker.patch('indico.core.notifications._send_email_batch', wraps=do_send_email_batch)
+    assert send_emails(((email, {'foo': 'bar'}) for email in _make_emails(5)), dummy_event, 'Test') == 5
+    assert [len(call.args[0]) for call in send_batch.call_args_list] == [2, 2, 1]
+    assert sorted(msg['To'] for msg in smtp.outbox) == [f'user{i}@example.test' for i in range(5)]
+    log_entries = dummy_event.log_entries.all()
+    assert len(log_entries) == 5
+    assert all(entry.data['state'] == 'sent' for entry in log_entries)
+    assert all(entry.meta == {'foo': 'bar'} for entry in log_entries)
+
+
+@pytest.fixture
+def celery_email_batch(mocker, patch_indico_config):
+    def _run_task(items):
+        # the arguments of the task are pickled when passed to the celery worker
+        items = pickle.loads(pickle.dumps(items))  # noqa: S301
+        send_email_batch_task.push_request(id='task')
+        try:
+            send_email_batch_task.run(items)
+        finally:
+            send_email_batch_task.pop_request()
+
+    patch_indico_config('SMTP_USE_CELERY', True)
+    return mocker.patch.object(send_email_batch_task, 'delay', side_effect=_run_task)
+
+
+@pytest.mark.usefixtures('request_context')
+def test_send_emails_celery(smtp, dummy_event, celery_email_batch):
+    assert send_emails(((email, None) for email in _make_emails(2)), dummy_event, 'Test') == 2
+    assert len(smtp.outbox) == 2
+    log_entries = dummy_event.log_entries.order_by('id').all()
+    assert [log_entry_id for __, log_entry_id in celery_email_batch.call_args.args[0]] == [e.id for e in log_entries]
+    assert all(entry.data['state'] == 'sent' for entry in log_entries)
+
+
+@pytest.mark.usefixtures('request_context', 'smtp')
+def test_send_emails_celery_failed(mocker, dummy_event, celery_email_batch):
+    send_email_task = mocker.patch('indico.core.emails.send_email_task')
+    mocker.patch('indico.core.emails._make_message', side_effect=ValueError('boom'))
+    assert send_emails(((email, None) for email in _make_emails(2)), dummy_event, 'Test') == 2
+    log_entries = dummy_event.log_entries.order_by('id').all()
+    # failed emails are retried individually with the log entries loaded by the batch task
+    assert [call.args[1] for call in send_email_task.delay.call_args_list] == log_entries
+
+
+@pytest.mark.usefixtures('request_context')
+def test_send_emails_queued(smtp):
+    init_email_queue()
+    send_emails((email, None) for email in _make_emails(3))
+    assert not smtp.outbox
+    assert len(g.email_batch_queue) == 1
+    flush_email_queue()
+    assert len(smtp.outbox) == 3
+    assert not g.email_batch_queue
+
+
+@pytest.mark.usefixtures('request_context')
+def test_do_send_email_batch_failed(mocker, smtp):
+    from indico.core.emails import _make_message
+
+    def _mock_make_message(email, connection):
+        if email['subject'] == 'Test 1':
+            raise ValueError('boom')
+        return _make_message(email, connection)
+
+    mocker.patch('indico.core.emails._make_message', _mock_make_message)
+    emails = _make_emails(3)
+    assert do_send_email_batch([(email, None) for email in emails]) == [(emails[1], None)]
+    assert [msg['To'] for msg in smtp.outbox] == ['user0@example.test', 'user2@example.test']
+
+
+@pytest.mark.usefixtures('request_context')
+def test_do_send_email_batch_close_failed(mocker, smtp):
+    from indico.vendor.django_mail.backends.smtp import EmailBackend
+    close = mocker.patch.object(EmailBackend, 'close', autospec=True, side_effect=SMTPException('quit failed'))
+    emails = _make_emails(2)
+    # the emails have been sent so they must not be retried
+    assert do_send_email_batch([(email, None) for email in emails]) == []
+    assert len(smtp.outbox) == 2
+    close.assert_called_once()
+
+
+@pytest.mark.usefixtures('request_context')
+def test_do_send_email_batch_connection_failed(mocker, smtp):
+    from indico.vendor.django_mail.backends.smtp import EmailBackend
+    mocker.patch.object(EmailBackend, 'open', autospec=True, side_effect=SMTPConnectError(421, 'unavailable'))
+    with pytest.raises(SMTPConnectError):
+        do_send_email_batch([(email, None) for email in _make_emails(2)])
+    assert not smtp.outbox
+
+
+def test_rendered_email_template():
+    tpl = get_template_module('emails/custom.html', subject='Test', body='<p>Hello</p>')
+    rendered = RenderedEmailTemplate(tpl)
+    assert rendered.get_subject() == tpl.get_subject()
+    assert rendered.get_body() == tpl.get_body()
+    email = make_email('user@example.test', template=rendered, html=True)
+    assert email['subject'] == '[Indico] Test'
+    assert email['body'] == tpl.get_body().strip()
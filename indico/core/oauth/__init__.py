@@ -23,8 +23,17 @@ def _no_ssl_required_on_debug(app, **kwargs):
         os.environ['AUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 
+@signals.core.after_commit.connect
+def _after_commit(sender, **kwargs):
+    from indico.core.oauth.util import delete_outdated_cached_tokens
+    delete_outdated_cached_tokens()
+
+
 @signals.users.merged.connect
 def _delete_merged_user_tokens(target, source, **kwargs):
+    from indico.core.oauth.models.tokens import OAuthToken
+    from indico.core.oauth.util import invalidate_cached_tokens
+    invalidate_cached_tokens(OAuthToken.query.join(OAuthToken.app_user_link).filter_by(user=source))
     target_app_links = {link.application: link for link in target.oauth_app_links}
     for source_link in source.oauth_app_links.all():
         try:
@@ -12,7 +12,7 @@ from indico.core.config import config
 from indico.core.db import db
 from indico.core.oauth.logger import logger
 from indico.core.oauth.models.tokens import OAuthToken
-from indico.core.oauth.util import query_token
+from indico.core.oauth.util import invalidate_cached_tokens, query_token
 
 
 class IndicoIntrospectionEndpoint(IntrospectionEndpoint):
@@ -44,5 +44,6 @@ class IndicoRevocationEndpoint(RevocationEndpoint):
         return query_token(token)
 
     def revoke_token(self, token, request):
+        invalidate_cached_tokens([token])
         db.session.delete(token)
         logger.info('Token %s was revoked', token)
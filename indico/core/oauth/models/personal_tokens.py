@@ -67,12 +67,16 @@ class PersonalToken(TokenModelBase):
 
     def generate_token(self):
         """Generate a new token string."""
-        from indico.core.oauth.util import TOKEN_PREFIX_PERSONAL
+        from indico.core.oauth.util import TOKEN_PREFIX_PERSONAL, invalidate_cached_tokens
+        if self.access_token_hash:
+            invalidate_cached_tokens([self])
         access_token = TOKEN_PREFIX_PERSONAL + generate_token(42)
         self.access_token = access_token
         return access_token
 
     def revoke(self):
         """Mark the token as revoked."""
+        from indico.core.oauth.util import invalidate_cached_tokens
         if self.revoked_dt is None:
             self.revoked_dt = now_utc()
+            invalidate_cached_tokens([self])
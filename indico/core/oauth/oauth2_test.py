@@ -17,14 +17,26 @@ from authlib.oauth2.base import OAuth2Error
 from authlib.oauth2.client import OAuth2Client
 from sqlalchemy.dialects.postgresql.array import ARRAY
 
+from indico.core import signals
 from indico.core.oauth.models.applications import OAuthApplicationUserLink
 from indico.core.oauth.models.tokens import OAuthToken
 from indico.core.oauth.scopes import SCOPES
-from indico.core.oauth.util import MAX_TOKENS_PER_SCOPE, TOKEN_PREFIX_OAUTH, save_token
+from indico.core.oauth.util import (MAX_TOKENS_PER_SCOPE, TOKEN_PREFIX_OAUTH, CachedBearerToken, _token_cache,
+                                    invalidate_cached_tokens, oauth_token_usage, personal_token_usage, save_token)
+from indico.modules.api.tasks import flush_usage_stats
 from indico.modules.users.util import merge_users
+from indico.testing.queries import QueryRecorder
 from indico.web.flask.util import url_for
 
 
+@pytest.fixture(autouse=True)
+def clear_usage_buffers():
+    """Discard the token usage data recorded during a test."""
+    yield
+    for usage in (oauth_token_usage, personal_token_usage):
+        usage.clear()
+
+
 class MockSession:
     def __init__(self, client):
         self.client = client
@@ -491,15 +503,58 @@ def test_merge_users(create_user, dummy_user, dummy_application, dummy_token, cr
         assert resp.json['id'] == dummy_user.id
 
 
+def _queries_token_table(recorder, table):
+    return any(f'FROM {table} ' in sql for sql, __, __ in recorder.queries)
+
+
+@pytest.mark.parametrize('personal', (False, True))
+def test_token_cache(db, dummy_token, dummy_personal_token, test_client, personal):
+    token = dummy_personal_token if personal else dummy_token
+    table = 'users.tokens' if personal else 'oauth.tokens'
+    headers = {'Authorization': f'Bearer {token._plaintext_token}'}
+    with QueryRecorder() as recorder:
+        assert test_client.get('/api/user/', headers=headers).status_code == 200
+    assert _queries_token_table(recorder, table)
+    # the validated token is cached, so it is not loaded from the database again
+    with QueryRecorder() as recorder:
+        resp = test_client.get('/api/user/', headers=headers)
+    assert resp.status_code == 200
+    assert resp.json['id'] == token.user.id
+    assert not _queries_token_table(recorder, table)
+    # revoking the token removes it from the cache
+    cached_data = vars(CachedBearerToken.from_token(token))
+    if personal:
+        token.revoke()
+    else:
+        db.session.delete(token)
+        invalidate_cached_tokens([token])
+    # a concurrent request may cache the token again until the revocation has been committed
+    _token_cache.set(token.access_token_hash, cached_data)
+    db.session.flush()
+    signals.core.after_commit.send()
+    assert test_client.get('/api/user/', headers=headers).status_code == 401
+
+
+def test_token_cache_user_blocked(dummy_user, dummy_token, test_client):
+    headers = {'Authorization': f'Bearer {dummy_token._plaintext_token}'}
+    assert test_client.get('/api/user/', headers=headers).status_code == 200
+    dummy_user.is_blocked = True
+    assert test_client.get('/api/user/', headers=headers).status_code == 401
+
+
 def test_oauth_token_last_used_info(dummy_token, dummy_personal_token, test_client):
     assert dummy_token.last_used_dt is None
     assert dummy_token.last_used_ip is None
     assert dummy_token.use_count == 0
     resp = test_client.get('/api/user/', headers={'Authorization': f'Bearer {dummy_token._plaintext_token}'})
     assert resp.status_code == 200
+    test_client.get('/api/user/', headers={'Authorization': f'Bearer {dummy_token._plaintext_token}'})
+    # usage data is buffered until the periodic task writes it to the database
+    assert dummy_token.use_count == 0
+    flush_usage_stats()
     assert dummy_token.last_used_dt is not None
     assert dummy_token.last_used_ip == '127.0.0.1'
-    assert dummy_token.use_count == 1
+    assert dummy_token.use_count == 2
     assert dummy_personal_token.last_used_dt is None
     assert dummy_personal_token.last_used_ip is None
     assert dummy_personal_token.use_count == 0
@@ -511,6 +566,7 @@ def test_personal_token_last_used_info(dummy_personal_token, dummy_token, test_c
     assert dummy_personal_token.use_count == 0
     resp = test_client.get('/api/user/', headers={'Authorization': f'Bearer {dummy_personal_token._plaintext_token}'})
     assert resp.status_code == 200
+    flush_usage_stats()
     assert dummy_personal_token.last_used_dt is not None
     assert dummy_personal_token.last_used_ip == '127.0.0.1'
     assert dummy_personal_token.use_count == 1
@@ -7,13 +7,11 @@
 
 from authlib.integrations.flask_oauth2 import ResourceProtector
 from authlib.oauth2.rfc6750.validator import BearerTokenValidator
-from flask import after_this_request, g, jsonify
+from flask import g, jsonify
 from flask import request as flask_request
 from werkzeug.exceptions import HTTPException
 
-from indico.core.db import db
-from indico.core.oauth.util import query_token
-from indico.util.date_time import now_utc
+from indico.core.oauth.util import oauth_token_usage, personal_token_usage, query_cached_token
 
 
 class IndicoAuthlibHTTPError(HTTPException):
@@ -34,32 +32,19 @@ class IndicoResourceProtector(ResourceProtector):
 
 class IndicoBearerTokenValidator(BearerTokenValidator):
     def authenticate_token(self, token_string):
-        return query_token(token_string, allow_personal=True)
+        return query_cached_token(token_string)
 
     def validate_token(self, token, scopes, request):
         super().validate_token(token, scopes, request)
 
-        # if we get here, the token is valid so we can mark it as used at the end of the request
+        # if we get here, the token is valid so we can mark it as used. even if the request fails
+        # for some reason, the token could be considered used, since it was valid and most likely
+        # used by a client who expected to do something with it...
 
         if g.get('_bearer_token_usage_logged'):
             return
         g._bearer_token_usage_logged = True
 
-        # XXX: should we wait or do it just now? even if the request failed for some reason, the
-        # token could be considered used, since it was valid and most likely used by a client who
-        # expected to do something with it...
-
-        token_id = token.id  # avoid DetachedInstanceError in the callback
-        token_cls = type(token)
-
-        @after_this_request
-        def _update_last_use(response):
-            with db.tmp_session() as sess:
-                # do not modify `token` directly, it's attached to a different session!
-                sess.query(token_cls).filter_by(id=token_id).update({
-                    token_cls.last_used_dt: now_utc(),
-                    token_cls.last_used_ip: flask_request.remote_addr,
-                    token_cls.use_count: token_cls.use_count + 1,
-                })
-                sess.commit()
-            return response
+        # the usage data is buffered to avoid writing to the token's row on every single request
+        usage = personal_token_usage if token.is_personal else oauth_token_usage
+        usage.record(token.id, last_used_ip=flask_request.remote_addr)
@@ -6,20 +6,24 @@
 # LICENSE file for more details.
 
 import hashlib
+from datetime import timedelta
 from uuid import UUID
 
 from authlib.oauth2.rfc6749 import list_to_scope, scope_to_list
-from flask import has_request_context
+from flask import g, has_request_context
 from flask import request as flask_request
 from sqlalchemy.dialects.postgresql.array import ARRAY
 from sqlalchemy.orm import joinedload
 
+from indico.core.cache import make_scoped_cache
 from indico.core.db import db
 from indico.core.oauth.logger import logger
 from indico.core.oauth.models.applications import OAuthApplication, OAuthApplicationUserLink
 from indico.core.oauth.models.personal_tokens import PersonalToken
 from indico.core.oauth.models.tokens import OAuthToken
+from indico.core.usage import UsageBuffer
 from indico.modules.logs.models.entries import LogKind, UserLogRealm
+from indico.modules.users import User
 
 
 # The maximum number of tokens to keep for any given app/user and scope combination
@@ -31,9 +35,117 @@ TOKEN_PREFIX_PERSONAL = 'indp_'  # noqa: S105
 # The prefix for service tokens (not handled by this module)
 TOKEN_PREFIX_SERVICE = 'inds_'  # noqa: S105
 
+#: Buffered usage data of OAuth tokens
+oauth_token_usage = UsageBuffer(OAuthToken, 'oauth-token')
+#: Buffered usage data of personal tokens
+personal_token_usage = UsageBuffer(PersonalToken, 'personal-token')
+#: How long the metadata of a validated bearer token is cached
+TOKEN_CACHE_TTL = timedelta(seconds=30)
+
+_token_cache = make_scoped_cache('oauth-token')
+
+
+class CachedBearerToken:
+    """The cached metadata of a valid bearer token.
+
+    This provides the parts of the token API needed to authenticate a
+    request, without having to load the token, its application and the
+    link between the app and the user from the database.  The user is
+    still loaded on each request, so blocking or deleting a user takes
+    effect immediately.
+    """
+
+    def __init__(self, id, user_id, scope, is_personal):
+        self.id = id
+        self.user_id = user_id
+        self.scope = scope
+        self.is_personal = is_personal
+
+    @classmethod
+    def from_token(cls, token):
+        return cls(token.id, token.user.id, token.get_scope(), isinstance(token, PersonalToken))
+
+    @property
+    def user(self):
+        return User.get(self.user_id)
+
+    def is_expired(self):
+        return False
+
+    def is_revoked(self):
+        user = self.user
+        return user is None or user.is_blocked or user.is_deleted
+
+    def get_scope(self):
+        return self.scope
+
+    def __repr__(self):
+        return f'<CachedBearerToken({self.id}, {self.user_id}, {self.scope!r}, personal={self.is_personal})>'
+
+
+def _hash_token(token_string):
+    return hashlib.sha256(token_string.encode()).hexdigest()
+
+
+def query_cached_token(token_string):
+    """Get a valid bearer token, using the cache if possible.
+
+    Only valid tokens are cached, and the cache key is the hash of the
+    token, so the token itself is never stored.
+
+    :return: A :class:`CachedBearerToken` for a valid token, the token
+             object for a revoked one, or ``None`` if the token does not
+             exist.
+    """
+    token_hash = _hash_token(token_string)
+    if data := _token_cache.get(token_hash):
+        return CachedBearerToken(**data)
+    token = query_token(token_string, allow_personal=True)
+    if token is None or token.is_revoked():
+        return token
+    cached = CachedBearerToken.from_token(token)
+    _token_cache.set(token_hash, vars(cached), timeout=TOKEN_CACHE_TTL)
+    return cached
+
+
+def invalidate_cached_tokens(tokens):
+    """Remove tokens from the bearer token cache.
+
+    This needs to be called whenever a token is revoked or deleted, or
+    when something affecting its scopes changes.
+
+    The tokens are removed again once the transaction has been
+    committed, since until then a concurrent request still sees the
+    token as valid and may put it back into the cache.
+
+    :param tokens: An iterable of :class:`OAuthToken` or
+                   :class:`PersonalToken` objects
+    """
+    token_hashes = {token.access_token_hash for token in tokens}
+    _delete_cached_tokens(token_hashes)
+    g.setdefault('outdated_token_hashes', set()).update(token_hashes)
+
+
+def _delete_cached_tokens(token_hashes):
+    # not using `delete_many` since it stops at the first key that is not cached
+    for token_hash in token_hashes:
+        _token_cache.delete(token_hash)
+
+
+def delete_outdated_cached_tokens():
+    """Remove the tokens invalidated in the committed transaction from the cache."""
+    _delete_cached_tokens(g.pop('outdated_token_hashes', ()))
+
+
+def invalidate_cached_application_tokens(application):
+    """Remove all tokens of an OAuth application from the bearer token cache."""
+    invalidate_cached_tokens(OAuthToken.query
+                             .join(OAuthToken.app_user_link)
+                             .filter(OAuthApplicationUserLink.application == application))
+
 
 def query_token(token_string, allow_personal=False):
-    token_hash = hashlib.sha256(token_string.encode()).hexdigest()
+    token_hash = _hash_token(token_string)
 
     if token_string.startswith(TOKEN_PREFIX_PERSONAL):
         if not allow_personal:
@@ -87,6 +199,7 @@ def save_token(token_data, request):
                                    'Scopes': ', '.join(sorted(requested_scopes))},
                              meta={'app_id': application.id})
             link.update_scopes(new_scopes)
+            invalidate_cached_tokens(link.tokens)
 
     link.tokens.append(OAuthToken(access_token=token_data['access_token'], scopes=requested_scopes))
 
@@ -97,4 +210,5 @@ def save_token(token_data, request):
          .order_by(OAuthToken.created_dt.desc())
          .offset(MAX_TOKENS_PER_SCOPE)
          .scalar_subquery())
+    invalidate_cached_tokens(OAuthToken.query.filter(OAuthToken.id.in_(q)))
     OAuthToken.query.filter(OAuthToken.id.in_(q)).delete(synchronize_session='fetch')
@@ -0,0 +1,112 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Buffered usage accounting.
+
+Updating the last-use information of e.g. a token in the database on
+every request causes lock contention and lots of writes when a client
+sends many requests with the same token.  Instead, the usage data is
+aggregated in Redis and periodically written to the database.
+"""
+
+import json
+import time
+from datetime import datetime
+
+from redis import RedisError
+
+from indico.core.cache import get_redis_client
+from indico.core.db import db
+from indico.core.logger import Logger
+from indico.util.date_time import now_utc
+
+
+logger = Logger.get('usage')
+
+#: How long (in seconds) to stop recording usage after Redis could not be reached
+REDIS_ERROR_BACKOFF = 60
+
+
+class UsageBuffer:
+    """Aggregate the usage of database objects in Redis.
+
+    The model needs to have ``use_count`` and ``last_used_dt`` columns.
+    Whenever an object is used, :meth:`record` increments its pending
+    use count and stores the current time along with any other values
+    (e.g. the IP address of the client).  :meth:`flush` adds the pending
+    count to the ``use_count`` column and sets the other columns to the
+    values from the most recent use.
+
+    :param model: The model class of the objects being used
+    :param name: A unique name used for the Redis keys
+    """
+
+    def __init__(self, model, name):
+        self.model = model
+        self.name = name
+        self._pending_key = f'indico-usage/{name}'
+        self._backoff_until = 0
+
+    def _get_key(self, obj_id):
+        return f'{self._pending_key}/{obj_id}'
+
+    def record(self, obj_id, **values):
+        """Record a use of an object.
+
+        :param obj_id: The ID of the object
+        :param values: JSON-serializable values for other columns which
+                       should be updated with the latest value
+        """
+        if time.monotonic() < self._backoff_until:
+            return
+        key = self._get_key(obj_id)
+        values['last_used_dt'] = now_utc().isoformat()
+        try:
+            with get_redis_client().pipeline() as pipe:
+                pipe.hincrby(key, 'use_count', 1)
+                pipe.hset(key, mapping={k: json.dumps(v) for k, v in values.items()})
+                pipe.sadd(self._pending_key, obj_id)
+                pipe.execute()
+        except RedisError as exc:
+            # avoid failing (and logging) on every single request while redis is unavailable
+            self._backoff_until = time.monotonic() + REDIS_ERROR_BACKOFF
+            logger.warning('Could not record usage of %s %s; not recording usage for %ds [%s]',
+                           self.name, obj_id, REDIS_ERROR_BACKOFF, exc)
+
+    def _pop(self, client, obj_id):
+        with client.pipeline() as pipe:
+            pipe.hgetall(self._get_key(obj_id))
+            pipe.delete(self._get_key(obj_id))
+            pipe.srem(self._pending_key, obj_id)
+            data = pipe.execute()[0]
+        return {k.decode(): v.decode() for k, v in data.items()}
+
+    def clear(self):
+        """Discard all pending usage data."""
+        client = get_redis_client()
+        keys = [self._get_key(obj_id.decode()) for obj_id in client.smembers(self._pending_key)]
+        client.delete(self._pending_key, *keys)
+
+    def flush(self):
+        """Write the pending usage data to the database.
+
+        :return: The number of objects which have been updated.
+        """
+        client = get_redis_client()
+        count = 0
+        for obj_id in client.smembers(self._pending_key):
+            obj_id = int(obj_id)
+            data = self._pop(client, obj_id)
+            if not data:
+                continue
+            use_count = int(data.pop('use_count'))
+            values = {k: json.loads(v) for k, v in data.items()}
+            values['last_used_dt'] = datetime.fromisoformat(values['last_used_dt'])
+            values['use_count'] = self.model.use_count + use_count
+            count += self.model.query.filter_by(id=obj_id).update(values)
+        db.session.commit()
+        return count
@@ -0,0 +1,63 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from redis import RedisError
+
+from indico.core.usage import UsageBuffer
+from indico.modules.api.models.keys import APIKey, api_key_usage
+
+
+def test_usage_buffer(db, dummy_user, create_user):
+    key = APIKey(user=dummy_user)
+    other_key = APIKey(user=create_user(123), use_count=10)
+    db.session.add_all([key, other_key])
+    db.session.flush()
+    key.register_used('127.0.0.1', '/export/event/1.json', True)
+    key.register_used('127.0.0.2', '/export/event/2.json', False)
+    other_key.register_used('127.0.0.3', '/export/categ/0.json', False)
+    # nothing is written to the database before flushing
+    assert key.use_count == 0
+    assert key.last_used_dt is None
+    assert api_key_usage.flush() == 2
+    db.session.expire_all()
+    assert key.use_count == 2
+    assert key.last_used_dt is not None
+    assert key.last_used_ip == '127.0.0.2'
+    assert key.last_used_uri == '/export/event/2.json'
+    assert not key.last_used_auth
+    assert other_key.use_count == 11
+    assert other_key.last_used_uri == '/export/categ/0.json'
+    # the buffer is empty after flushing
+    assert api_key_usage.flush() == 0
+    assert key.use_count == 2
+
+
+def test_usage_buffer_clear(db, dummy_user):
+    key = APIKey(user=dummy_user)
+    db.session.add(key)
+    db.session.flush()
+    key.register_used('127.0.0.1', '/export/event/1.json', True)
+    api_key_usage.clear()
+    assert api_key_usage.flush() == 0
+    assert key.use_count == 0
+
+
+def test_usage_buffer_redis_error(mocker):
+    get_redis = mocker.patch('indico.core.usage.get_redis_client')
+    get_redis.return_value.pipeline.side_effect = RedisError('unavailable')
+    warning = mocker.patch('indico.core.usage.logger.warning')
+    mocked_time = mocker.patch('indico.core.usage.time')
+    mocked_time.monotonic.return_value = 1000
+    usage = UsageBuffer(APIKey, 'test')
+    usage.record(1)
+    usage.record(2)
+    # after an error, nothing is recorded for a while
+    assert get_redis.return_value.pipeline.call_count == 1
+    warning.assert_called_once()
+    mocked_time.monotonic.return_value = 1100
+    usage.record(3)
+    assert get_redis.return_value.pipeline.call_count == 2
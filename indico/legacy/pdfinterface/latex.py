@@ -7,6 +7,7 @@
 
 import codecs
 import functools
+import hashlib
 import os
 import subprocess
 import tempfile
@@ -104,9 +105,31 @@ class PDFLaTeXBase:
 
         self._args = {'markdown': _convert_markdown}
 
-    def generate(self, *, as_bytes=False):
+    def render_source(self):
+        """Render the LaTeX source of the document without compiling it.
+
+        The source can be passed to :meth:`generate` so the template
+        does not need to be rendered again.
+        """
         latex = LatexRunner(self.source_dir, has_toc=self._table_of_contents)
-        filename = latex.run(self.LATEX_TEMPLATE, **self._args)
+        return latex.render_source(self.LATEX_TEMPLATE, **self._args)
+
+    def get_cache_key(self, source):
+        """Get a key identifying the PDF generated from a LaTeX source.
+
+        The temporary files referenced in the source (e.g. the event logo
+        or images embedded using markdown) have random names, so they
+        are replaced with the hash of their content.
+
+        :param source: The source returned by :meth:`render_source`
+        """
+        for filename in sorted(os.listdir(self.source_dir)):
+            source = source.replace(filename, hashlib.sha256(Path(self.source_dir, filename).read_bytes()).hexdigest())
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def generate(self, *, as_bytes=False, source=None):
+        latex = LatexRunner(self.source_dir, has_toc=self._table_of_contents)
+        filename = latex.run(self.LATEX_TEMPLATE, source=source, **self._args)
         return Path(filename).read_bytes() if as_bytes else filename
 
     def generate_source_archive(self):
@@ -234,12 +257,16 @@ class LatexRunner:
         template = env.get_or_select_template(template_name)
         return template.render(font_dir='fonts/', **kwargs)
 
-    def prepare(self, template_name, **kwargs):
+    def render_source(self, template_name, **kwargs):
+        return self._render_template(template_name + '.tex', kwargs)
+
+    def prepare(self, template_name, *, source=None, **kwargs):
         chmod_umask(self.source_dir, execute=True)
         source_filename = os.path.join(self.source_dir, template_name + '.tex')
         target_filename = os.path.join(self.source_dir, template_name + '.pdf')
 
-        source = self._render_template(template_name + '.tex', kwargs)
+        if source is None:
+            source = self._render_template(template_name + '.tex', kwargs)
         with codecs.open(source_filename, 'wb', encoding='utf-8') as f:
             f.write(source)
 
@@ -247,10 +274,10 @@ class LatexRunner:
             os.symlink(font_dir, os.path.join(self.source_dir, 'fonts'))
         return source_filename, target_filename
 
-    def run(self, template_name, **kwargs):
+    def run(self, template_name, *, source=None, **kwargs):
         if not config.LATEX_ENABLED:
             raise RuntimeError('LaTeX is not enabled')
-        source_filename, target_filename = self.prepare(template_name, **kwargs)
+        source_filename, target_filename = self.prepare(template_name, source=source, **kwargs)
         log_filename = os.path.join(self.source_dir, 'output.log')
         log_file = open(log_filename, 'a+')  # noqa: SIM115
         try:
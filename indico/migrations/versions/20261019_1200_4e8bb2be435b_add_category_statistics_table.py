@@ -0,0 +1,42 @@
+"""Add category statistics table
+
+Revision ID: 4e8bb2be435b
+Revises: 4615aff776e0
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from indico.core.db.sqlalchemy import UTCDateTime
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8bb2be435b'
+down_revision = '4615aff776e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'statistics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('created_event_count', sa.Integer(), nullable=False),
+        sa.Column('contribution_count', sa.Integer(), nullable=False),
+        sa.Column('attachment_count', sa.Integer(), nullable=False),
+        sa.Column('updated_dt', UTCDateTime, nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.categories.id']),
+        sa.PrimaryKeyConstraint('id'),
+        schema='categories'
+    )
+    op.create_index(None, 'statistics', ['category_id', 'year'], unique=True, schema='categories')
+    op.create_index(None, 'statistics', ['year'], unique=True, schema='categories',
+                    postgresql_where=sa.text('category_id IS NULL'))
+
+
+def downgrade():
+    op.drop_table('statistics', schema='categories')
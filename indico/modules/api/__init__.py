@@ -53,6 +53,11 @@ def _merge_users(target, source, **kwargs):
             ak_merged.user = target
 
 
+@signals.core.import_tasks.connect
+def _import_tasks(sender, **kwargs):
+    import indico.modules.api.tasks  # noqa: F401
+
+
 @signals.menu.items.connect_via('admin-sidemenu')
 def _extend_admin_menu(sender, **kwargs):
     if session.user.is_admin:
@@ -11,6 +11,7 @@ from sqlalchemy.dialects.postgresql import INET, UUID
 
 from indico.core.db import db
 from indico.core.db.sqlalchemy import UTCDateTime
+from indico.core.usage import UsageBuffer
 from indico.util.date_time import now_utc
 
 
@@ -107,9 +108,13 @@ class APIKey(db.Model):
         return '<APIKey({}, {}, {})>'.format(self.token, self.user_id, self.last_used_dt or 'never')
 
     def register_used(self, ip, uri, authenticated):
-        """Update the last used information."""
-        self.last_used_dt = now_utc()
-        self.last_used_ip = ip
-        self.last_used_uri = uri
-        self.last_used_auth = authenticated
-        self.use_count = APIKey.use_count + 1
+        """Update the last used information.
+
+        The data is buffered and only written to the database when the
+        ``flush_usage_stats`` task runs.
+        """
+        api_key_usage.record(self.id, last_used_ip=ip, last_used_uri=uri, last_used_auth=authenticated)
+
+
+#: Buffered usage data of API keys
+api_key_usage = UsageBuffer(APIKey, 'api-key')
@@ -0,0 +1,19 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from celery.schedules import crontab
+
+from indico.core.celery import celery
+from indico.core.oauth.util import oauth_token_usage, personal_token_usage
+from indico.modules.api.models.keys import api_key_usage
+
+
+@celery.periodic_task(name='flush_usage_stats', run_every=crontab(minute='*'))
+def flush_usage_stats():
+    """Write the buffered last-use data of tokens and API keys to the database."""
+    for usage in (oauth_token_usage, personal_token_usage, api_key_usage):
+        usage.flush()
@@ -5,6 +5,7 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from flask import g
 from sqlalchemy.orm import joinedload, subqueryload
 
 from indico.core import signals
@@ -102,6 +103,12 @@ class AttachmentCloner(EventCloner):
                 old_file = old_attachment.file
                 attachment.file = AttachmentFile(attachment=attachment, user=old_file.user, filename=old_file.filename,
                                                  content_type=old_file.content_type)
-                with old_file.open() as fd:
-                    attachment.file.save(fd)
+                if g.get('sharing_attachment_files'):
+                    # attachment files are never removed from the storage, so when cloning
+                    # an event many times at once we can safely reference the existing file
+                    attachment.file.populate_from_attrs(old_file, {'storage_backend', 'storage_file_id', 'size',
+                                                                   'md5'})
+                else:
+                    with old_file.open() as fd:
+                        attachment.file.save(fd)
         return folder
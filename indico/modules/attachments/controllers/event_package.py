@@ -15,6 +15,7 @@ from sqlalchemy import Date, cast
 from indico.core.celery import AsyncResult
 from indico.core.db import db
 from indico.core.db.sqlalchemy.links import LinkType
+from indico.core.db.sqlalchemy.protection import filter_accessible
 from indico.core.errors import IndicoError
 from indico.modules.attachments.forms import AttachmentPackageForm
 from indico.modules.attachments.models.attachments import Attachment, AttachmentFile, AttachmentType
@@ -72,7 +73,7 @@ class AttachmentPackageGeneratorMixin(ZipGeneratorMixin):
         return self._filter_protected(attachments)
 
     def _filter_protected(self, attachments):
-        return [attachment for attachment in attachments if attachment.can_access(session.user)]
+        return filter_accessible(attachments, session.user)
 
     def _get_all_attachments(self, added_since):
         query = self._build_base_query(added_since)
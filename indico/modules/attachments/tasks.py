@@ -5,25 +5,70 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-import os
+import hashlib
+from datetime import timedelta
+from io import BytesIO
+from tempfile import TemporaryFile
+from zipfile import ZipFile
 
+from indico.core.cache import make_scoped_cache
 from indico.core.celery import celery
+from indico.core.config import config
 from indico.core.db import db
+from indico.modules.attachments import logger
 from indico.modules.attachments.models.attachments import Attachment
 from indico.modules.files.models.files import File
+from indico.util.archives import get_compress_type, read_stored_files
+
+
+#: How long a generated package is reused when the same files are requested again.
+#: This must be shorter than the time after which unclaimed files are deleted.
+PACKAGE_CACHE_TTL = timedelta(hours=12)
+#: Packages whose files are smaller than this are built in memory instead of a temp file
+MAX_IN_MEMORY_PACKAGE_SIZE = 32 * 1024 * 1024
+
+_cache = make_scoped_cache('materials-package')
+
+
+def _get_package_cache_key(event, layout):
+    # the attachment file ids change whenever a new version of an attachment is uploaded
+    data = '\n'.join(f'{name}:{attachment_file.id}' for name, attachment_file in layout)
+    return f'{event.id}-{hashlib.sha256(data.encode()).hexdigest()}'
+
+
+def _get_cached_package(cache_key):
+    if (file_id := _cache.get(cache_key)) is None:
+        return None
+    file = File.get(file_id)
+    if file is None or file.storage_file_id is None:
+        return None
+    return file
 
 
 @celery.task(ignore_result=False)
 def generate_materials_package(attachment_ids, event):
     from indico.modules.attachments.controllers.event_package import AttachmentPackageGeneratorMixin
-    attachments = Attachment.query.filter(Attachment.id.in_(attachment_ids)).all()
+    attachments = Attachment.query.filter(Attachment.id.in_(attachment_ids)).order_by(Attachment.id).all()
     attachment_package_mixin = AttachmentPackageGeneratorMixin()
     attachment_package_mixin.event = event
-    generated_zip = attachment_package_mixin._generate_zip_file(attachments, return_file=True)
-    f = File(filename='material-package.zip', content_type='application/zip', meta={'event_id': event.id})
-    context = ('event', event.id, 'attachment-package')
-    f.save(context, generated_zip)
+    # the whole layout of the package is known before reading any of the files
+    layout = list(attachment_package_mixin._iter_zip_layout(attachments))
+    cache_key = _get_package_cache_key(event, layout)
+    if (f := _get_cached_package(cache_key)) is not None:
+        logger.info('Reusing material package %r for %r', f, event)
+        return f.signed_download_url
+
+    total_size = sum(attachment_file.size for __, attachment_file in layout)
+    logger.info('Generating material package for %r (%d files, %d bytes)', event, len(layout), total_size)
+    with (BytesIO() if total_size <= MAX_IN_MEMORY_PACKAGE_SIZE else TemporaryFile(dir=config.TEMP_DIR)) as buf:
+        with ZipFile(buf, 'w', allowZip64=True) as zip_file:
+            for name, data in read_stored_files(layout):
+                zip_file.writestr(name, data, compress_type=get_compress_type(name))
+        buf.seek(0)
+        f = File(filename='material-package.zip', content_type='application/zip', meta={'event_id': event.id})
+        context = ('event', event.id, 'attachment-package')
+        f.save(context, buf)
     db.session.add(f)
     db.session.commit()
-    os.unlink(generated_zip.name)
+    _cache.set(cache_key, f.id, timeout=PACKAGE_CACHE_TTL)
     return f.signed_download_url
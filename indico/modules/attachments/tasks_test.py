@@ -0,0 +1,55 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import re
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import pytest
+
+from indico.modules.attachments.models.attachments import AttachmentFile
+from indico.modules.attachments.tasks import generate_materials_package
+from indico.modules.files.models.files import File
+
+
+@pytest.fixture(autouse=True)
+def _expire_on_commit(db, monkeypatch):
+    # in tests committing only flushes the session, but the task relies on the commit
+    # expiring the new file: until it is loaded again, its uuid is still the string from
+    # the column default instead of a UUID, and the signed download url cannot be built
+    def _commit():
+        db.session.flush()
+        db.session.expire_all()
+
+    monkeypatch.setattr(db.session, 'commit', _commit)
+
+
+def _get_package(url):
+    # the task returns the signed download url of the package
+    match = re.fullmatch(r'https?://[^/]+/files/([0-9a-f-]{36})/download\?token=.+', url)
+    assert match
+    return File.query.filter_by(uuid=match.group(1)).one()
+
+
+def test_generate_materials_package(db, dummy_event, dummy_user, dummy_attachment):
+    package = _get_package(generate_materials_package([dummy_attachment.id], dummy_event))
+    with package.open() as f, ZipFile(f) as zip_file:
+        assert zip_file.namelist() == ['dummy0/dummy_folder/dummy_file.txt']
+        info = zip_file.getinfo('dummy0/dummy_folder/dummy_file.txt')
+        assert info.compress_type == ZIP_DEFLATED
+        assert zip_file.read(info) == b'hello world'
+
+    # the same files are not packaged again
+    assert _get_package(generate_materials_package([dummy_attachment.id], dummy_event)) == package
+
+    # but a new version of an attachment results in a new package
+    dummy_attachment.file = AttachmentFile(user=dummy_user, filename='dummy_file.txt', content_type='text/plain')
+    dummy_attachment.file.save(b'new version')
+    db.session.flush()
+    new_package = _get_package(generate_materials_package([dummy_attachment.id], dummy_event))
+    assert new_package != package
+    with new_package.open() as f, ZipFile(f) as zip_file:
+        assert zip_file.read('dummy0/dummy_folder/dummy_file.txt') == b'new version'
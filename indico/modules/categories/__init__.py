@@ -12,8 +12,10 @@ from indico.core.db.sqlalchemy.protection import make_acl_log_fn
 from indico.core.logger import Logger
 from indico.core.permissions import ManagementPermission, check_permissions
 from indico.core.settings import SettingsProxy
+from indico.modules.categories.calendar import connect_calendar_signals
 from indico.modules.categories.models.categories import Category, EventCreationMode
 from indico.modules.categories.models.event_move_request import MoveRequestState
+from indico.modules.categories.statistics import connect_statistics_signals
 from indico.modules.logs.models.entries import CategoryLogRealm
 from indico.util.i18n import _
 from indico.web.flask.util import url_for
@@ -30,6 +32,12 @@ upcoming_events_settings = SettingsProxy('upcoming_events', {
 # Log ACL changes
 signals.acl.entry_changed.connect(make_acl_log_fn(Category, CategoryLogRealm.category), sender=Category, weak=False)
 
+# Keep category statistics up to date
+connect_statistics_signals()
+
+# Invalidate cached calendar data
+connect_calendar_signals()
+
 
 @signals.core.import_tasks.connect
 def _import_tasks(sender, **kwargs):
@@ -0,0 +1,208 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Cached event data for the category calendar.
+
+The data of the events in a category tree is cached in buckets, one for
+each month.  Every category has a version which is part of the cache
+keys; whenever an event or category in its subtree changes, the version
+is discarded so the buckets are computed again when needed.
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from pytz import utc
+from sqlalchemy.orm import load_only, selectinload, undefer
+
+from indico.core import signals
+from indico.core.cache import make_scoped_cache
+from indico.core.db.sqlalchemy.util.session import AfterCommitQueue
+
+
+#: How long unchanged calendar data is cached
+CALENDAR_CACHE_TTL = timedelta(days=1)
+
+_cache = make_scoped_cache('category-calendar')
+
+
+def _delete_versions(category_ids):
+    for id_ in category_ids:
+        _cache.delete(f'version/{id_}')
+
+
+_outdated_categories = AfterCommitQueue('outdated_calendar_categories', _delete_versions)
+
+
+def connect_calendar_signals():
+    _outdated_categories.connect()
+    signals.event.created.connect(_event_changed)
+    signals.event.deleted.connect(_event_changed)
+    signals.event.restored.connect(_event_changed)
+    signals.event.updated.connect(_event_changed)
+    signals.event.moved.connect(_event_moved)
+    signals.category.created.connect(_category_changed)
+    signals.category.updated.connect(_category_changed)
+    signals.category.deleted.connect(_category_changed)
+    signals.category.moved.connect(_category_moved)
+
+
+def _mark_category_chain(category):
+    if category is not None:
+        _outdated_categories.add(*category.chain_ids)
+
+
+def _event_changed(event, **kwargs):
+    _mark_category_chain(event.category)
+
+
+def _event_moved(event, old_parent, **kwargs):
+    _mark_category_chain(event.category)
+    _mark_category_chain(old_parent)
+
+
+def _category_changed(category, **kwargs):
+    _mark_category_chain(category)
+
+
+def _category_moved(category, old_parent, **kwargs):
+    _mark_category_chain(category)
+    _mark_category_chain(old_parent)
+
+
+def _get_version(category_id):
+    key = f'version/{category_id}'
+    _cache.add(key, uuid4().hex, timeout=CALENDAR_CACHE_TTL)
+    return _cache.get(key)
+
+
+def _next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _iter_months(start_dt, end_dt):
+    month = (start_dt.year, start_dt.month)
+    while month <= (end_dt.year, end_dt.month):
+        yield month
+        month = _next_month(*month)
+
+
+def _month_start(year, month):
+    return datetime(year, month, 1, tzinfo=utc)
+
+
+def _find_nearest_category(category_id, category_chain):
+    for index, category_data in enumerate(category_chain):
+        if category_data['id'] == category_id:
+            if index == len(category_chain) - 1:
+                return category_data
+            else:
+                return category_chain[index + 1]
+    # this should never happen
+    raise Exception(f'Category {category_id} not found in category chain')
+
+
+def _build_buckets(category, months, tz):
+    from indico.modules.events.models.events import Event
+    from indico.web.flask.util import url_for
+
+    buckets = {month: {'events': [], 'categories': {}, 'rooms': {}} for month in months}
+    from_dt = _month_start(*months[0])
+    to_dt = _month_start(*_next_month(*months[-1]))
+    query = (Event.query
+             .filter(Event.start_dt >= from_dt,
+                     Event.start_dt < to_dt,
+                     Event.is_visible_in(category.id),
+                     ~Event.is_deleted)
+             .options(undefer(Event.detailed_category_chain),
+                      selectinload('own_room'),
+                      load_only('id', 'title', 'start_dt', 'end_dt', 'category_id', 'own_venue_id', 'own_room_id',
+                                'keywords')))
+    for event in query:
+        start_dt = event.start_dt.astimezone(utc)
+        bucket = buckets.get((start_dt.year, start_dt.month))
+        if bucket is None:
+            continue
+        category_data = _find_nearest_category(category.id, event.detailed_category_chain)
+        category_data['url'] = url_for('categories.calendar', category_id=category_data['id'])
+        bucket['categories'][category_data['id']] = category_data
+        room = event.room
+        if room and room.id not in bucket['rooms']:
+            bucket['rooms'][room.id] = {'id': room.id,
+                                        'title': room.full_name,
+                                        'venueId': room.location_id}
+        bucket['events'].append({'title': event.title,
+                                 'start': event.start_dt.astimezone(tz).replace(tzinfo=None).isoformat(),
+                                 'end': event.end_dt.astimezone(tz).replace(tzinfo=None).isoformat(),
+                                 'url': event.url,
+                                 'categoryId': category_data['id'],
+                                 'venueId': event.own_venue_id,
+                                 'keywords': event.keywords,
+                                 'roomId': room.id if room else None,
+                                 'start_dt': start_dt})
+    return buckets
+
+
+def get_calendar_events(category, start_dt, end_dt):
+    """Get the calendar data of the events in a category tree.
+
+    :param category: The category
+    :param start_dt: The earliest start date of the events
+    :param end_dt: The latest start date of the events
+    :return: A tuple containing a list of event data dicts, a list of
+             category data dicts and a list of room data dicts.
+    """
+    tz = category.display_tzinfo
+    months = list(_iter_months(start_dt.astimezone(utc), end_dt.astimezone(utc)))
+    if (version := _get_version(category.id)) is None:
+        # the cache is not available
+        buckets = _build_buckets(category, months, tz)
+    else:
+        keys = {month: f'{category.id}/{version}/{tz.zone}/{month[0]}-{month[1]:02}' for month in months}
+        buckets = dict(zip(months, _cache.get_many(*keys.values()), strict=True))
+        if missing := [month for month, bucket in buckets.items() if bucket is None]:
+            new_buckets = _build_buckets(category, missing, tz)
+            _cache.set_many({keys[month]: bucket for month, bucket in new_buckets.items()},
+                            timeout=CALENDAR_CACHE_TTL)
+            buckets.update(new_buckets)
+    events = []
+    categories = {}
+    rooms = {}
+    for bucket in buckets.values():
+        bucket_events = [event for event in bucket['events'] if start_dt <= event['start_dt'] <= end_dt]
+        for event in bucket_events:
+            categories[event['categoryId']] = bucket['categories'][event['categoryId']]
+            if event['roomId'] is not None:
+                rooms[event['roomId']] = bucket['rooms'][event['roomId']]
+            events.append({k: v for k, v in event.items() if k != 'start_dt'})
+    return events, list(categories.values()), list(rooms.values())
+
+
+def get_ongoing_calendar_events(category, start_dt, end_dt):
+    """Get the events in a category tree which are ongoing during a time range.
+
+    :return: A list of dicts containing the title, URL, start and end
+             date of the events.
+    """
+    from indico.modules.events.models.events import Event
+
+    version = _get_version(category.id)
+    key = f'{category.id}/{version}/ongoing/{start_dt.timestamp()}-{end_dt.timestamp()}'
+    ongoing_events = _cache.get(key) if version is not None else None
+    if ongoing_events is None:
+        query = (Event.query
+                 .filter(Event.is_visible_in(category.id),
+                         ~Event.is_deleted,
+                         Event.start_dt < start_dt,
+                         Event.end_dt > end_dt)
+                 .options(load_only('id', 'title', 'start_dt', 'end_dt', 'timezone'))
+                 .order_by(Event.title))
+        ongoing_events = [{'title': event.title, 'url': event.url, 'start_dt': event.start_dt, 'end_dt': event.end_dt}
+                          for event in query]
+        if version is not None:
+            _cache.set(key, ongoing_events, timeout=CALENDAR_CACHE_TTL)
+    return ongoing_events
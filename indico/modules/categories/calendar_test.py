@@ -0,0 +1,111 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import datetime
+
+import pytest
+from pytz import utc
+
+from indico.core import signals
+from indico.modules.categories import calendar
+from indico.modules.categories.calendar import get_calendar_events, get_ongoing_calendar_events
+
+
+@pytest.fixture
+def calendar_data(create_category, create_event):
+    cat = create_category(100, title='Parent')
+    subcat = create_category(101, title='Child', parent=cat)
+    events = {
+        'jan': create_event(category=cat, title='January',
+                            start_dt=datetime(2025, 1, 20, 9, tzinfo=utc),
+                            end_dt=datetime(2025, 1, 20, 17, tzinfo=utc)),
+        'feb': create_event(category=subcat, title='February',
+                            start_dt=datetime(2025, 2, 3, 9, tzinfo=utc), end_dt=datetime(2025, 2, 3, 17, tzinfo=utc)),
+        'mar': create_event(category=subcat, title='March',
+                            start_dt=datetime(2025, 3, 3, 9, tzinfo=utc), end_dt=datetime(2025, 3, 3, 17, tzinfo=utc)),
+        'long': create_event(category=cat, title='Long',
+                             start_dt=datetime(2024, 12, 1, tzinfo=utc), end_dt=datetime(2025, 6, 1, tzinfo=utc)),
+    }
+    return cat, subcat, events
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_calendar_events(calendar_data, mocker):
+    cat, subcat, __ = calendar_data
+    build_buckets = mocker.spy(calendar, '_build_buckets')
+    start_dt = datetime(2025, 1, 15, tzinfo=utc)
+    end_dt = datetime(2025, 2, 15, tzinfo=utc)
+    data, categories, rooms = get_calendar_events(cat, start_dt, end_dt)
+    assert [e['title'] for e in data] == ['January', 'February']
+    assert [e['categoryId'] for e in data] == [cat.id, subcat.id]
+    assert data[0]['start'] == '2025-01-20T09:00:00'
+    assert all('start_dt' not in e for e in data)
+    assert {c['id'] for c in categories} == {cat.id, subcat.id}
+    assert rooms == []
+    assert build_buckets.call_count == 1
+    # the same months are served from the cache
+    data, categories, rooms = get_calendar_events(cat, datetime(2025, 1, 1, tzinfo=utc), end_dt)
+    assert [e['title'] for e in data] == ['January', 'February']
+    assert build_buckets.call_count == 1
+    # only the missing month is computed
+    data = get_calendar_events(cat, start_dt, datetime(2025, 3, 31, tzinfo=utc))[0]
+    assert [e['title'] for e in data] == ['January', 'February', 'March']
+    assert build_buckets.call_count == 2
+    assert build_buckets.call_args.args[1] == [(2025, 3)]
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_calendar_events_invalidation(calendar_data, mocker):
+    cat, subcat, events = calendar_data
+    build_buckets = mocker.spy(calendar, '_build_buckets')
+    start_dt = datetime(2025, 1, 1, tzinfo=utc)
+    end_dt = datetime(2025, 3, 31, tzinfo=utc)
+    assert [e['title'] for e in get_calendar_events(cat, start_dt, end_dt)[0]] == ['January', 'February', 'March']
+    assert [e['title'] for e in get_calendar_events(subcat, start_dt, end_dt)[0]] == ['February', 'March']
+    assert build_buckets.call_count == 2
+    # changing an event discards the cached data of all categories containing it
+    events['feb'].title = 'Updated'
+    signals.event.updated.send(events['feb'], changes={})
+    signals.core.after_commit.send()
+    assert [e['title'] for e in get_calendar_events(cat, start_dt, end_dt)[0]] == ['January', 'Updated', 'March']
+    assert [e['title'] for e in get_calendar_events(subcat, start_dt, end_dt)[0]] == ['Updated', 'March']
+    assert build_buckets.call_count == 4
+    # changes only affecting the parent category keep the cached data of the subcategory
+    events['jan'].is_deleted = True
+    signals.event.deleted.send(events['jan'], user=None)
+    signals.core.after_commit.send()
+    assert [e['title'] for e in get_calendar_events(cat, start_dt, end_dt)[0]] == ['Updated', 'March']
+    assert [e['title'] for e in get_calendar_events(subcat, start_dt, end_dt)[0]] == ['Updated', 'March']
+    assert build_buckets.call_count == 5
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_ongoing_calendar_events(calendar_data):
+    cat, subcat, events = calendar_data
+    start_dt = datetime(2025, 2, 1, tzinfo=utc)
+    end_dt = datetime(2025, 2, 28, tzinfo=utc)
+    ongoing = get_ongoing_calendar_events(cat, start_dt, end_dt)
+    assert ongoing == [{'title': 'Long', 'url': events['long'].url,
+                        'start_dt': events['long'].start_dt, 'end_dt': events['long'].end_dt}]
+    assert get_ongoing_calendar_events(subcat, start_dt, end_dt) == []
+    events['long'].title = 'Longer'
+    signals.event.updated.send(events['long'], changes={})
+    signals.core.after_commit.send()
+    assert [e['title'] for e in get_ongoing_calendar_events(cat, start_dt, end_dt)] == ['Longer']
+
+
+def test_calendar_events_etag(calendar_data, test_client):
+    cat = calendar_data[0]
+    url = f'/category/{cat.id}/calendar/events?start=2025-01-01&end=2025-02-01'
+    resp = test_client.get(url)
+    assert resp.status_code == 200
+    assert [e['title'] for e in resp.json['events']] == ['January']
+    assert resp.json['ongoing_event_count'] == 1
+    etag = resp.headers['ETag']
+    resp = test_client.get(url, headers={'If-None-Match': etag})
+    assert resp.status_code == 304
+    assert not resp.data
@@ -86,6 +86,35 @@ import {$T} from 'indico/utils/i18n';
     function setupToggleEventListButton(wrapper, callback) {
       const $wrapper = $(wrapper);
       const $content = $wrapper.find('.events');
+      const $loadMore = $wrapper.find('.js-load-more');
+      // future events are loaded starting with the closest ones, so their
+      // older pages need to be added above the already loaded events
+      const prepend = !!$content.data('event-list-after');
+      let cursor = null;
+
+      function loadEvents(success) {
+        $.ajax({
+          url: $content.data('event-list-url'),
+          data: {
+            before: $content.data('event-list-before'),
+            after: $content.data('event-list-after'),
+            cursor: cursor || undefined,
+            ...requestParams,
+          },
+          error: handleAjaxError,
+          success(data) {
+            cursor = data.cursor;
+            success(data.html);
+            $loadMore.toggle(!!cursor && $content.is(':visible'));
+          },
+        });
+      }
+
+      $loadMore.hide().on('click', function(evt) {
+        evt.preventDefault();
+        $loadMore.hide();
+        loadEvents(html => (prepend ? $content.prepend(html) : $content.append(html)));
+      });
 
       function updateMessage(visible) {
         $wrapper.find('.js-hide-message').toggle(visible);
@@ -105,28 +134,21 @@ import {$T} from 'indico/utils/i18n';
         if ($content.is(':empty')) {
           visible = true;
           displaySpinner(true);
-          $.ajax({
-            url: $content.data('event-list-url'),
-            data: {
-              before: $content.data('event-list-before'),
-              after: $content.data('event-list-after'),
-              ...requestParams,
-            },
-            error: handleAjaxError,
-            success(data) {
-              $content.html(data.html);
-              $content.show();
-              updateMessage(true);
-              displaySpinner(false);
-            },
+          $content.show();
+          loadEvents(html => {
+            $content.html(html);
+            updateMessage(true);
+            displaySpinner(false);
           });
         } else if ($content.is(':visible')) {
           visible = false;
           $content.hide();
+          $loadMore.hide();
           updateMessage(false);
         } else {
           visible = true;
           $content.show();
+          $loadMore.toggle(!!cursor);
           updateMessage(true);
         }
         if (!triggeredAutomatically && callback) {
@@ -18,17 +18,19 @@ from dateutil.parser import ParserError
 from dateutil.relativedelta import relativedelta
 from flask import flash, jsonify, redirect, request, session
 from pytz import utc
-from sqlalchemy.orm import joinedload, load_only, selectinload, subqueryload, undefer, undefer_group
+from sqlalchemy.orm import joinedload, load_only, subqueryload, undefer, undefer_group
 from webargs import fields, validate
 from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 
 from indico.core import signals
 from indico.core.db import db
 from indico.core.db.sqlalchemy.util.queries import get_n_matching
+from indico.modules.categories.calendar import get_calendar_events, get_ongoing_calendar_events
 from indico.modules.categories.controllers.base import RHCategoryBase, RHDisplayCategoryBase
-from indico.modules.categories.controllers.util import (get_category_view_params, get_event_query_filter,
-                                                        group_by_month, make_format_event_date_func,
-                                                        make_happening_now_func, make_is_recent_func)
+from indico.modules.categories.controllers.util import (get_category_view_params, get_event_list_page,
+                                                        get_event_query_filter, get_hidden_event_ids, group_by_month,
+                                                        make_format_event_date_func, make_happening_now_func,
+                                                        make_is_recent_func)
 from indico.modules.categories.models.categories import Category
 from indico.modules.categories.serialize import (serialize_categories_ical, serialize_category, serialize_category_atom,
                                                  serialize_category_chain)
@@ -89,12 +91,6 @@ class RHCategoryLogo(RHDisplayCategoryBase):
 class RHCategoryStatisticsJSON(RHDisplayCategoryBase):
     def _process(self):
         stats = get_category_stats(self.category.id)
-        if 'min_year' not in stats:
-            # in case the instance was freshly updated and still has data
-            # cached we need to invalidate it to avoid breaking the page
-            # TODO: remove this in 3.0; by then people had enough time to update to 2.3...
-            get_category_stats.clear_cached(self.category.id)
-            stats = get_category_stats(self.category.id)
         data = {
             'events': stats['events_by_year'],
             'contributions': stats['contribs_by_year'],
@@ -276,7 +272,14 @@ class RHDisplayCategory(RHDisplayCategoryEventsBase):
 
 
 class RHEventList(RHDisplayCategoryEventsBase):
-    """Return the HTML for the event list before/after a specific month."""
+    """Return the HTML for the event list before/after a specific month.
+
+    The events are returned in pages; the ``cursor`` returned with a page
+    can be passed to get the next one.
+    """
+
+    #: The minimum number of events returned per page
+    page_size = 100
 
     def _parse_year_month(self, string):
         try:
@@ -291,8 +294,7 @@ class RHEventList(RHDisplayCategoryEventsBase):
         after = self._parse_year_month(request.args.get('after'))
         if before is None and after is None:
             raise BadRequest('"before" or "after" parameter must be specified')
-        hidden_event_ids = ({e.id for e in self.category.get_hidden_events(user=session.user)}
-                            if not self.is_flat else set())
+        hidden_event_ids = get_hidden_event_ids(self.category, session.user) if not self.is_flat else set()
         event_query_filter = get_event_query_filter(self.category, is_flat=self.is_flat,
                                                     hidden_event_ids=hidden_event_ids)
 
@@ -303,13 +305,19 @@ class RHEventList(RHDisplayCategoryEventsBase):
         event_query = (Event.query
                        .options(*self._event_query_options)
                        .filter(event_query_filter)
-                       .union(*extra_events_queries)
-                       .order_by(Event.start_dt.desc(), Event.id.desc()))
+                       .union(*extra_events_queries))
         if before:
             event_query = event_query.filter(Event.start_dt < before)
         if after:
             event_query = event_query.filter(Event.start_dt >= after)
-        self.events = event_query.all()
+        # future events are loaded starting with the closest ones, but like all
+        # other events they are displayed with the most recent ones on top
+        self.descending = before is not None
+        self.events, self.next_cursor = get_event_list_page(event_query, self.category.tzinfo, self.page_size,
+                                                            cursor=request.args.get('cursor'),
+                                                            descending=self.descending)
+        if not self.descending:
+            self.events.reverse()
 
     def _process(self):
         tpl = get_template_module('categories/display/event_list.html')
@@ -317,7 +325,7 @@ class RHEventList(RHDisplayCategoryEventsBase):
                                     format_event_date=make_format_event_date_func(self.category),
                                     is_recent=make_is_recent_func(self.now),
                                     happening_now=make_happening_now_func(self.now))
-        return jsonify_data(flash=False, html=html)
+        return jsonify_data(flash=False, html=html, cursor=self.next_cursor)
 
 
 class RHShowEventsInCategoryBase(RHDisplayCategoryBase):
@@ -586,84 +594,46 @@ class RHCategoryCalendarViewEvents(RHDisplayCategoryBase):
             raise BadRequest(str(e))
 
     def _process(self):
-        query = (Event.query
-                 .filter(Event.starts_between(self.start_dt, self.end_dt),
-                         Event.is_visible_in(self.category.id),
-                         ~Event.is_deleted)
-                 .options(undefer(Event.detailed_category_chain),
-                          selectinload('own_room'),
-                          load_only('id', 'title', 'start_dt', 'end_dt', 'category_id', 'own_venue_id', 'own_room_id',
-                                    'keywords')))
-        events, categories, rooms, keywords, allowed_keywords = self._get_event_data(query)
+        events, categories, rooms = get_calendar_events(self.category, self.start_dt, self.end_dt)
+        keywords, allowed_keywords = self._process_event_data(events)
         raw_locations = Location.query.options(load_only('id', 'name')).all()
         allow_keywords = bool(allowed_keywords)
         locations = [{'title': loc.name, 'id': loc.id} for loc in raw_locations]
-        ongoing_events = (Event.query
-                          .filter(Event.is_visible_in(self.category.id),
-                                  ~Event.is_deleted,
-                                  Event.start_dt < self.start_dt,
-                                  Event.end_dt > self.end_dt)
-                          .options(load_only('id', 'title', 'start_dt', 'end_dt', 'timezone'))
-                          .order_by(Event.title)
-                          .all())
-        return jsonify_data(flash=False, events=events, categories=categories, locations=locations, rooms=rooms,
-                            keywords=keywords, allow_keywords=allow_keywords,
-                            group_by=self.group_by.name,
-                            ongoing_event_count=len(ongoing_events),
-                            ongoing_events_html=self._render_ongoing_events(ongoing_events))
-
-    def _find_nearest_category(self, category_chain):
-        for index, category_data in enumerate(category_chain):
-            if category_data['id'] == self.category.id:
-                if index == len(category_chain) - 1:
-                    return category_data
-                else:
-                    return category_chain[index + 1]
-        # this should never happen
-        raise Exception(f'Category {self.category.id} not found in category chain')
-
-    def _get_event_data(self, event_query):
+        ongoing_events = get_ongoing_calendar_events(self.category, self.start_dt, self.end_dt)
+        response = jsonify_data(flash=False, events=events, categories=categories, locations=locations, rooms=rooms,
+                                keywords=keywords, allow_keywords=allow_keywords,
+                                group_by=self.group_by.name,
+                                ongoing_event_count=len(ongoing_events),
+                                ongoing_events_html=self._render_ongoing_events(ongoing_events))
+        # the calendar is polled whenever the user navigates in it, so we let the
+        # browser revalidate its copy instead of sending the same data again
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.add_etag()
+        return response.make_conditional(request)
+
+    def _process_event_data(self, events):
         def calculate_keyword_id(kw):
             # we add 3 in order not to collide with special items with ids 0 and 1
             return crc32(kw) + 3
 
-        data = []
-        categories = {}
-        rooms = {}
         keywords = {}
         allowed_keywords = global_event_settings.get('allowed_event_keywords')
         allowed_keywords_set = set(allowed_keywords)
-        tz = self.category.display_tzinfo
-        for event in event_query:
-            valid_keywords = [keyword for keyword in event.keywords if keyword in allowed_keywords_set]
+        for event_data in events:
+            valid_keywords = [keyword for keyword in event_data['keywords'] if keyword in allowed_keywords_set]
             for keyword in valid_keywords:
                 keyword_id = calculate_keyword_id(keyword)
                 if keyword_id not in keywords:
                     keywords.setdefault(keyword_id, {'id': keyword_id, 'title': keyword,
                                                      'color': f'#{generate_contrast_colors(keyword_id).background}'})
-            category_data = self._find_nearest_category(event.detailed_category_chain)
-            category_id = category_data['id']
-            category_data['url'] = url_for('categories.calendar', category_id=category_id)
-            room = event.room
-            if room and room.id not in rooms:
-                rooms[room.id] = {'id': room.id,
-                                  'title': room.full_name,
-                                  'venueId': room.location_id}
-            event_data = {'title': event.title,
-                          'start': event.start_dt.astimezone(tz).replace(tzinfo=None).isoformat(),
-                          'end': event.end_dt.astimezone(tz).replace(tzinfo=None).isoformat(),
-                          'url': event.url,
-                          'categoryId': category_id,
-                          'venueId': event.own_venue_id,
-                          'keywords': event.keywords,
-                          'validKeywords': valid_keywords,
-                          'roomId': room.id if room else None}
+            event_data['validKeywords'] = valid_keywords
             if self.group_by == self.GroupBy.category:
-                colors = generate_contrast_colors(category_id)
+                colors = generate_contrast_colors(event_data['categoryId'])
             elif self.group_by == self.GroupBy.location:
-                colors = generate_contrast_colors(event.own_venue_id or 0)
+                colors = generate_contrast_colors(event_data['venueId'] or 0)
             elif self.group_by == self.GroupBy.room:
-                colors = generate_contrast_colors(room.id if room else 0)
+                colors = generate_contrast_colors(event_data['roomId'] or 0)
             else:
                 # by keywords
                 if not valid_keywords:
@@ -676,9 +646,7 @@ class RHCategoryCalendarViewEvents(RHDisplayCategoryBase):
                 event_data['keywordId'] = keyword_id
                 colors = generate_contrast_colors(keyword_id)
             event_data.update({'textColor': f'#{colors.text}', 'color': f'#{colors.background}'})
-            data.append(event_data)
-            categories[category_id] = category_data
-        return data, list(categories.values()), list(rooms.values()), list(keywords.values()), allowed_keywords
+        return list(keywords.values()), allowed_keywords
 
     def _render_ongoing_events(self, ongoing_events):
         template = get_template_module('categories/display/_calendar_ongoing_events.html')
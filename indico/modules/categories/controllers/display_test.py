@@ -6,11 +6,17 @@
 # LICENSE file for more details.
 
 import json
+from datetime import datetime
 
 import pytest
 from flask import request
+from pytz import utc
+from werkzeug.exceptions import BadRequest
 
-from indico.modules.categories.controllers.display import RHCategorySearch
+from indico.modules.categories.controllers.display import RHCategorySearch, RHEventList
+from indico.modules.categories.controllers.util import (decode_event_list_cursor, encode_event_list_cursor,
+                                                        get_event_list_page, get_hidden_event_ids)
+from indico.modules.events.models.events import Event
 
 
 @pytest.mark.usefixtures('request_context')
@@ -31,3 +37,73 @@ def test_deleted_category_search(dummy_category):
     data = json.loads(response.data)
     assert data['success']
     assert data['total_count'] == 0
+
+
+@pytest.fixture
+def paginated_events(create_category, create_event):
+    category = create_category(100, title='Events')
+    events = [create_event(category=category, title=f'Event {i}',
+                           start_dt=datetime(2024, month, day, 9, tzinfo=utc),
+                           end_dt=datetime(2024, month, day, 17, tzinfo=utc))
+              for i, (month, day) in enumerate([(1, 10), (2, 5), (2, 5), (2, 20), (3, 1), (5, 1)])]
+    return category, events
+
+
+def test_get_event_list_page(paginated_events):
+    category, events = paginated_events
+    query = Event.query.filter(Event.category_id == category.id)
+    # the second page would end in the middle of February, so it is extended
+    page, cursor = get_event_list_page(query, utc, 2)
+    assert page == [events[5], events[4]]
+    page, cursor = get_event_list_page(query, utc, 2, cursor=cursor)
+    assert page == [events[3], events[2], events[1]]
+    page, cursor = get_event_list_page(query, utc, 2, cursor=cursor)
+    assert page == [events[0]]
+    assert cursor is None
+    # in ascending order
+    page, cursor = get_event_list_page(query, utc, 2, descending=False)
+    assert page == [events[0], events[1], events[2], events[3]]
+    page, cursor = get_event_list_page(query, utc, 2, cursor=cursor, descending=False)
+    assert page == [events[4], events[5]]
+    assert cursor is None
+
+
+def test_event_list_cursor(dummy_event):
+    cursor = encode_event_list_cursor(dummy_event)
+    assert decode_event_list_cursor(cursor) == (dummy_event.start_dt, dummy_event.id)
+    for invalid in ('', 'foo', '20240101T000000.000000-x', '20240101T000000-1'):
+        with pytest.raises(BadRequest):
+            decode_event_list_cursor(invalid)
+
+
+def test_event_list_pagination(paginated_events, test_client, mocker):
+    category = paginated_events[0]
+    mocker.patch.object(RHEventList, 'page_size', 2)
+    resp = test_client.get(f'/category/{category.id}/event-list', query_string={'before': '2024-06'})
+    assert resp.status_code == 200
+    assert 'Event 5' in resp.json['html']
+    assert 'Event 3' not in resp.json['html']
+    resp = test_client.get(f'/category/{category.id}/event-list',
+                           query_string={'before': '2024-06', 'cursor': resp.json['cursor']})
+    assert 'Event 5' not in resp.json['html']
+    assert 'Event 3' in resp.json['html']
+    assert 'Event 1' in resp.json['html']
+    assert resp.json['cursor'] is not None
+    # future events are loaded starting with the closest ones
+    resp = test_client.get(f'/category/{category.id}/event-list', query_string={'after': '2024-01'})
+    html = resp.json['html']
+    assert html.index('Event 3') < html.index('Event 0')
+    assert 'Event 4' not in html
+
+
+def test_get_hidden_event_ids(dummy_category, create_event, create_user):
+    user = create_user(123)
+    manager = create_user(456)
+    hidden = create_event(category=dummy_category, visibility=0)
+    create_event(category=dummy_category)
+    hidden.update_principal(manager, full_access=True)
+    assert get_hidden_event_ids(dummy_category, user) == {hidden.id}
+    assert get_hidden_event_ids(dummy_category, manager) == set()
+    # hiding another event is taken into account immediately
+    other = create_event(category=dummy_category, visibility=0)
+    assert get_hidden_event_ids(dummy_category, user) == {hidden.id, other.id}
@@ -5,14 +5,17 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-from datetime import date
+from datetime import date, datetime, timedelta
 from itertools import groupby
 from operator import attrgetter
 
 from dateutil.relativedelta import relativedelta
 from flask import session
+from pytz import utc
+from werkzeug.exceptions import BadRequest
 
 from indico.core import signals
+from indico.core.cache import make_scoped_cache
 from indico.core.db import db
 from indico.modules.categories.models.event_move_request import MoveRequestState
 from indico.modules.events.models.events import Event
@@ -20,9 +23,13 @@ from indico.modules.events.util import serialize_events_for_json_ld
 from indico.util.date_time import format_date, format_skeleton
 from indico.util.i18n import _
 from indico.util.signals import values_from_signal
+from indico.util.string import crc32
 from indico.web.flask.util import url_for
 
 
+_hidden_events_cache = make_scoped_cache('category-hidden-events')
+
+
 def group_by_month(events, now, tzinfo):
     def _format_tuple(x):
         (year, month), events = x
@@ -82,6 +89,86 @@ def get_event_query_filter(category, is_flat=False, hidden_event_ids=None):
     return db.and_(*criteria)
 
 
+def get_hidden_event_ids(category, user):
+    """Get the IDs of the hidden events in a category the user cannot see.
+
+    Checking whether the user can see a hidden event is expensive, so the
+    result is cached for a short time.  The cache key contains the IDs of
+    all hidden events in the category, so hiding or unhiding an event is
+    taken into account immediately.
+    """
+    hidden_event_ids = [id_ for id_, in (db.session.query(Event.id)
+                                        .filter(Event.category_id == category.id,
+                                                Event.visibility == 0,
+                                                ~Event.is_deleted)
+                                        .order_by(Event.id))]
+    if not hidden_event_ids:
+        return set()
+    fingerprint = crc32(','.join(map(str, hidden_event_ids)))
+    cache_key = f'{category.id}/{user.id if user else None}/{fingerprint}'
+    rv = _hidden_events_cache.get(cache_key)
+    if rv is None:
+        rv = {event.id for event in category.get_hidden_events(user=user)}
+        _hidden_events_cache.set(cache_key, rv, timeout=timedelta(minutes=5))
+    return rv
+
+
+def encode_event_list_cursor(event):
+    """Get a cursor pointing to an event in an event list."""
+    return f'{event.start_dt.astimezone(utc):%Y%m%dT%H%M%S.%f}-{event.id}'
+
+
+def decode_event_list_cursor(cursor):
+    """Get the start date and ID of the event a cursor points to."""
+    try:
+        start_dt, event_id = cursor.split('-')
+        return utc.localize(datetime.strptime(start_dt, '%Y%m%dT%H%M%S.%f')), int(event_id)
+    except ValueError:
+        raise BadRequest('Invalid cursor')
+
+
+def get_event_list_page(query, tzinfo, limit, cursor=None, descending=True):
+    """Get a page of events from an event list.
+
+    The events are paginated by their start date and ID, so fetching a
+    page does not get slower the further a user goes back in time.  A
+    page never ends in the middle of a month, so it may contain more
+    than `limit` events.
+
+    :param query: The query returning the events in the list
+    :param tzinfo: The timezone used to group the events by month
+    :param limit: The minimum number of events to return if available
+    :param cursor: The cursor returned with the previous page
+    :param descending: Whether to get the events in descending order,
+                       i.e. going back in time
+    :return: A tuple containing the list of events and the cursor
+             for the next page or ``None`` if it was the last page.
+    """
+    key = db.tuple_(Event.start_dt, Event.id)
+    if descending:
+        query = query.order_by(Event.start_dt.desc(), Event.id.desc())
+    else:
+        query = query.order_by(Event.start_dt, Event.id)
+
+    def _after(start_dt, event_id):
+        return (key < db.tuple_(start_dt, event_id)) if descending else (key > db.tuple_(start_dt, event_id))
+
+    if cursor is not None:
+        query = query.filter(_after(*decode_event_list_cursor(cursor)))
+    events = query.limit(limit + 1).all()
+    if len(events) <= limit:
+        return events, None
+    del events[limit:]
+    # include the remaining events of the same month
+    last = events[-1]
+    local_start_dt = last.start_dt.astimezone(tzinfo)
+    month_start = datetime(local_start_dt.year, local_start_dt.month, 1)
+    month_criterion = ((Event.start_dt >= tzinfo.localize(month_start)) if descending
+                       else (Event.start_dt < tzinfo.localize(month_start + relativedelta(months=1))))
+    events += query.filter(_after(last.start_dt, last.id), month_criterion).all()
+    return events, encode_event_list_cursor(events[-1])
+
+
 def get_category_view_params(category, now, is_flat=False):
     from .display import RHDisplayCategoryEventsBase
 
@@ -91,7 +178,7 @@ def get_category_view_params(category, now, is_flat=False):
     past_threshold = now - relativedelta(months=1, day=1, hour=0, minute=0)
     future_threshold = now + relativedelta(months=category.show_future_months+1, day=1, hour=0, minute=0)
 
-    hidden_event_ids = {e.id for e in category.get_hidden_events(user=session.user)} if not is_flat else set()
+    hidden_event_ids = get_hidden_event_ids(category, session.user) if not is_flat else set()
     event_query_filter = get_event_query_filter(category, is_flat=is_flat, hidden_event_ids=hidden_event_ids)
 
     extra_events_queries = extra_events_start_dt_queries = ()
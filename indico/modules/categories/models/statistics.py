@@ -0,0 +1,73 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from indico.core.db import db
+from indico.core.db.sqlalchemy import UTCDateTime
+from indico.util.date_time import now_utc
+from indico.util.string import format_repr
+
+
+class CategoryStatistics(db.Model):
+    """Per-year statistics of the events in a category.
+
+    Each row contains the counts for the events located directly in a
+    category (i.e. not in one of its subcategories) for a given year.
+    The statistics of a whole category tree are obtained by adding up
+    the rows of all categories in it.  The statistics of unlisted events
+    are stored without a category.
+    """
+
+    __tablename__ = 'statistics'
+    __table_args__ = (db.Index(None, 'category_id', 'year', unique=True),
+                      db.Index(None, 'year', unique=True, postgresql_where=db.text('category_id IS NULL')),
+                      {'schema': 'categories'})
+
+    id = db.Column(
+        db.Integer,
+        primary_key=True
+    )
+    category_id = db.Column(
+        db.Integer,
+        db.ForeignKey('categories.categories.id'),
+        nullable=True
+    )
+    year = db.Column(
+        db.Integer,
+        nullable=False
+    )
+    #: The number of events starting in the year
+    event_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    #: The number of events created in the year
+    created_event_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    #: The number of contributions scheduled in the year
+    contribution_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    #: The number of attachments in events starting in the year
+    attachment_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0
+    )
+    updated_dt = db.Column(
+        UTCDateTime,
+        nullable=False,
+        default=now_utc
+    )
+
+    def __repr__(self):
+        return format_repr(self, 'id', 'category_id', 'year', event_count=0, contribution_count=0, attachment_count=0)
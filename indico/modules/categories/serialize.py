@@ -11,6 +11,7 @@ from feedgen.feed import FeedGenerator
 from flask import session
 from sqlalchemy.orm import joinedload, load_only, subqueryload, undefer
 
+from indico.core.db.sqlalchemy.protection import filter_accessible
 from indico.modules.categories import Category
 from indico.modules.events import Event
 from indico.modules.events.ical import events_to_ical
@@ -84,7 +85,7 @@ def serialize_category_atom(category, url, user, event_filter):
                                 'access_key'),
                       subqueryload('acl_entries'))
              .order_by(Event.start_dt))
-    events = [e for e in query if e.can_access(user)]
+    events = filter_accessible(query, user)
 
     feed = FeedGenerator()
     feed.id(url)
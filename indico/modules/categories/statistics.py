@@ -0,0 +1,111 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Keep track of categories whose statistics need to be updated.
+
+Whenever something affecting the statistics of an event changes, its
+category is marked as outdated.  Once the change has been committed,
+the category is added to a set in Redis, and the ``category_statistics``
+task periodically updates the statistics of those categories.
+"""
+
+from redis import RedisError
+
+from indico.core import signals
+from indico.core.cache import get_redis_client
+from indico.core.db.sqlalchemy.util.session import AfterCommitQueue
+from indico.core.logger import Logger
+
+
+logger = Logger.get('categories.statistics')
+
+_PENDING_KEY = 'indico-category-stats/pending'
+#: The value used in the pending set for unlisted events
+_UNLISTED = 'unlisted'
+
+
+def _add_pending_categories(category_ids):
+    try:
+        get_redis_client().sadd(_PENDING_KEY, *(_UNLISTED if id_ is None else id_ for id_ in category_ids))
+    except RedisError:
+        logger.exception('Could not mark statistics of categories %r as outdated', category_ids)
+
+
+_outdated_categories = AfterCommitQueue('outdated_category_stats', _add_pending_categories)
+
+
+def connect_statistics_signals():
+    _outdated_categories.connect()
+    signals.event.created.connect(_event_changed)
+    signals.event.deleted.connect(_event_changed)
+    signals.event.restored.connect(_event_changed)
+    signals.event.updated.connect(_event_changed)
+    signals.event.imported.connect(_event_changed)
+    signals.event.moved.connect(_event_moved)
+    signals.event.times_changed.connect(_times_changed)
+    signals.event.timetable_entry_created.connect(_object_changed)
+    signals.event.timetable_entry_updated.connect(_object_changed)
+    signals.event.timetable_entry_deleted.connect(_object_changed)
+    signals.event.contribution_created.connect(_object_changed)
+    signals.event.contribution_deleted.connect(_object_changed)
+    signals.event.subcontribution_deleted.connect(_object_changed)
+    signals.event.session_deleted.connect(_object_changed)
+    signals.attachments.folder_deleted.connect(_object_changed)
+    signals.attachments.attachment_created.connect(_attachment_changed)
+    signals.attachments.attachment_deleted.connect(_attachment_changed)
+
+
+def mark_category_stats_outdated(category_id):
+    """Mark the statistics of a category as outdated.
+
+    :param category_id: The ID of the category, or ``None`` for unlisted
+                        events.
+    """
+    _outdated_categories.add(category_id)
+
+
+def _mark_event(event):
+    if event is not None:
+        mark_category_stats_outdated(event.category_id)
+
+
+def _event_changed(event, **kwargs):
+    _mark_event(event)
+
+
+def _event_moved(event, old_parent, **kwargs):
+    _mark_event(event)
+    mark_category_stats_outdated(old_parent.id if old_parent else None)
+
+
+def _times_changed(sender, obj, **kwargs):
+    _mark_event(obj.event)
+
+
+def _object_changed(obj, **kwargs):
+    _mark_event(obj.event)
+
+
+def _attachment_changed(attachment, **kwargs):
+    _mark_event(attachment.folder.event)
+
+
+def pop_outdated_categories():
+    """Get the categories whose statistics need to be updated.
+
+    The categories are removed from the pending set, so they need to be
+    updated by the caller.
+
+    :return: A set of category IDs, which contains ``None`` if the
+             statistics of unlisted events are outdated.
+    """
+    client = get_redis_client()
+    with client.pipeline() as pipe:
+        pipe.smembers(_PENDING_KEY)
+        pipe.delete(_PENDING_KEY)
+        category_ids = pipe.execute()[0]
+    return {None if id_ == _UNLISTED.encode() else int(id_) for id_ in category_ids}
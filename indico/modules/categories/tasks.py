@@ -13,6 +13,9 @@ from indico.core.celery import celery
 from indico.core.config import config
 from indico.core.db import db
 from indico.modules.categories import Category, logger
+from indico.modules.categories.models.statistics import CategoryStatistics
+from indico.modules.categories.statistics import pop_outdated_categories
+from indico.modules.categories.util import rebuild_category_statistics, update_category_statistics
 from indico.modules.users import User, UserSetting
 from indico.modules.users.models.suggestions import SuggestedCategory
 from indico.modules.users.util import get_related_categories
@@ -73,3 +76,23 @@ def category_cleanup():
             if i % 100 == 0:
                 db.session.commit()
         db.session.commit()
+
+
+@celery.periodic_task(name='category_statistics', run_every=crontab(minute='*/5'))
+def category_statistics():
+    category_ids = pop_outdated_categories()
+    if not CategoryStatistics.query.has_rows():
+        # the statistics have never been calculated, so we need to do it for all categories
+        logger.info('Calculating statistics for all categories')
+        rebuild_category_statistics()
+    elif category_ids:
+        logger.debug('Updating statistics for categories %r', category_ids)
+        update_category_statistics(category_ids)
+    db.session.commit()
+
+
+@celery.periodic_task(name='category_statistics_rebuild', run_every=crontab(minute='30', hour='3'))
+def category_statistics_rebuild():
+    # just in case some changes were not picked up by the signals
+    rebuild_category_statistics()
+    db.session.commit()
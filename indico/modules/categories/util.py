@@ -18,6 +18,8 @@ from indico.core.db.sqlalchemy.protection import ProtectionMode
 from indico.modules.attachments import Attachment
 from indico.modules.attachments.models.folders import AttachmentFolder
 from indico.modules.categories import upcoming_events_settings
+from indico.modules.categories.models.categories import Category
+from indico.modules.categories.models.statistics import CategoryStatistics
 from indico.modules.events import Event
 from indico.modules.events.contributions import Contribution
 from indico.modules.events.contributions.models.subcontributions import SubContribution
@@ -90,33 +92,36 @@ def get_attachment_count(category_id=None):
     :return: The number of attachments
     """
     category_filter = Event.category_chain_overlaps(category_id) if category_id else True
-    subcontrib_contrib = db.aliased(Contribution)
-    query = (db.session
-             .query(db.func.count(Attachment.id))
-             .join(Attachment.folder)
-             .join(AttachmentFolder.event)
-             .outerjoin(AttachmentFolder.session)
-             .outerjoin(AttachmentFolder.contribution)
-             .outerjoin(AttachmentFolder.subcontribution)
-             .outerjoin(subcontrib_contrib, subcontrib_contrib.id == SubContribution.contribution_id)
-             .filter(AttachmentFolder.link_type != LinkType.category,
-                     ~Attachment.is_deleted,
-                     ~AttachmentFolder.is_deleted,
-                     ~Event.is_deleted,
-                     # we have exactly one of those or none if the attachment is on the event itself
-                     ~db.func.coalesce(Session.is_deleted, Contribution.is_deleted, SubContribution.is_deleted, False),
-                     # in case of a subcontribution we also need to check that the contrib is not deleted
-                     (subcontrib_contrib.is_deleted.is_(None) | ~subcontrib_contrib.is_deleted),
-                     category_filter))
-    return query.scalar()
-
+    return _query_attachments(db.func.count(Attachment.id)).filter(category_filter).scalar()
 
-@memoize_redis(86400)
-def get_category_stats(category_id=None):
-    """Get category statistics.
 
-    This function is mainly a helper so we can get and cache
-    all values at once and keep a last-update timestamp.
+def _query_attachments(*entities):
+    subcontrib_contrib = db.aliased(Contribution)
+    return (db.session
+            .query(*entities)
+            .select_from(Attachment)
+            .join(Attachment.folder)
+            .join(AttachmentFolder.event)
+            .outerjoin(AttachmentFolder.session)
+            .outerjoin(AttachmentFolder.contribution)
+            .outerjoin(AttachmentFolder.subcontribution)
+            .outerjoin(subcontrib_contrib, subcontrib_contrib.id == SubContribution.contribution_id)
+            .filter(AttachmentFolder.link_type != LinkType.category,
+                    ~Attachment.is_deleted,
+                    ~AttachmentFolder.is_deleted,
+                    ~Event.is_deleted,
+                    # we have exactly one of those or none if the attachment is on the event itself
+                    ~db.func.coalesce(Session.is_deleted, Contribution.is_deleted, SubContribution.is_deleted, False),
+                    # in case of a subcontribution we also need to check that the contrib is not deleted
+                    (subcontrib_contrib.is_deleted.is_(None) | ~subcontrib_contrib.is_deleted)))
+
+
+@memoize_redis(86400, refresh_ahead=True)
+def compute_category_stats(category_id=None):
+    """Compute category statistics from scratch.
+
+    This is slow for large categories and only used as long as the
+    :class:`CategoryStatistics` have not been populated yet.
 
     :param category_id: The category ID to get statistics for.
                         Subcategories are also included.
@@ -128,7 +133,104 @@ def get_category_stats(category_id=None):
             'min_year': get_min_year(category_id)}
 
 
-@memoize_redis(3600)
+def get_category_stats(category_id=None):
+    """Get category statistics.
+
+    The statistics are added up from the per-category statistics of
+    the category and all its subcategories, which are kept up to date
+    whenever something in an event changes.
+
+    :param category_id: The category ID to get statistics for.
+                        Subcategories are also included.
+    """
+    if not CategoryStatistics.query.has_rows():
+        return compute_category_stats(category_id)
+    query = (db.session.query(CategoryStatistics.year,
+                              db.func.sum(CategoryStatistics.event_count),
+                              db.func.sum(CategoryStatistics.created_event_count),
+                              db.func.sum(CategoryStatistics.contribution_count),
+                              db.func.sum(CategoryStatistics.attachment_count),
+                              db.func.max(CategoryStatistics.updated_dt))
+             .group_by(CategoryStatistics.year)
+             .order_by(CategoryStatistics.year))
+    if category_id:
+        cte = Category.get_tree_cte()
+        query = (query
+                 .join(cte, cte.c.id == CategoryStatistics.category_id)
+                 .filter(cte.c.path.contains([category_id])))
+    events_by_year = {}
+    contribs_by_year = {}
+    created_years = []
+    attachments = 0
+    updated = None
+    for year, events, created_events, contribs, year_attachments, updated_dt in query:
+        if events:
+            events_by_year[year] = events
+        if contribs:
+            contribs_by_year[year] = contribs
+        if created_events:
+            created_years.append(year)
+        attachments += year_attachments
+        updated = max(updated, updated_dt) if updated else updated_dt
+    return {'events_by_year': events_by_year,
+            'contribs_by_year': contribs_by_year,
+            'attachments': attachments,
+            'updated': updated or now_utc(),
+            'min_year': min(created_years, default=date.today().year)}
+
+
+def _count_by_category_year(query, dt_column, counts, key):
+    year = db.cast(db.extract('year', dt_column), db.Integer)
+    query = query.add_columns(Event.category_id, year, db.func.count()).group_by(Event.category_id, year)
+    for category_id, year, count in query:
+        counts.setdefault((category_id, year), {})[key] = count
+
+
+def update_category_statistics(category_ids):
+    """Recompute the statistics of some categories.
+
+    Only events located directly in the categories are taken into
+    account, so this is fast even for categories with many
+    subcategories.
+
+    :param category_ids: The IDs of the categories to update; ``None``
+                         updates the statistics of unlisted events.
+    """
+    category_ids = set(category_ids)
+    ids = category_ids - {None}
+    category_filter = Event.category_id.in_(ids)
+    stats_filter = CategoryStatistics.category_id.in_(ids)
+    if None in category_ids:
+        category_filter |= Event.category_id.is_(None)
+        stats_filter |= CategoryStatistics.category_id.is_(None)
+    _update_category_statistics(category_filter, stats_filter)
+
+
+def rebuild_category_statistics():
+    """Recompute the statistics of all categories."""
+    _update_category_statistics(True, True)
+
+
+def _update_category_statistics(category_filter, stats_filter):
+    counts = {}
+    events_query = db.session.query().select_from(Event).filter(~Event.is_deleted, category_filter)
+    _count_by_category_year(events_query, Event.start_dt, counts, 'event_count')
+    _count_by_category_year(events_query, Event.created_dt, counts, 'created_event_count')
+    contribs_query = (db.session.query()
+                      .select_from(TimetableEntry)
+                      .join(TimetableEntry.event)
+                      .filter(TimetableEntry.type == TimetableEntryType.CONTRIBUTION,
+                              ~Event.is_deleted,
+                              category_filter))
+    _count_by_category_year(contribs_query, TimetableEntry.start_dt, counts, 'contribution_count')
+    _count_by_category_year(_query_attachments().filter(category_filter), Event.start_dt, counts, 'attachment_count')
+    CategoryStatistics.query.filter(stats_filter).delete(synchronize_session=False)
+    db.session.add_all(CategoryStatistics(category_id=category_id, year=year, **data)
+                       for (category_id, year), data in counts.items())
+    db.session.flush()
+
+
+@memoize_redis(3600, refresh_ahead=True)
 @make_interceptable
 @materialize_iterable()
 def get_upcoming_events():
@@ -5,9 +5,17 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+from datetime import datetime
+
 import pytest
+from pytz import utc
 
-from indico.modules.categories.util import can_create_unlisted_events
+from indico.core import signals
+from indico.modules.categories.models.statistics import CategoryStatistics
+from indico.modules.categories.statistics import pop_outdated_categories
+from indico.modules.categories.util import (can_create_unlisted_events, get_attachment_count, get_category_stats,
+                                            get_contribs_by_year, get_events_by_year, get_min_year,
+                                            rebuild_category_statistics, update_category_statistics)
 from indico.modules.events.settings import unlisted_events_settings
 
 
@@ -26,3 +34,71 @@ def test_can_create_unlisted_events(dummy_user, create_user):
     unlisted_events_settings.acls.set('authorized_creators', {dummy_user})
     assert can_create_unlisted_events(dummy_user)
     assert can_create_unlisted_events(admin_user)
+
+
+@pytest.fixture
+def category_stats_data(db, dummy_user, create_category, create_event, create_contribution, create_timetable_entry,
+                        create_attachment):
+    def _dt(year):
+        return datetime(year, 6, 1, 12, 0, tzinfo=utc)
+
+    def _event(category, year, *, contribs=0, attachments=0, **kwargs):
+        event = create_event(category=category, start_dt=_dt(year), end_dt=_dt(year), **kwargs)
+        for i in range(contribs):
+            contrib = create_contribution(event, f'contrib {i}')
+            create_timetable_entry(event, contrib, _dt(year))
+        for i in range(attachments):
+            create_attachment(dummy_user, event, f'attachment {i}')
+        return event
+
+    top = create_category(1, title='top')
+    sub = create_category(2, title='sub', parent=top)
+    other = create_category(3, title='other')
+    _event(top, 2020, contribs=2, attachments=1)
+    _event(top, 2021, contribs=1)
+    _event(sub, 2021, contribs=3, attachments=2)
+    _event(sub, 2022, is_deleted=True, contribs=2, attachments=1)
+    _event(other, 2019, contribs=1, attachments=1)
+    _event(None, 2018, contribs=1)
+    db.session.flush()
+    return top, sub, other
+
+
+def _assert_stats_consistent(category_id):
+    stats = get_category_stats(category_id)
+    assert stats['events_by_year'] == get_events_by_year(category_id)
+    assert stats['contribs_by_year'] == get_contribs_by_year(category_id)
+    assert stats['attachments'] == get_attachment_count(category_id)
+    assert stats['min_year'] == get_min_year(category_id)
+
+
+def test_category_statistics(category_stats_data):
+    top, sub, other = category_stats_data
+    rebuild_category_statistics()
+    for category_id in (None, 0, top.id, sub.id, other.id):
+        _assert_stats_consistent(category_id)
+    stats = get_category_stats(top.id)
+    assert stats['events_by_year'] == {2020: 1, 2021: 2}
+    assert stats['contribs_by_year'] == {2020: 2, 2021: 4}
+    assert stats['attachments'] == 3
+    assert get_category_stats(0)['events_by_year'] == {2018: 1, 2019: 1, 2020: 1, 2021: 2}
+
+
+def test_category_statistics_update(db, dummy_user, category_stats_data):
+    top, sub, other = category_stats_data
+    rebuild_category_statistics()
+    pop_outdated_categories()
+    event = sub.events[0]
+    event.move(other)
+    signals.core.after_commit.send()
+    assert pop_outdated_categories() == {sub.id, other.id}
+    # nothing has been updated yet
+    assert get_category_stats(sub.id)['events_by_year'] == {2021: 1}
+    update_category_statistics({sub.id, other.id})
+    db.session.expire_all()
+    for category_id in (0, top.id, sub.id, other.id):
+        _assert_stats_consistent(category_id)
+    assert not CategoryStatistics.query.filter_by(category_id=sub.id).has_rows()
+    event.delete('test', dummy_user)
+    signals.core.after_commit.send()
+    assert pop_outdated_categories() == {other.id}
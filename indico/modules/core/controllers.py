@@ -5,6 +5,7 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import hmac
 from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as get_version
 from urllib.parse import urljoin, urlsplit
@@ -15,7 +16,7 @@ from packaging.version import Version
 from pytz import common_timezones_set
 from webargs import fields
 from webargs.flaskparser import abort
-from werkzeug.exceptions import NotFound, ServiceUnavailable
+from werkzeug.exceptions import NotFound, ServiceUnavailable, Unauthorized
 from werkzeug.routing import BuildError
 
 import indico
@@ -42,6 +43,7 @@ from indico.util.marshmallow import PrincipalDict, validate_with_message
 from indico.util.string import render_markdown, sanitize_html
 from indico.web.args import use_kwargs
 from indico.web.errors import load_error_data
+from indico.web.flask.profiler import get_prometheus_metrics
 from indico.web.flask.templating import get_template_module
 from indico.web.flask.util import url_for
 from indico.web.forms.base import FormDefaults
@@ -333,6 +335,24 @@ class RHConfig(RH):
                        privacy_policy_url=privacy_policy_url)
 
 
+class RHProfilingMetrics(RH):
+    """Export the aggregated request profiling data for Prometheus."""
+
+    CSRF_ENABLED = False
+    _JSON_ERRORS = True
+
+    def _check_access(self):
+        if not config.PROFILE_METRICS_TOKEN:
+            raise NotFound
+        # not using a bearer token since that one would be considered an oauth token
+        auth = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(auth.encode(), f'Token {config.PROFILE_METRICS_TOKEN}'.encode()):
+            raise Unauthorized
+
+    def _process(self):
+        return current_app.response_class(get_prometheus_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 class RHAPIGenerateCaptcha(RH):
     """Generate a CAPTCHA.
 
@@ -26,6 +26,20 @@ class AbstractListGeneratorBase(ListGeneratorBase):
     """Listing and filtering actions in an abstract list."""
 
     show_contribution_fields = True
+    _person_links_strategy = subqueryload('person_links')
+    _reviewed_for_tracks_strategy = subqueryload('reviewed_for_tracks')
+    static_item_options = {
+        # the reviewing state and the convener check need the reviewed tracks
+        'state': (_reviewed_for_tracks_strategy,),
+        'submitter': (joinedload('submitter'),),
+        'speakers': (_person_links_strategy,),
+        'authors': (_person_links_strategy,),
+        'coauthors': (_person_links_strategy,),
+        'submitted_for_tracks': (subqueryload('submitted_for_tracks'),),
+        'reviewed_for_tracks': (_reviewed_for_tracks_strategy,),
+        'accepted_contrib_type': (joinedload('accepted_contrib_type'),),
+        'submitted_contrib_type': (joinedload('submitted_contrib_type'),),
+    }
 
     def __init__(self, event):
         super().__init__(event)
@@ -96,19 +110,17 @@ class AbstractListGeneratorBase(ListGeneratorBase):
         return filters
 
     def _build_query(self):
-        return (Abstract.query
-                .with_parent(self.event)
-                .options(joinedload('submitter'),
-                         joinedload('accepted_track'),
-                         joinedload('accepted_contrib_type'),
-                         joinedload('submitted_contrib_type'),
-                         joinedload('contribution').load_only('id', 'event_id'),
-                         subqueryload('field_values'),
-                         subqueryload('submitted_for_tracks'),
-                         subqueryload('reviewed_for_tracks'),
-                         subqueryload('person_links'),
-                         subqueryload('reviews').joinedload('ratings'))
-                .order_by(Abstract.friendly_id))
+        dynamic_item_ids, static_item_ids = self._split_item_ids(self._get_config().get('items', ()), 'dynamic')
+        query = (Abstract.query
+                 .with_parent(self.event)
+                 .options(joinedload('accepted_track'),
+                          joinedload('contribution').load_only('id', 'event_id'),
+                          subqueryload('reviews').joinedload('ratings'),
+                          *self._get_static_item_options(static_item_ids))
+                 .order_by(Abstract.friendly_id))
+        if self.show_contribution_fields and dynamic_item_ids:
+            query = query.options(subqueryload('field_values'))
+        return query
 
     def _filter_list_entries(self, query, filters):
         criteria = []
@@ -190,8 +202,9 @@ class AbstractListGeneratorBase(ListGeneratorBase):
     def get_list_kwargs(self):
         list_config = self._get_config()
         abstracts_query = self._build_query()
-        total_entries = abstracts_query.count()
         abstracts = self._filter_list_entries(abstracts_query, list_config['filters']).all()
+        total_entries = (abstracts_query.count() if self._has_active_filters(list_config['filters'])
+                         else len(abstracts))
         dynamic_item_ids, static_item_ids = self._split_item_ids(list_config['items'], 'dynamic')
         static_columns = self._get_static_columns(static_item_ids)
         dynamic_columns = self._get_sorted_contribution_fields(dynamic_item_ids)
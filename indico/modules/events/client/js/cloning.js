@@ -5,6 +5,8 @@
 // modify it under the terms of the MIT License; see the
 // LICENSE file for more details.
 
+/* global handleAjaxError:false */
+
 (function(global) {
   global.setupCloneDialog = function setupCloneDialog() {
     const $formContainer = $('#event-clone-form-container');
@@ -137,4 +139,35 @@
       },
     });
   };
+
+  global.setupCloneProgress = function setupCloneProgress() {
+    const $container = $('#event-clone-progress');
+    const $progressText = $container.find('.progress-text');
+    const $errors = $('#clone-progress-errors').hide();
+
+    function poll() {
+      $.ajax({
+        url: $container.data('status-url'),
+        dataType: 'json',
+        error: handleAjaxError,
+        success(data) {
+          if (data.error) {
+            $errors
+              .show()
+              .find('.message-text')
+              .text(data.error);
+          } else if (data.finished) {
+            location.href = data.redirect;
+          } else {
+            $progressText.text(
+              $T.gettext('Created {0} of {1} events.').format(data.done, data.total)
+            );
+            setTimeout(poll, 1000);
+          }
+        },
+      });
+    }
+
+    poll();
+  };
 })(window);
@@ -5,14 +5,17 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
+from flask import session
 from pytz import timezone
 
 from indico.modules.events.management.controllers.cloning import (CloneCalculator, IntervalCloneCalculator,
                                                                   PatternCloneCalculator)
 from indico.modules.events.management.forms import CloneRepeatIntervalForm, CloneRepeatPatternForm
+from indico.modules.events.operations import clone_event_occurrences
+from indico.modules.events.tasks import set_clone_progress
 from indico.util.date_time import relativedelta
 
 
@@ -81,3 +84,36 @@ def test_dst_change(event_date, event_timezone, dummy_event):
     clone_calulator = CloneCalculator(dummy_event)
     event_local_date = clone_calulator._tzify([event_date])[0]
     assert event_local_date == timezone(event_timezone).localize(event_date)
+
+
+@pytest.mark.usefixtures('request_context')
+def test_clone_event_occurrences(dummy_event, dummy_user, dummy_attachment):
+    session.set_session_user(dummy_user)
+    dates = [dummy_event.start_dt + timedelta(weeks=n) for n in (1, 2, 3)]
+    progress = []
+    clones = clone_event_occurrences(dummy_event, dates, {'attachments'},
+                                     progress_callback=lambda done, total: progress.append((done, total)))
+    assert [c.start_dt for c in clones] == dates
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    for clone in clones:
+        attachment = clone.attachment_folders[0].attachments[0]
+        assert attachment.id != dummy_attachment.id
+        # the file is not copied but references the same stored file
+        assert attachment.file.id != dummy_attachment.file.id
+        assert attachment.file.storage_file_id == dummy_attachment.file.storage_file_id
+        assert attachment.file.size == dummy_attachment.file.size
+
+
+def test_clone_event_status(make_test_client, dummy_event, dummy_user, create_event):
+    other_event = create_event()
+    dummy_user.is_admin = True
+    set_clone_progress('task-1', dummy_event, 1, 3)
+    set_clone_progress('task-2', other_event, 1, 3)
+    with make_test_client() as client:
+        with client.session_transaction() as sess:
+            sess.set_session_user(dummy_user)
+        rv = client.get(f'/event/{dummy_event.id}/manage/clone/status/task-1')
+        assert rv.json == {'finished': False, 'done': 1, 'total': 3}
+        # the progress of another event's clone operation is not available
+        assert client.get(f'/event/{dummy_event.id}/manage/clone/status/task-2').status_code == 404
+        assert client.get(f'/event/{dummy_event.id}/manage/clone/status/task-3').status_code == 404
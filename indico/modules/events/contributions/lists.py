@@ -12,6 +12,7 @@ from flask import flash, request, session
 from sqlalchemy.orm import joinedload, subqueryload
 
 from indico.core.db import db
+from indico.core.db.sqlalchemy.protection import filter_accessible
 from indico.modules.events.contributions.models.contributions import Contribution
 from indico.modules.events.contributions.models.fields import ContributionField, ContributionFieldValue
 from indico.modules.events.contributions.models.persons import ContributionPersonLink
@@ -103,15 +104,18 @@ class ContributionListGenerator(ListGeneratorBase):
     def _build_query(self):
         timetable_entry_strategy = joinedload('timetable_entry')
         timetable_entry_strategy.lazyload('*')
-        return (Contribution.query.with_parent(self.event)
-                .order_by(Contribution.friendly_id)
-                .options(timetable_entry_strategy,
-                         joinedload('session'),
-                         subqueryload('field_values'),
-                         subqueryload('person_links'),
-                         db.undefer('subcontribution_count'),
-                         db.undefer('attachment_count'),
-                         db.undefer('is_scheduled')))
+        query = (Contribution.query.with_parent(self.event)
+                 .order_by(Contribution.friendly_id)
+                 .options(timetable_entry_strategy,
+                          joinedload('session'),
+                          subqueryload('person_links'),
+                          db.undefer('subcontribution_count'),
+                          db.undefer('attachment_count'),
+                          db.undefer('is_scheduled')))
+        # the custom field values are only needed when some of them are shown in the list
+        if self.show_custom_fields and self._split_item_ids(self._get_config().get('items', ()), 'dynamic')[0]:
+            query = query.options(subqueryload('field_values'))
+        return query
 
     def _build_registration_query(self, is_speaker=False):
         registration_join_criteria = [
@@ -220,10 +224,16 @@ class ContributionListGenerator(ListGeneratorBase):
             self.event.preload_all_acl_entries()
         list_config = self._get_config()
         contributions_query = self._build_query()
-        total_entries = (sum(1 for c in contributions_query if c.can_access(session.user)) if self.check_access else
-                         contributions_query.count())
-        contributions = [c for c in self._filter_list_entries(contributions_query, list_config['filters'])
-                         if not self.check_access or c.can_access(session.user)]
+        contributions = list(self._filter_list_entries(contributions_query, list_config['filters']))
+        if self.check_access:
+            contributions = filter_accessible(contributions, session.user)
+        if not self._has_active_filters(list_config['filters']):
+            total_entries = len(contributions)
+        elif self.check_access:
+            # checking access does not need any of the data shown in the list
+            total_entries = len(filter_accessible(Contribution.query.with_parent(self.event), session.user))
+        else:
+            total_entries = contributions_query.count()
         sessions = [{'id': s.id, 'title': s.title, 'colors': s.colors} for s in self.event.sessions]
         tracks = [{'id': int(t.id), 'title': t.title_with_group} for t in self.event.tracks]
         total_duration = (sum((c.duration for c in contributions), timedelta()),
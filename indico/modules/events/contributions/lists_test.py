@@ -70,3 +70,18 @@ def test_filter_contrib_entries(app, dummy_event, create_user, create_contributi
     assert result['contribs'] == [
         unregistered_speaker_registered_author_contribution
     ]
+
+
+def test_contrib_list_total_entries(app, dummy_event, create_contribution, create_session):
+    session = create_session(dummy_event, 'Session')
+    contrib = create_contribution(dummy_event, 'Contribution')
+    session_contrib = create_contribution(dummy_event, 'Session contribution', session=session)
+    with app.test_request_context():
+        list_gen = ContributionListGenerator(dummy_event)
+        result = list_gen.get_list_kwargs()
+        assert result['contribs'] == [contrib, session_contrib]
+        assert result['total_entries'] == 2
+        list_gen.list_config['filters'] = {'items': {'session': [None]}}
+        result = list_gen.get_list_kwargs()
+        assert result['contribs'] == [contrib]
+        assert result['total_entries'] == 2
@@ -16,7 +16,6 @@ from collections import defaultdict
 from datetime import date, datetime
 from importlib import import_module
 from io import BytesIO
-from itertools import batched
 from operator import attrgetter, itemgetter
 from uuid import uuid4
 
@@ -50,11 +49,20 @@ from indico.modules.users.util import get_user_by_email
 from indico.util.console import cformat, verbose_iterator
 from indico.util.date_time import now_utc
 from indico.util.fs import secure_filename
-from indico.util.iterables import materialize_iterable
 from indico.util.string import strict_str
 
 
-CURRENT_EXPORT_VERSION = 2  # only bump this for backwards-incompatible changes to the export format itself
+CURRENT_EXPORT_VERSION = 3  # only bump this for backwards-incompatible changes to the export format itself
+#: Older export versions which can still be imported.  Version 2 archives have the same format,
+#: but their objects are not stored in import order.
+LEGACY_EXPORT_VERSIONS = frozenset({2})
+#: The maximum number of objects stored in each data file of the archive
+OBJECTS_PER_FILE = 5000
+#: The number of rows inserted at once for rows which are not referenced by any other row
+INSERT_BATCH_SIZE = 1000
+#: Tables whose rows are stored in separate data files that are imported after all the other ones,
+#: since they may reference ids from other objects but are never referenced themselves
+LOG_TABLES = frozenset({'categories.logs', 'events.logs'})
 _notset = object()
 _skip = object()
 
@@ -113,7 +121,7 @@ def export_event(event_or_category, target_file, *, keep_uuids=False, use_pickle
 
 
 def import_event(source_file, category_id=0, create_users=None, create_affiliations=None, verbose=False, force=False,
-                 skip_external_files=False):
+                 skip_external_files=False, checkpoint_file=None):
     """Import a previously-exported event/category.
 
     It is up to the caller of this function to commit the transaction.
@@ -131,10 +139,14 @@ def import_event(source_file, category_id=0, create_users=None, create_affiliati
     :param force: Whether to ignore database version conflicts.
     :param skip_external_files: Whether to skip copying external files, and write
                                 them to the file mapping instead.
+    :param checkpoint_file: A `Path` used to keep track of the progress of the import.
+                            When set, the transaction is committed after each data file
+                            of the archive, and if the file already exists, the import is
+                            resumed from the state stored in it.
     :return: The imported event/category, the ID mapping and the file mapping.
     """
     importer = EventImporter(source_file, category_id, create_users, create_affiliations, verbose, force,
-                             skip_external_files)
+                             skip_external_files, checkpoint_file)
     event_or_category = importer.deserialize()
     return event_or_category, dict(importer.source_id_map), list(importer.files_to_copy)
 
@@ -278,6 +290,7 @@ class EventExporter:
         self.spec = self._load_spec()
         self.users = {}
         self.affiliations = {}
+        self.num_object_files = 0
 
     def _fetch_categories(self):
         if not isinstance(self.obj, Category):
@@ -295,29 +308,52 @@ class EventExporter:
 
     def serialize(self):
         model = type(self.obj)
-        all_objects = list(self._serialize_objects(model.__table__, model.id == self.obj.id, is_root_object=True))
+        # objects are added to the archive as soon as there are enough of them to fill a data
+        # file, so we never need to keep all of them in memory.  log entries are stored in their
+        # own data files since they need to be imported after everything else
+        object_files = []
+        log_files = []
+        objects = []
+        log_objects = []
+        for obj in self._serialize_objects(model.__table__, model.id == self.obj.id, is_root_object=True):
+            if obj[0] in LOG_TABLES:
+                log_objects.append(obj)
+                if len(log_objects) == OBJECTS_PER_FILE:
+                    log_files.append(self._add_objects_file(log_objects))
+                    log_objects = []
+            else:
+                objects.append(obj)
+                if len(objects) == OBJECTS_PER_FILE:
+                    object_files.append(self._add_objects_file(objects))
+                    objects = []
+        if objects:
+            object_files.append(self._add_objects_file(objects))
+        if log_objects:
+            log_files.append(self._add_objects_file(log_objects))
         metadata = {
             'timestamp': now_utc(),
             'export_version': CURRENT_EXPORT_VERSION,
             'indico_version': indico.__version__,
             'db_version': _get_alembic_version(),
             'dummy_files': self.dummy_files,
-            'object_files': [],
+            'object_files': object_files + log_files,
             'external_storage_backends': sorted(self.used_storage_backends),
             'users': self.users,
             'affiliations': self.affiliations,
         }
-        for i, objects in enumerate(batched(all_objects, 5000), 1):
-            object_data = self.backend.dump(objects)
-            filename = f'objects-{i}.{self.backend.ext}'
-            metadata['object_files'].append(filename)
-            self._add_file(filename, len(object_data), object_data)
         dumped_metadata = self.backend.dump(metadata)
         self._add_file(f'data.{self.backend.ext}', len(dumped_metadata), dumped_metadata)
         dumped_ids = self.backend.dump(dict(self.orig_ids))
         self._add_file(f'ids.{self.backend.ext}', len(dumped_ids), dumped_ids)
         self.archive.close()
 
+    def _add_objects_file(self, objects):
+        self.num_object_files += 1
+        filename = f'objects-{self.num_object_files}.{self.backend.ext}'
+        object_data = self.backend.dump(tuple(objects))
+        self._add_file(filename, len(object_data), object_data)
+        return filename
+
     def _load_spec(self):
         def _process_tablespec(tablename, tablespec):
             tablespec.setdefault('cols', {})
@@ -516,12 +552,7 @@ class EventExporter:
             rows = _exec_custom(spec['python_order'], ROWS=rows)['rows']
         cascaded = []
         cat_role = ('category_role',) if self.categories else ()
-        if spec['show_progress'] and len(rows) > 1:
-            rows_iter = verbose_iterator(rows, len(rows), get_id=attrgetter('id'), get_title=attrgetter('title'),
-                                         print_every=1, print_total_time=True)
-        else:
-            rows_iter = iter(rows)
-        for row in rows_iter:
+        for row in rows:
             if spec['skipif'] and eval(spec['skipif'], _make_globals(ROW=row, CAT_ROLE=cat_role)):  # noqa: S307
                 continue
             rowdict = row._asdict()
@@ -582,29 +613,36 @@ class EventExporter:
                 new_scope = False
                 scope = parent_scope
             assert scope is not None
+            # a row defining a new scope comes first, since its ID is needed when
+            # importing the files of any other object in that scope
+            if new_scope:
+                yield table.fullname, (new_scope, scope), data
             # export objects referenced in outgoing FKs before the row
             # itself as the FK column might not be nullable
             for col, fk in spec['fks_out'].items():
                 value = rowdict[col]
                 yield from self._serialize_objects(fk.table, value == fk, parent_scope=scope)
-            yield table.fullname, (new_scope, scope), data
-            # serialize objects referencing the current row, but don't export them yet
-            for col, fks in spec['fks'].items():
-                value = rowdict[col]
-                cascaded += [
-                    x
-                    for fk in fks
-                    for x in self._serialize_objects(fk.table, value == fk, parent_scope=scope)
-                ]
+            if not new_scope:
+                yield table.fullname, (new_scope, scope), data
+            # remember the row so we can serialize objects referencing it later
+            cascaded.append((rowdict, scope))
         # we only add incoming fks after being done with all objects in case one
         # of the referenced objects references another object from the current table
-        # that has not been serialized yet (e.g. abstract reviews proposing as duplicate)
-        yield from cascaded
+        # that has not been serialized yet (e.g. abstract reviews proposing as duplicate).
+        # they are serialized lazily so we never need to keep a whole subtree in memory
+        if spec['show_progress'] and len(cascaded) > 1:
+            cascaded = verbose_iterator(cascaded, len(cascaded), get_id=lambda x: x[0]['id'],
+                                        get_title=lambda x: x[0]['title'], print_every=1, print_total_time=True)
+        for rowdict, scope in cascaded:
+            for col, fks in spec['fks'].items():
+                value = rowdict[col]
+                for fk in fks:
+                    yield from self._serialize_objects(fk.table, value == fk, parent_scope=scope)
 
 
 class EventImporter:
     def __init__(self, source_file, category_id=0, create_users=None, create_affiliations=None, verbose=False,
-                 force=False, skip_external_files=False):
+                 force=False, skip_external_files=False, checkpoint_file=None):
         self.source_file = source_file
         self.category_id = category_id
         self.create_users = create_users
@@ -631,6 +669,9 @@ class EventImporter:
         self.spec = self._load_spec()
         self.deferred_idrefs = defaultdict(set)
         self.files_to_copy = set()
+        self.pending_inserts = defaultdict(list)
+        self.checkpoint_file = checkpoint_file
+        self.num_imported_files = 0
 
     def _load_spec(self):
         def _resolve_col_name(col):
@@ -776,17 +817,80 @@ class EventImporter:
             else:
                 click.secho('Skipping missing affiliations', fg='magenta')
 
-    @materialize_iterable()
-    def _load_objects(self, data):
-        filenames = data['object_files']
+    def _load_checkpoint(self):
+        """Load the checkpoint of a previous import that has been interrupted."""
+        if self.checkpoint_file is None or not self.checkpoint_file.exists():
+            return None
+        with self.checkpoint_file.open('rb') as f:
+            return pickle.load(f)  # noqa: S301
+
+    def _restore_checkpoint(self, checkpoint):
+        self.num_imported_files = checkpoint['num_imported_files']
+        self.id_map = checkpoint['id_map']
+        self.scope_id_map = checkpoint['scope_id_map']
+        self.user_map = checkpoint['user_map']
+        self.affiliation_map = checkpoint['affiliation_map']
+        self.top_level = checkpoint['top_level']
+        self.source_id_map.update(checkpoint['source_id_map'])
+        self.files_to_copy = checkpoint['files_to_copy']
+
+    def _save_checkpoint(self):
+        """Commit the data imported so far and record the progress.
+
+        This is only possible when there are no pending deferred ID
+        references, since those are not stored in the checkpoint and the
+        rows containing them may be incomplete.
+        """
+        if self.deferred_idrefs:
+            return
+        checkpoint = {
+            'timestamp': self.data['timestamp'],
+            'num_imported_files': self.num_imported_files,
+            'id_map': self.id_map,
+            'scope_id_map': self.scope_id_map,
+            'user_map': self.user_map,
+            'affiliation_map': self.affiliation_map,
+            'top_level': self.top_level,
+            'source_id_map': dict(self.source_id_map),
+            'files_to_copy': self.files_to_copy,
+        }
+        tmp_path = self.checkpoint_file.with_name(f'.{self.checkpoint_file.name}.{os.getpid()}.tmp')
+        tmp_path.write_bytes(pickle.dumps(checkpoint))
+        db.session.commit()
+        tmp_path.replace(self.checkpoint_file)
+
+    def _import_objects_file(self, filename):
+        for tablename, (new_scope, scope), tabledata in self.backend.load(self.archive.extractfile(filename)):
+            self._deserialize_object(db.metadata.tables[tablename], tabledata, scope, new_scope,
+                                     is_top_level=(self.top_level is None))
+        self._flush_inserts()
+        self.num_imported_files += 1
+        if self.checkpoint_file is not None:
+            self._save_checkpoint()
+
+    def _import_legacy_objects(self):
+        """Import the objects of an archive which are not stored in import order.
+
+        All objects need to be loaded and sorted first, with those defining
+        a new scope first and log entries last.
+        """
+        filenames = self.data['object_files']
         click.echo('Loading data files')
-        it = verbose_iterator(filenames, len(filenames), get_title=lambda x: x, print_every=1, print_total_time=True)
-        for filename in it:
-            yield from self.backend.load(self.archive.extractfile(filename))
+        objects = [obj
+                   for filename in verbose_iterator(filenames, len(filenames), get_title=lambda x: x, print_every=1,
+                                                    print_total_time=True)
+                   for obj in self.backend.load(self.archive.extractfile(filename))]
+        objects.sort(key=lambda x: (not x[1][0], x[0] in LOG_TABLES))
+        click.echo('Importing data')
+        for tablename, (new_scope, scope), tabledata in verbose_iterator(objects, len(objects),
+                                                                         print_total_time=True):
+            self._deserialize_object(db.metadata.tables[tablename], tabledata, scope, new_scope,
+                                     is_top_level=(self.top_level is None))
+        self._flush_inserts()
 
     def deserialize(self) -> Event | Category | None:
         export_version = self.data.get('export_version', 1)
-        if export_version != CURRENT_EXPORT_VERSION:
+        if export_version != CURRENT_EXPORT_VERSION and export_version not in LEGACY_EXPORT_VERSIONS:
             click.secho(f'Unsupported data format: Expected version {CURRENT_EXPORT_VERSION}, but import archive is '
                         f'version {export_version}', fg='red')
             return None
@@ -804,22 +908,33 @@ class EventImporter:
                 click.secho('This instance is not running in debug mode, use --force if you really want to import '
                             'an archive with dummy file content', fg='yellow')
                 return None
+        legacy = export_version in LEGACY_EXPORT_VERSIONS
+        if legacy and self.checkpoint_file is not None:
+            click.secho(f'Resuming imports is not supported for archives with version {export_version}', fg='red')
+            return None
+        if (checkpoint := self._load_checkpoint()) is not None and checkpoint['timestamp'] != self.data['timestamp']:
+            click.secho('The checkpoint file belongs to the import of a different archive', fg='red')
+            return None
         self._setup_external_storage(self.data)
-        self._load_affiliations(self.data)
-        self._load_users(self.data)
-        objects = self._load_objects(self.data)
-        objects = sorted(objects, key=lambda x: (
-            # Import objects that define a new scope first, since their IDs may be needed to generate
-            # storage file IDs
-            not x[1][0],
-            # Import log entries last, since they may reference ids from other objects but will never
-            # be referenced themselves. And by putting them last we avoid having deferred idrefs
-            x[0] in ('categories.logs', 'events.logs')
-        ))
-        click.echo('Importing data')
-        objects_iter = verbose_iterator(objects, len(objects), print_total_time=True)
-        for i, (tablename, (new_scope, scope), tabledata) in enumerate(objects_iter):
-            self._deserialize_object(db.metadata.tables[tablename], tabledata, scope, new_scope, is_top_level=(i == 0))
+        if checkpoint is not None:
+            self._restore_checkpoint(checkpoint)
+            click.secho(f'Resuming import after {self.num_imported_files} data files', fg='magenta')
+        else:
+            self._load_affiliations(self.data)
+            self._load_users(self.data)
+        # The objects are stored in the order in which they need to be imported: Objects defining a
+        # new scope come before anything inside that scope since their IDs may be needed to generate
+        # storage file IDs, and log entries are in the last files since they may reference ids from
+        # other objects but will never be referenced themselves.  This way we only need to keep one
+        # data file in memory, and avoid having deferred idrefs for log entries.
+        if legacy:
+            self._import_legacy_objects()
+        else:
+            click.echo('Importing data')
+            filenames = self.data['object_files'][self.num_imported_files:]
+            for filename in verbose_iterator(filenames, len(filenames), get_title=lambda x: x, print_every=1,
+                                             print_total_time=True):
+                self._import_objects_file(filename)
         if self.deferred_idrefs:
             # Any reference to an ID that was exported need to be replaced
             # with an actual ID at some point - either immediately (if the
@@ -1069,6 +1184,11 @@ class EventImporter:
         if self.verbose and table.fullname in self.spec['verbose']:
             fmt = self.spec['verbose'][table.fullname]
             click.echo(fmt.format(**insert_values))
+        if set_idref is None and not deferred_idrefs and not new_scope and not is_top_level:
+            # nothing references this row and we do not need its ID, so it
+            # can be inserted together with other rows of the same table
+            self._queue_insert(table, insert_values)
+            return
         res = db.session.execute(table.insert(), insert_values)
         if set_idref is not None:
             # if a column was marked as having incoming FKs, store
@@ -1085,6 +1205,17 @@ class EventImporter:
             # later once the ID is available
             self.deferred_idrefs[uuid].add((table, col, _get_inserted_pk(res)))
 
+    def _queue_insert(self, table, values):
+        rows = self.pending_inserts[(table, frozenset(values))]
+        rows.append(values)
+        if len(rows) >= INSERT_BATCH_SIZE:
+            self._flush_inserts()
+
+    def _flush_inserts(self):
+        for (table, __), rows in self.pending_inserts.items():
+            db.session.execute(table.insert(), rows)
+        self.pending_inserts.clear()
+
     def _set_idref(self, uuid, id_, fullname):
         if self.source_ids is not None:
             self.source_id_map[fullname][self.source_ids[fullname][uuid]] = id_
@@ -16,8 +16,9 @@ import yaml
 
 from indico.modules.attachments.util import get_attached_items
 from indico.modules.events.contributions import Contribution
-from indico.modules.events.export import export_event, import_event
+from indico.modules.events.export import EventImporter, export_event, import_event
 from indico.modules.events.sessions import Session
+from indico.modules.logs.models.entries import EventLogRealm, LogKind
 from indico.testing.util import assert_yaml_snapshot
 from indico.util.date_time import as_utc
 
@@ -119,8 +120,10 @@ def test_event_attachment_export(db, dummy_event):
         assert tarf.extractfile('00000000-0000-4000-8000-000000000013').read() == b'hello world'
 
 
-def test_event_import(db, dummy_user):
+@pytest.mark.parametrize('export_version', (2, 3))
+def test_event_import(db, dummy_user, export_version):
     data_yaml_content = (Path(__file__).parent / 'tests' / 'export_test_2.yaml').read_text()
+    data_yaml_content = data_yaml_content.replace('export_version: 3', f'export_version: {export_version}')
     objects_yaml_content = (Path(__file__).parent / 'tests' / 'export_test_2_objects.yaml').read_text()
     data_yaml = BytesIO(data_yaml_content.encode())
     objects_yaml = BytesIO(objects_yaml_content.encode())
@@ -158,3 +161,48 @@ def test_event_import(db, dummy_user):
     assert attachment.title == 'dummy_attachment'
     # Check that the actual file is accessible
     assert attachment.file.open().read() == b'hello world'
+
+
+class _ImportInterrupted(Exception):
+    pass
+
+
+def test_event_import_resume(db, dummy_event, create_contribution, monkeypatch, tmp_path):
+    monkeypatch.setattr('indico.modules.events.export.OBJECTS_PER_FILE', 2)
+    contribs = [create_contribution(dummy_event, f'c{i}') for i in range(4)]
+    dummy_event.log(EventLogRealm.management, LogKind.positive, 'Contributions', 'Contribution created',
+                    meta={'contribution_id': contribs[0].id})
+    db.session.flush()
+
+    f = BytesIO()
+    export_event(dummy_event, f)
+    f.seek(0)
+    with tarfile.open(fileobj=f) as tarf:
+        data = yaml.unsafe_load(tarf.extractfile('data.yaml'))
+        assert data['object_files'] == ['objects-1.yaml', 'objects-2.yaml', 'objects-3.yaml', 'objects-4.yaml']
+        # the event comes first, the log entries last
+        assert yaml.unsafe_load(tarf.extractfile('objects-1.yaml'))[0][0] == 'events.events'
+        assert {x[0] for x in yaml.unsafe_load(tarf.extractfile('objects-4.yaml'))} == {'events.logs'}
+
+    import_objects_file = EventImporter._import_objects_file
+
+    def _interrupted_import_objects_file(self, filename):
+        if self.num_imported_files == 2:
+            raise _ImportInterrupted
+        import_objects_file(self, filename)
+
+    checkpoint_file = tmp_path / 'checkpoint'
+    monkeypatch.setattr(EventImporter, '_import_objects_file', _interrupted_import_objects_file)
+    f.seek(0)
+    with pytest.raises(_ImportInterrupted):
+        import_event(f, create_users=False, checkpoint_file=checkpoint_file)
+    assert checkpoint_file.exists()
+
+    monkeypatch.setattr(EventImporter, '_import_objects_file', import_objects_file)
+    f.seek(0)
+    event = import_event(f, create_users=False, checkpoint_file=checkpoint_file)[0]
+    assert event != dummy_event
+    assert sorted(c.title for c in event.contributions) == ['c0', 'c1', 'c2', 'c3']
+    imported_contrib = next(c for c in event.contributions if c.title == 'c0')
+    log_entry = next(e for e in event.log_entries if e.module == 'Contributions')
+    assert log_entry.meta == {'contribution_id': imported_contrib.id}
@@ -50,6 +50,7 @@ _bp.add_url_rule('/privacy', 'privacy_dashboard', privacy.RHEventPrivacy, method
 # Cloning
 _bp.add_url_rule('/clone', 'clone', cloning.RHCloneEvent, methods=('GET', 'POST'))
 _bp.add_url_rule('/clone/preview', 'clone_preview', cloning.RHClonePreview, methods=('GET', 'POST'))
+_bp.add_url_rule('/clone/status/<task_id>', 'clone_status', cloning.RHCloneEventStatus)
 _bp.add_url_rule('/import', 'import', cloning.RHImportFromEvent, methods=('GET', 'POST'))
 _bp.add_url_rule('/import/event-details', 'import_event_details', cloning.RHImportEventDetails, methods=('POST',))
 # Posters
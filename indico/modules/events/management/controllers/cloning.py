@@ -6,10 +6,11 @@
 # LICENSE file for more details.
 
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 from dateutil import rrule
 from flask import flash, jsonify, request, session
-from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import BadRequest, NotFound
 
 from indico.modules.events.cloning import EventCloner
 from indico.modules.events.management.controllers import RHManageEventBase
@@ -17,8 +18,10 @@ from indico.modules.events.management.forms import (CLONE_REPEAT_CHOICES, CloneC
                                                     CloneRepeatabilityForm, CloneRepeatIntervalForm,
                                                     CloneRepeatOnceForm, CloneRepeatPatternForm, ImportContentsForm,
                                                     ImportSourceEventForm)
+from indico.modules.events.models.events import Event
 from indico.modules.events.notifications import notify_event_creation
 from indico.modules.events.operations import clone_event, clone_into_event
+from indico.modules.events.tasks import clone_event_occurrences_task, get_clone_progress, set_clone_progress
 from indico.modules.events.util import get_event_from_url
 from indico.util.i18n import _
 from indico.web.flask.util import url_for
@@ -186,15 +189,17 @@ class RHCloneEvent(RHManageEventBase):
                     # recurring event
                     clone_calculator = get_clone_calculator(form.repeatability.data, self.event)
                     dates = clone_calculator.calculate(request.form)[0]
-                    clones = [
-                        clone_event(self.event, n, start_dt, set(form.selected_items.data), form.category.data,
-                                    form.refresh_users.data)
-                        for n, start_dt in enumerate(dates, 1)
-                    ]
-                    if clones:
-                        notify_event_creation(clones[0], clones)
-                        flash(_('{} new events created.').format(len(clones)), 'success')
-                    return jsonify_data(redirect=form.category.data.url, flash=False)
+                    if not dates:
+                        return jsonify_data(redirect=form.category.data.url, flash=False)
+                    # creating many events takes a while, so we do it in the background
+                    task_id = str(uuid4())
+                    set_clone_progress(task_id, self.event, 0, len(dates))
+                    clone_event_occurrences_task.apply_async((self.event, dates, set(form.selected_items.data),
+                                                              form.category.data, form.refresh_users.data,
+                                                              session.user),
+                                                             task_id=task_id)
+                    return jsonify_template('events/management/clone_event_progress.html', event=self.event,
+                                            task_id=task_id, total=len(dates))
             else:
                 # back to step 4, since there's been an error
                 step = 4
@@ -208,6 +213,28 @@ class RHCloneEvent(RHManageEventBase):
                                 cloner_dependencies=dependencies, **tpl_args)
 
 
+class RHCloneEventStatus(RHManageEventBase):
+    """Get the progress of a recurring clone operation."""
+
+    ALLOW_LOCKED = True
+
+    def _process_args(self):
+        RHManageEventBase._process_args(self)
+        self.progress = get_clone_progress(request.view_args['task_id'])
+        # the task id must not give access to the progress of another event's clone operation
+        if self.progress is None or self.progress['event_id'] != self.event.id:
+            raise NotFound
+
+    def _process(self):
+        if self.progress['failed']:
+            return jsonify(finished=True, error=_('Cloning the event failed.'))
+        elif self.progress['event_ids'] is None:
+            return jsonify(finished=False, done=self.progress['done'], total=self.progress['total'])
+        clone = Event.get(self.progress['event_ids'][0])
+        flash(_('{} new events created.').format(len(self.progress['event_ids'])), 'success')
+        return jsonify(finished=True, redirect=clone.category.url)
+
+
 def _get_import_source_from_url(target_event, url):
     event = get_event_from_url(url)
     if event == target_event:
@@ -12,13 +12,19 @@ import pytest
 
 from indico.core import signals
 from indico.core.db.sqlalchemy.principals import EmailPrincipal, PrincipalType
-from indico.core.db.sqlalchemy.protection import ProtectionMode
+from indico.core.db.sqlalchemy.protection import ProtectionMode, UserPrincipals, filter_accessible
 from indico.core.permissions import get_available_permissions
+from indico.modules.categories import Category
 from indico.modules.events import Event
 from indico.modules.events.models.principals import EventPrincipal
+from indico.modules.events.models.roles import EventRole
+from indico.testing.queries import QueryRecorder
 from indico.testing.util import bool_matrix
 
 
+pytest_plugins = 'indico.modules.events.registration.testing.fixtures'
+
+
 @pytest.fixture(autouse=True)
 def _mock_available_permissions(mocker):
     permissions = dict(get_available_permissions(Event), foo=MagicMock(), bar=MagicMock(), foobar=MagicMock())
@@ -460,3 +466,77 @@ def test_has_management_permission_db(create_event, create_user, dummy_user):
     assert not _query().count()
     assert _query('foo').one() == entry
     assert _query('ANY').count() == 2
+
+
+@pytest.mark.usefixtures('request_context')
+def test_user_principals(db, dummy_event, dummy_user, create_user, dummy_group, dummy_regform, create_registration):
+    other_user = create_user(123)
+    role = EventRole(event=dummy_event, name='Role', code='ROLE', color='005272')
+    entries = [dummy_event.update_principal(principal, read_access=True)
+               for principal in (dummy_user, other_user, dummy_group, EmailPrincipal('foo@example.test'), role,
+                                 dummy_regform)]
+    db.session.flush()
+
+    def _check(user, expected):
+        principals = UserPrincipals(user)
+        rv = {entry.type for entry in entries if entry in principals}
+        # must be consistent with checking against each principal
+        assert rv == {entry.type for entry in entries if user in entry.principal}
+        assert rv == expected
+
+    _check(None, set())
+    _check(dummy_user, {PrincipalType.user})
+    dummy_group.group.members.add(dummy_user)
+    role.members.add(dummy_user)
+    dummy_user.secondary_emails.add('foo@example.test')
+    dummy_regform.registrations.append(create_registration(dummy_user, dummy_regform))
+    db.session.flush()
+    _check(dummy_user, {PrincipalType.user, PrincipalType.local_group, PrincipalType.email, PrincipalType.event_role,
+                        PrincipalType.registration_form})
+    _check(other_user, {PrincipalType.user})
+
+
+@pytest.mark.usefixtures('request_context')
+def test_filter_accessible(db, create_event, dummy_category, dummy_user, dummy_group):
+    dummy_category.protection_mode = ProtectionMode.protected
+    dummy_group.group.members.add(dummy_user)
+    events = [create_event(i + 1, protection_mode=ProtectionMode.protected) for i in range(5)]
+    events[0].update_principal(dummy_user, read_access=True)
+    events[1].update_principal(dummy_group, read_access=True)
+    events[2].update_principal(dummy_group, permissions={'foo'})
+    events[3].protection_mode = ProtectionMode.inheriting
+    db.session.flush()
+    db.session.expire_all()
+    events = Event.query.filter(Event.id.in_(e.id for e in events)).order_by(Event.id).all()
+
+    with QueryRecorder() as recorder:
+        assert filter_accessible(events, dummy_user) == [events[0], events[1], events[2]]
+    # all acl entries are loaded at once
+    assert sum('FROM events.principals' in fingerprint for fingerprint, __, __ in recorder.queries) == 1
+    assert filter_accessible(events, dummy_user, 'foo') == [events[2]]
+    assert filter_accessible(events, None) == []
+    dummy_category.update_principal(dummy_user, read_access=True)
+    assert filter_accessible(events, dummy_user) == [events[0], events[1], events[2], events[3]]
+
+
+def test_filter_accessible_parent_once(create_event, dummy_category, dummy_user):
+    events = [create_event(i + 1) for i in range(5)]
+    checked = []
+
+    def _signal_fn(sender, obj, authorized, **kwargs):
+        if authorized is None:
+            checked.append(obj)
+
+    with signals.acl.can_access.connected_to(_signal_fn, sender=Category):
+        assert filter_accessible(events, dummy_user) == events
+    assert checked == [dummy_category, dummy_category.parent]
+
+
+def test_filter_accessible_signal_override(create_event, dummy_user):
+    events = [create_event(i + 1) for i in range(3)]
+
+    def _signal_fn(sender, obj, **kwargs):
+        return False if obj is events[1] else None
+
+    with signals.acl.can_access.connected_to(_signal_fn, sender=Event):
+        assert filter_accessible(events, dummy_user) == [events[0], events[2]]
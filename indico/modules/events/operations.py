@@ -205,6 +205,37 @@ def clone_event(event, n_occurrence, start_dt, cloners, category=None, refresh_u
     return new_event
 
 
+def clone_event_occurrences(event, dates, cloners, category=None, refresh_users=False, progress_callback=None):
+    """Clone an event on multiple dates/times.
+
+    All occurrences are created in the same SQLAlchemy session, so
+    the contents of the source event are only loaded once and then
+    reused for every clone.  Attachment files are shared with the
+    source event instead of being copied for each occurrence.
+
+    :param event: The `Event` to clone.
+    :param dates: A list of start datetimes for the new events.
+    :param cloners: A set containing the names of all enabled cloners.
+    :param category: The `Category` the new events will be created in.
+    :param refresh_users: Whether `EventPerson` data should be updated
+                          from their linked `User` object.
+    :param progress_callback: A callable receiving the number of
+                              created events and the total number of
+                              events after each clone.
+    :return: The list of created events.
+    """
+    clones = []
+    g.sharing_attachment_files = True
+    try:
+        for n, start_dt in enumerate(dates, 1):
+            clones.append(clone_event(event, n, start_dt, set(cloners), category, refresh_users))
+            if progress_callback is not None:
+                progress_callback(n, len(dates))
+    finally:
+        g.pop('sharing_attachment_files', None)
+    return clones
+
+
 def clone_into_event(source_event, target_event, cloners):
     """Clone data into an existing event.
 
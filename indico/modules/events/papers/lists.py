@@ -119,8 +119,9 @@ class PaperListGeneratorBase(ListGeneratorBase):
     def get_list_kwargs(self):
         list_config = self._get_config()
         contributions_query = self._build_query()
-        total_entries = contributions_query.count()
         contributions = self._filter_list_entries(contributions_query, self.list_config['filters']).all()
+        total_entries = (contributions_query.count() if self._has_active_filters(self.list_config['filters'])
+                         else len(contributions))
         selected_entry = request.args.get('selected')
         selected_entry = int(selected_entry) if selected_entry else None
         static_item_ids = self._split_item_ids(list_config['items'], 'static')[0]
@@ -19,12 +19,13 @@ from werkzeug.exceptions import Forbidden
 from indico.core.db import db
 from indico.core.db.sqlalchemy.custom.unaccent import unaccent_match
 from indico.core.db.sqlalchemy.principals import PrincipalType
-from indico.core.notifications import make_email, send_email
+from indico.core.notifications import make_email, send_emails
 from indico.modules.events import EventLogRealm
 from indico.modules.events.abstracts.models.abstracts import Abstract
 from indico.modules.events.abstracts.models.persons import AbstractPersonLink
 from indico.modules.events.contributions.models.contributions import Contribution
-from indico.modules.events.contributions.models.persons import ContributionPersonLink, SubContributionPersonLink
+from indico.modules.events.contributions.models.persons import (AuthorType, ContributionPersonLink,
+                                                                SubContributionPersonLink)
 from indico.modules.events.contributions.models.principals import ContributionPrincipal
 from indico.modules.events.contributions.models.subcontributions import SubContribution
 from indico.modules.events.controllers.base import EditEventSettingsMixin, RHAuthenticatedEventBase
@@ -39,6 +40,8 @@ from indico.modules.events.persons.schemas import EventPersonSchema, EventPerson
 from indico.modules.events.persons.views import WPManagePersons
 from indico.modules.events.registration.models.forms import RegistrationForm
 from indico.modules.events.registration.models.registrations import Registration
+from indico.modules.events.sessions.models.blocks import SessionBlock
+from indico.modules.events.sessions.models.persons import SessionBlockPersonLink
 from indico.modules.events.sessions.models.principals import SessionPrincipal
 from indico.modules.events.sessions.models.sessions import Session
 from indico.modules.logs import LogKind
@@ -47,7 +50,7 @@ from indico.modules.users.models.affiliations import Affiliation
 from indico.util.date_time import now_utc
 from indico.util.i18n import _, ngettext
 from indico.util.marshmallow import LowercaseString, no_relative_urls, not_empty, validate_with_message
-from indico.util.placeholders import get_sorted_placeholders, replace_placeholders
+from indico.util.placeholders import get_sorted_placeholders, get_used_placeholders, replace_placeholders
 from indico.util.user import principal_from_identifier
 from indico.web.args import use_args, use_kwargs
 from indico.web.flask.templating import get_template_module
@@ -67,40 +70,69 @@ BUILTIN_ROLES = {'chairperson': {'name': _('Chairperson'), 'code': 'CHR', 'color
 
 
 class RHPersonsBase(RHManageEventBase):
-    def generate_abstracts_data(self, person_link):
-        return {'title': person_link.abstract.verbose_title,
-                'url': url_for('abstracts.display_abstract', person_link.abstract, management=True)}
-
-    def generate_sessions_data(self, person_link):
-        return {'title': person_link.session_block.full_title}
-
-    def generate_contributions_data(self, person_link):
-        return {'title': person_link.contribution.title,
-                'url': url_for('contributions.manage_contributions', self.event,
-                               selected=person_link.contribution.friendly_id)}
-
-    def generate_subcontributions_data(self, person_link):
-        return {'title': f'{person_link.subcontribution.contribution.title} ({person_link.subcontribution.title})',
-                'url': url_for('contributions.manage_contributions', self.event,
-                               selected=person_link.subcontribution.contribution.friendly_id)}
+    def _get_abstract_elements(self):
+        query = (db.session.query(AbstractPersonLink.person_id, Abstract.id, Abstract.friendly_id, Abstract.title)
+                 .join(AbstractPersonLink.abstract)
+                 .filter(Abstract.event_id == self.event.id, ~Abstract.is_deleted)
+                 .order_by(Abstract.friendly_id))
+        elements = defaultdict(dict)
+        for person_id, abstract_id, friendly_id, title in query:
+            elements[person_id][abstract_id] = {
+                'title': f'#{friendly_id} ({title})',
+                'url': url_for('abstracts.display_abstract', self.event, abstract_id=abstract_id, management=True)
+            }
+        return elements
+
+    def _get_session_block_elements(self):
+        query = (db.session.query(SessionBlockPersonLink.person_id, SessionBlock.id, SessionBlock.title, Session.title)
+                 .join(SessionBlockPersonLink.session_block)
+                 .join(SessionBlock.session)
+                 .filter(Session.event_id == self.event.id, ~Session.is_deleted)
+                 .order_by(Session.title, SessionBlock.title, SessionBlock.id))
+        elements = defaultdict(dict)
+        for person_id, block_id, block_title, session_title in query:
+            elements[person_id][block_id] = {'title': f'{session_title}: {block_title}' if block_title
+                                             else session_title}
+        return elements
+
+    def _get_contribution_elements(self):
+        """Get the contributions and subcontributions of each person.
+
+        :return: A tuple containing dicts mapping person IDs to the
+                 contributions and subcontributions they are speakers
+                 of, and to the contributions they are authors of.
+        """
+        speaker_elements = defaultdict(dict)
+        author_elements = defaultdict(dict)
+        query = (db.session.query(ContributionPersonLink.person_id, ContributionPersonLink.is_speaker,
+                                  ContributionPersonLink.author_type, Contribution.id, Contribution.friendly_id,
+                                  Contribution.title)
+                 .join(ContributionPersonLink.contribution)
+                 .filter(Contribution.event_id == self.event.id, ~Contribution.is_deleted)
+                 .order_by(Contribution.friendly_id))
+        for person_id, is_speaker, author_type, contrib_id, friendly_id, title in query:
+            data = {'title': title,
+                    'url': url_for('contributions.manage_contributions', self.event, selected=friendly_id)}
+            if is_speaker:
+                speaker_elements[person_id][contrib_id] = data
+            if author_type != AuthorType.none:
+                author_elements[person_id][contrib_id] = data
+        query = (db.session.query(SubContributionPersonLink.person_id, SubContribution.id, SubContribution.title,
+                                  Contribution.friendly_id, Contribution.title)
+                 .join(SubContributionPersonLink.subcontribution)
+                 .join(SubContribution.contribution)
+                 .filter(Contribution.event_id == self.event.id, ~Contribution.is_deleted, ~SubContribution.is_deleted)
+                 .order_by(Contribution.friendly_id, SubContribution.friendly_id))
+        for person_id, subcontrib_id, title, contrib_friendly_id, contrib_title in query:
+            # subcontribution IDs may clash with contribution IDs
+            speaker_elements[person_id][f'subcontribution-{subcontrib_id}'] = {
+                'title': f'{contrib_title} ({title})',
+                'url': url_for('contributions.manage_contributions', self.event, selected=contrib_friendly_id)
+            }
+        return speaker_elements, author_elements
 
     def get_persons(self):
-        abstract_strategy = joinedload('abstract_links')
-        abstract_strategy.joinedload('abstract')
-        abstract_strategy.joinedload('person').joinedload('user')
-        contribution_strategy = joinedload('contribution_links')
-        contribution_strategy.joinedload('contribution')
-        contribution_strategy.joinedload('person').joinedload('user')
-        subcontribution_strategy = joinedload('subcontribution_links')
-        subcontribution_strategy.joinedload('subcontribution')
-        subcontribution_strategy.joinedload('person').joinedload('user')
-        session_block_strategy = joinedload('session_block_links')
-        session_block_strategy.joinedload('session_block')
-        session_block_strategy.joinedload('person').joinedload('user')
-        event_strategy = joinedload('event_links')
-        event_strategy.joinedload('person').joinedload('user')
-
-        chairpersons = {link.person for link in self.event.person_links}
+        chairperson_ids = {link.person_id for link in self.event.person_links}
         persons = defaultdict(lambda: {'roles': {},
                                        'registrations': [],
                                        'has_event_person': True,
@@ -117,13 +149,19 @@ class RHPersonsBase(RHManageEventBase):
                                    Registration.registration_form.has(~RegistrationForm.is_deleted),
                                    _reg_person_join
                                ))
-                               .options(abstract_strategy,
-                                        event_strategy,
-                                        contribution_strategy,
-                                        subcontribution_strategy,
-                                        session_block_strategy)
+                               .options(joinedload(EventPerson.user))
                                .all())
 
+        # The objects each person is linked to are loaded with one small query per link type
+        # instead of eager-loading all links along with the persons, which results in a huge
+        # cartesian product for events with many contributions.
+        abstract_elements = session_block_elements = speaker_elements = author_elements = {}
+        if self.event.type != 'lecture':
+            if self.event.has_feature('abstracts'):
+                abstract_elements = self._get_abstract_elements()
+            session_block_elements = self._get_session_block_elements()
+            speaker_elements, author_elements = self._get_contribution_elements()
+
         event_user_roles = defaultdict(set)
         for event_role in self.event.roles:
             for user in event_role.members:
@@ -135,7 +173,7 @@ class RHPersonsBase(RHManageEventBase):
             if registration and registration.is_active:
                 data['registrations'].append(registration)
             data['person'] = event_person
-            if event_person in chairpersons:
+            if event_person.id in chairperson_ids:
                 if self.event.type != 'lecture':
                     data['roles']['chairperson'] = BUILTIN_ROLES['chairperson'].copy()
                 else:
@@ -144,40 +182,19 @@ class RHPersonsBase(RHManageEventBase):
             if self.event.type == 'lecture':
                 continue
 
-            if self.event.has_feature('abstracts'):
-                abstracts = {person_link.abstract_id: self.generate_abstracts_data(person_link)
-                             for person_link in event_person.abstract_links if not person_link.abstract.is_deleted}
-
-                if abstracts:
-                    data['roles']['author'] = BUILTIN_ROLES['author'].copy()
-                    data['roles']['author']['elements'] = abstracts
-
-            session_blocks = {person_link.session_block_id: self.generate_sessions_data(person_link)
-                              for person_link in event_person.session_block_links
-                              if not person_link.session_block.session.is_deleted}
+            if abstracts := abstract_elements.get(event_person.id):
+                data['roles']['author'] = BUILTIN_ROLES['author'].copy()
+                data['roles']['author']['elements'] = abstracts
 
-            if session_blocks:
+            if session_blocks := session_block_elements.get(event_person.id):
                 data['roles']['convener'] = BUILTIN_ROLES['convener'].copy()
                 data['roles']['convener']['elements'] = session_blocks
 
-            contributions = {person_link.contribution.id: self.generate_contributions_data(person_link)
-                             for person_link in event_person.contribution_links
-                             if person_link.is_speaker and not person_link.contribution.is_deleted}
-
-            subcontributions = {person_link.subcontribution.id: self.generate_subcontributions_data(person_link)
-                                for person_link in event_person.subcontribution_links
-                                if not person_link.subcontribution.is_deleted and
-                                not person_link.subcontribution.contribution.is_deleted}
-
-            if contributions or subcontributions:
+            if speaker_contributions := speaker_elements.get(event_person.id):
                 data['roles']['speaker'] = BUILTIN_ROLES['speaker'].copy()
-                data['roles']['speaker']['elements'] = contributions | subcontributions
-
-            author_contributions = {person_link.contribution.id: self.generate_contributions_data(person_link)
-                                    for person_link in event_person.contribution_links
-                                    if person_link.is_author and not person_link.contribution.is_deleted}
+                data['roles']['speaker']['elements'] = speaker_contributions
 
-            if author_contributions:
+            if author_contributions := author_elements.get(event_person.id):
                 data['roles']['author'] = BUILTIN_ROLES['author'].copy()
                 data['roles']['author']['elements'] = author_contributions
 
@@ -280,7 +297,15 @@ class RHEmailEventPersonsBase(RHManageEventBase):
     })
     def _process_args(self, role_id, persons, not_invited_only, no_account):
         RHManageEventBase._process_args(self)
-        principals = [principal_from_identifier(identifier, allow_event_persons=True, event_id=self.event.id)
+        event_person_ids = {int(person_id) for type_, __, person_id in (x.partition(':') for x in persons)
+                            if type_ == 'EventPerson' and person_id.isdigit()}
+        # load all selected event persons at once instead of looking up each of them separately
+        event_persons = {p.identifier: p
+                         for p in (EventPerson.query.with_parent(self.event)
+                                   .filter(EventPerson.id.in_(event_person_ids))
+                                   .options(joinedload(EventPerson.user)))} if event_person_ids else {}
+        principals = [event_persons.get(identifier) or
+                      principal_from_identifier(identifier, allow_event_persons=True, event_id=self.event.id)
                       for identifier in persons]
         if not_invited_only:
             self.recipients = {p for p in principals if p.invited_dt is None}
@@ -347,20 +372,33 @@ class RHAPIEmailEventPersonsSend(RHEmailEventPersonsBase):
     def _process(self, sender_address, body, subject, bcc_addresses, copy_for_sender):
         if not (sender_address := self.event.get_verbose_email_sender(sender_address)):
             abort(422, messages={'sender_address': ['Invalid sender address']})
-        for recipient in self.recipients:
-            if self.no_account and isinstance(recipient, EventPerson):
-                recipient.invited_dt = now_utc()
-            email_body = replace_placeholders('event-persons-email', body, person=recipient,
-                                              event=self.event, register_link=self.no_account)
-            email_subject = replace_placeholders('event-persons-email', subject, person=recipient,
-                                                 event=self.event, register_link=self.no_account)
-            bcc = {session.user.email} if copy_for_sender else set()
-            bcc.update(bcc_addresses)
-            with self.event.force_event_locale():
-                tpl = get_template_module('emails/custom.html', subject=email_subject, body=email_body)
-                email = make_email(to_list=recipient.email, bcc_list=bcc, sender_address=sender_address,
-                                   template=tpl, html=True)
-            send_email(email, self.event, 'Event Persons')
+        bcc = {session.user.email} if copy_for_sender else set()
+        bcc.update(bcc_addresses)
+        # the available placeholders may depend on the kind of recipient (e.g. event person or user)
+        used_placeholders = {}
+
+        def _iter_emails():
+            for recipient in self.recipients:
+                if self.no_account and isinstance(recipient, EventPerson):
+                    recipient.invited_dt = now_utc()
+                if (recipient_type := type(recipient)) not in used_placeholders:
+                    used_placeholders[recipient_type] = get_used_placeholders(
+                        'event-persons-email', body, subject, person=recipient, event=self.event,
+                        register_link=self.no_account
+                    )
+                placeholders = used_placeholders[recipient_type]
+                email_body = replace_placeholders('event-persons-email', body, placeholders=placeholders,
+                                                  person=recipient, event=self.event, register_link=self.no_account)
+                email_subject = replace_placeholders('event-persons-email', subject, placeholders=placeholders,
+                                                     person=recipient, event=self.event,
+                                                     register_link=self.no_account)
+                with self.event.force_event_locale():
+                    tpl = get_template_module('emails/custom.html', subject=email_subject, body=email_body)
+                    email = make_email(to_list=recipient.email, bcc_list=bcc, sender_address=sender_address,
+                                       template=tpl, html=True)
+                yield email, None
+
+        send_emails(_iter_emails(), self.event, 'Event Persons')
         return jsonify(count=len(self.recipients))
 
 
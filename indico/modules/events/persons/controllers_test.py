@@ -0,0 +1,53 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import timedelta
+
+import pytest
+
+from indico.modules.events.contributions.models.persons import (AuthorType, ContributionPersonLink,
+                                                                SubContributionPersonLink)
+from indico.modules.events.models.persons import EventPersonLink
+from indico.modules.events.sessions.models.persons import SessionBlockPersonLink
+from indico.util.date_time import now_utc
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_persons_roles(db, dummy_event, create_event_person, create_user, create_contribution,
+                           create_subcontribution, create_session, create_session_block):
+    from indico.modules.events.persons.controllers import RHPersonsBase
+
+    chair = create_event_person(dummy_event, create_user(1, email='chair@example.test'))
+    speaker = create_event_person(dummy_event, create_user(2, email='speaker@example.test'))
+    author = create_event_person(dummy_event, create_user(3, email='author@example.test'))
+    orphan = create_event_person(dummy_event, create_user(4, email='orphan@example.test'))
+    dummy_event.person_links.append(EventPersonLink(person=chair))
+    contrib = create_contribution(dummy_event, 'Contrib', friendly_id=1)
+    contrib.person_links.append(ContributionPersonLink(person=speaker, is_speaker=True))
+    contrib.person_links.append(ContributionPersonLink(person=author, author_type=AuthorType.primary))
+    subcontrib = create_subcontribution(contrib, 'Subcontrib')
+    subcontrib.person_links.append(SubContributionPersonLink(person=speaker))
+    deleted_contrib = create_contribution(dummy_event, 'Deleted', friendly_id=2, is_deleted=True)
+    deleted_contrib.person_links.append(ContributionPersonLink(person=orphan, is_speaker=True))
+    block = create_session_block(create_session(dummy_event, 'Session'), 'Block', timedelta(hours=1), now_utc())
+    block.person_links.append(SessionBlockPersonLink(person=chair))
+    db.session.flush()
+
+    rh = RHPersonsBase()
+    rh.event = dummy_event
+    persons = rh.get_persons()
+    assert set(persons) == {'chair@example.test', 'speaker@example.test', 'author@example.test',
+                            'orphan@example.test'}
+    assert persons['chair@example.test']['person'] == chair
+    assert set(persons['chair@example.test']['roles']) == {'chairperson', 'convener'}
+    assert persons['chair@example.test']['roles']['convener']['elements'] == {block.id: {'title': 'Session: Block'}}
+    speaker_elements = persons['speaker@example.test']['roles']['speaker']['elements']
+    assert [x['title'] for x in speaker_elements.values()] == ['Contrib', 'Contrib (Subcontrib)']
+    assert set(persons['speaker@example.test']['roles']) == {'speaker'}
+    assert list(persons['author@example.test']['roles']['author']['elements']) == [contrib.id]
+    assert set(persons['author@example.test']['roles']) == {'author'}
+    assert persons['orphan@example.test']['roles'] == {'no_roles': True, 'no_builtin_roles': True}
@@ -18,6 +18,7 @@ from indico.modules.events.layout.util import MenuEntryData
 from indico.modules.events.models.events import EventType
 from indico.modules.events.registration.logging import connect_log_signals
 from indico.modules.events.registration.settings import RegistrationSettingsProxy
+from indico.modules.events.registration.stats import connect_stats_signals
 from indico.modules.events.registration.wallets.google import GoogleWalletManager
 from indico.util.i18n import _, ngettext
 from indico.util.signals import values_from_signal
@@ -28,6 +29,7 @@ from indico.web.menu import SideMenuItem
 
 logger = Logger.get('events.registration')
 connect_log_signals()
+connect_stats_signals()
 
 registration_settings = RegistrationSettingsProxy('registrations', {
     # Whether to merge display forms on the participant list
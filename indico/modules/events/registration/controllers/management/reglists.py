@@ -25,7 +25,7 @@ from indico.core.cache import make_scoped_cache
 from indico.core.config import config
 from indico.core.db import db
 from indico.core.errors import IndicoError, NoReportError
-from indico.core.notifications import make_email, send_email
+from indico.core.notifications import make_email, send_emails
 from indico.legacy.pdfinterface.conference import RegistrantsListToBookPDF, RegistrantsListToPDF
 from indico.modules.categories.models.categories import Category
 from indico.modules.designer import PageLayout, TemplateType
@@ -66,7 +66,7 @@ from indico.util.date_time import format_currency, now_utc, relativedelta
 from indico.util.fs import secure_filename
 from indico.util.i18n import _, ngettext
 from indico.util.marshmallow import Principal
-from indico.util.placeholders import replace_placeholders
+from indico.util.placeholders import get_used_placeholders, replace_placeholders
 from indico.util.signals import values_from_signal
 from indico.util.spreadsheets import send_csv, send_xlsx
 from indico.web.args import parser, use_kwargs
@@ -301,30 +301,39 @@ class RHRegistrationEmailRegistrants(RHRegistrationsActionBase):
 
     def _send_emails(self, form):
         sender_address = self.event.get_verbose_email_sender(form.sender_address.data)
-        for registration in self.registrations:
-            email_body = replace_placeholders('registration-email', form.body.data, regform=self.regform,
-                                              registration=registration)
-            email_subject = replace_placeholders('registration-email', form.subject.data, regform=self.regform,
-                                                 registration=registration)
-            with self.regform.event.force_event_locale(registration.user):
-                template = get_template_module('events/registration/emails/custom_email.html',
-                                               email_subject=email_subject, email_body=email_body)
-                bcc = [session.user.email] if form.copy_for_sender.data else []
-                ticket_template = self.regform.get_ticket_template()
-                is_ticket_blocked = ticket_template.is_ticket and registration.is_ticket_blocked
-                attach_ticket = (
-                    'attach_ticket' in form and form.attach_ticket.data and not is_ticket_blocked
-                )
-                attachments = get_ticket_attachments(registration) if attach_ticket else []
-                if PicturePlaceholder.is_in(form.body.data):
-                    attachments += registration.get_picture_attachments(personal_data_only=True)
-                email = make_email(to_list=registration.email, cc_list=form.cc_addresses.data, bcc_list=bcc,
-                                   sender_address=sender_address, template=template, html=True,
-                                   attachments=attachments)
-            signals.core.before_notification_send.send('registration-custom-email', email=email,
-                                                       registration=registration, form=form)
-            send_email(email, self.event, 'Registration', session.user,
-                       log_metadata={'registration_id': registration.id})
+        # all recipients are registrations of the same form, so they have the same placeholders
+        placeholders = (get_used_placeholders('registration-email', form.body.data, form.subject.data,
+                                              regform=self.regform, registration=self.registrations[0])
+                        if self.registrations else [])
+        bcc = [session.user.email] if form.copy_for_sender.data else []
+        ticket_template = self.regform.get_ticket_template()
+        attach_ticket = 'attach_ticket' in form and form.attach_ticket.data
+        attach_picture = PicturePlaceholder.is_in(form.body.data)
+
+        def _iter_emails():
+            for registration in self.registrations:
+                email_body = replace_placeholders('registration-email', form.body.data, placeholders=placeholders,
+                                                  regform=self.regform, registration=registration)
+                email_subject = replace_placeholders('registration-email', form.subject.data,
+                                                     placeholders=placeholders, regform=self.regform,
+                                                     registration=registration)
+                with self.regform.event.force_event_locale(registration.user):
+                    template = get_template_module('events/registration/emails/custom_email.html',
+                                                   email_subject=email_subject, email_body=email_body)
+                    is_ticket_blocked = ticket_template.is_ticket and registration.is_ticket_blocked
+                    attachments = (get_ticket_attachments(registration)
+                                   if attach_ticket and not is_ticket_blocked
+                                   else [])
+                    if attach_picture:
+                        attachments += registration.get_picture_attachments(personal_data_only=True)
+                    email = make_email(to_list=registration.email, cc_list=form.cc_addresses.data, bcc_list=bcc,
+                                       sender_address=sender_address, template=template, html=True,
+                                       attachments=attachments)
+                signals.core.before_notification_send.send('registration-custom-email', email=email,
+                                                           registration=registration, form=form)
+                yield email, {'registration_id': registration.id}
+
+        send_emails(_iter_emails(), self.event, 'Registration', session.user)
 
     def _process(self):
         with self.regform.event.force_event_locale():
@@ -6,13 +6,107 @@
 # LICENSE file for more details.
 
 from collections import defaultdict, namedtuple
+from datetime import timedelta
 from itertools import chain, groupby
 
-from indico.modules.events.registration.models.registrations import RegistrationData
+from indico.core import signals
+from indico.core.cache import make_scoped_cache
+from indico.core.db import db
+from indico.core.db.sqlalchemy.util.session import AfterCommitQueue
+from indico.modules.events.payment.models.transactions import PaymentTransaction, TransactionStatus
+from indico.modules.events.registration.models.form_fields import RegistrationFormFieldData
+from indico.modules.events.registration.models.items import PersonalDataType, RegistrationFormItem
+from indico.modules.events.registration.models.registrations import Registration, RegistrationData
+from indico.util.countries import get_country
 from indico.util.date_time import now_utc
 from indico.util.i18n import _
 
 
+#: How long the aggregated registration data of a form is cached
+STATS_CACHE_TTL = timedelta(hours=1)
+
+_cache = make_scoped_cache('registration-stats')
+
+
+def _delete_cached_stats(regform_ids):
+    for regform_id in regform_ids:
+        _cache.delete(str(regform_id))
+
+
+_outdated_stats = AfterCommitQueue('outdated_regform_stats', _delete_cached_stats)
+
+
+def connect_stats_signals():
+    _outdated_stats.connect()
+    signals.event.registration_created.connect(_registration_changed)
+    signals.event.registration_updated.connect(_registration_changed)
+    signals.event.registration_deleted.connect(_registration_changed)
+    signals.event.registration_state_updated.connect(_registration_changed)
+    signals.event.registration_personal_data_modified.connect(_registration_changed)
+
+
+def _registration_changed(registration, **kwargs):
+    _outdated_stats.add(registration.registration_form_id)
+
+
+def _get_cached_aggregate(regform, name, compute):
+    """Get aggregated registration data of a form from the cache.
+
+    All aggregates of a form are cached together, so they can be
+    discarded at once whenever a registration of the form changes.
+    """
+    key = str(regform.id)
+    aggregates = _cache.get(key) or {}
+    if name not in aggregates:
+        aggregates[name] = compute()
+        _cache.set(key, aggregates, timeout=STATS_CACHE_TTL)
+    return aggregates[name]
+
+
+def _get_active_registrations_count(regform):
+    return _get_cached_aggregate(regform, 'registrations',
+                                 lambda: Registration.query.with_parent(regform).filter(Registration.is_active).count())
+
+
+def _get_country_counts(regform):
+    """Count the active registrations of a form per country code."""
+    def _compute():
+        query = (db.session.query(RegistrationData.data, db.func.count())
+                 .join(RegistrationData.registration)
+                 .join(RegistrationData.field_data)
+                 .join(RegistrationFormFieldData.field)
+                 .filter(Registration.registration_form_id == regform.id,
+                         Registration.is_active,
+                         RegistrationFormItem.personal_data_type == PersonalDataType.country)
+                 .group_by(RegistrationData.data))
+        return {code: count for code, count in query if code and code != 'None'}
+
+    return _get_cached_aggregate(regform, 'countries', _compute)
+
+
+def _get_field_data_counts(field):
+    """Count the active registrations per value of a field.
+
+    :return: A list of ``(field_data_id, data, is_paid, count)`` tuples
+    """
+    def _compute():
+        query = (db.session.query(RegistrationData.field_data_id, RegistrationData.data, PaymentTransaction.status,
+                                  db.func.count())
+                 .join(RegistrationData.registration)
+                 .join(RegistrationData.field_data)
+                 .outerjoin(Registration.transaction)
+                 .filter(Registration.registration_form_id == field.registration_form_id,
+                         Registration.is_active,
+                         RegistrationFormFieldData.field_id == field.id,
+                         RegistrationData.data != {})
+                 .group_by(RegistrationData.field_data_id, RegistrationData.data, PaymentTransaction.status))
+        # same as `Registration.is_paid`
+        paid_states = {TransactionStatus.successful, TransactionStatus.pending}
+        return [(field_data_id, value, status in paid_states, count) for field_data_id, value, status, count in query]
+
+    return _get_cached_aggregate(field.registration_form, f'field-{field.id}', _compute)
+
+
 class StatsBase:
     def __init__(self, title, subtitle, type, **kwargs):
         """Base class for registration form statistics.
@@ -110,6 +204,19 @@ class DataItem(namedtuple('DataItem', ['regs', 'attendance', 'capacity', 'billab
                                paid_amount, unpaid, unpaid_amount)
 
 
+class RegistrationDataGroup(namedtuple('RegistrationDataGroup', ['data', 'versioned_data', 'price', 'is_paid',
+                                                                 'count'])):
+    """Hold the number of registrations with the same value in a field.
+
+    :param data: The value of the field
+    :param versioned_data: The versioned data of the field used by
+                           the registrations
+    :param price: Decimal -- the price of the value
+    :param is_paid: bool -- whether the registrations are paid
+    :param count: int -- the number of registrations
+    """
+
+
 class FieldStats:
     """Hold stats for a registration form field."""
 
@@ -117,6 +224,7 @@ class FieldStats:
         kwargs.setdefault('type', 'table')
         super().__init__(**kwargs)
         self._field = field
+        self._num_registrations = _get_active_registrations_count(field.registration_form)
         self._regitems = self._get_registration_data(field)
         self._choices = self._get_choices(field)
         self._data, self._show_billing_info = self._build_data()
@@ -129,14 +237,14 @@ class FieldStats:
         return {choice['id']: choice for choice in field.current_data.versioned_data['choices']}
 
     def _get_registration_data(self, field):
-        registration_ids = [r.id for r in field.registration_form.active_registrations]
-        field_data_ids = [data.id for data in field.data_versions]
-        return RegistrationData.query.filter(RegistrationData.registration_id.in_(registration_ids),
-                                             RegistrationData.field_data_id.in_(field_data_ids),
-                                             RegistrationData.data != {}).all()
+        versioned_data = {data.id: data.versioned_data for data in field.data_versions}
+        return [RegistrationDataGroup(data, versioned_data[field_data_id],
+                                      field.field_impl.calculate_price(data, versioned_data[field_data_id]),
+                                      is_paid, count)
+                for field_data_id, data, is_paid, count in _get_field_data_counts(field)]
 
     def _build_data(self):
-        """Build data from registration data and field choices.
+        """Build data from grouped registration data and field choices.
 
         :returns: (dict, bool) -- the data and a boolean to indicate
                   whether the data contains billing information or not.
@@ -238,7 +346,7 @@ class FieldStats:
     def _build_regitems_data(self, key, regitems):
         """Return a `DataItem` aggregating data from registration items.
 
-        :param regitems: list -- list of registrations items to be aggregated
+        :param regitems: list -- list of `RegistrationDataGroup` to be aggregated
         :returns: DataItem -- the data aggregation
         """
         raise NotImplementedError
@@ -299,17 +407,17 @@ class OverviewStats(StatsBase):
     def __init__(self, regform):
         super().__init__(title=_('Overview'), subtitle='', type='overview')
         self.regform = regform
-        self.registrations = regform.active_registrations
+        self.num_registrations = _get_active_registrations_count(regform)
         self.countries, self.num_countries = self._get_countries()
         self.availability = self._get_availibility()
         self.days_left = max((self.regform.end_dt - now_utc()).days, 0) if self.regform.end_dt else 0
 
     def _get_countries(self):
         countries = defaultdict(int)
-        for country, regs in groupby(self.registrations, lambda x: x.get_personal_data().get('country')):
-            if country is None:
+        for code, count in _get_country_counts(self.regform).items():
+            if (country := get_country(code)) is None:
                 continue
-            countries[country] += sum(1 for x in regs)
+            countries[country] += count
         if not countries:
             return [], 0
         # Sort by highest number of people per country then alphabetically per countries' name
@@ -321,7 +429,7 @@ class OverviewStats(StatsBase):
         limit = self.regform.registration_limit
         if not limit or self.regform.limit_reached:
             return (0, 0, 0)
-        return (len(self.registrations), limit, len(self.registrations) / limit)
+        return (self.num_registrations, limit, self.num_registrations / limit)
 
 
 class AccommodationStats(FieldStats, StatsBase):
@@ -348,24 +456,25 @@ class AccommodationStats(FieldStats, StatsBase):
                      data=(details.regs / details.capacity, f'{details.regs} / {details.capacity}'))]
 
     def _build_key(self, obj):
-        choice_id = obj.data['choice'] if isinstance(obj, RegistrationData) else obj['id']
-        choice_price = obj.price if isinstance(obj, RegistrationData) else obj['price']
+        choice_id = obj.data['choice'] if isinstance(obj, RegistrationDataGroup) else obj['id']
+        choice_price = obj.price if isinstance(obj, RegistrationDataGroup) else obj['price']
         choice_caption = self._field.data['captions'][choice_id]
         return choice_caption, choice_id, choice_price
 
     def _build_regitems_data(self, key, regitems):
         price = key[2]
-        choices = lambda r: {choice['id']: choice for choice in r.field_data.versioned_data['choices']}
-        data = {'regs': len(regitems),
+        choices = lambda r: {choice['id']: choice for choice in r.versioned_data['choices']}
+        data = {'regs': sum(regitem.count for regitem in regitems),
                 'capacity': next((choices(regitem)[regitem.data['choice']]['places_limit'] for regitem in regitems), 0),
                 'cancelled': any(not choices(regitem)[regitem.data['choice']]['is_enabled'] for regitem in regitems),
                 'billable': bool(price)}
         if data['billable']:
+            paid = sum(regitem.count for regitem in regitems if regitem.is_paid)
             data['price'] = price
-            data['paid'] = sum(1 for regitem in regitems if regitem.registration.is_paid)
-            data['paid_amount'] = sum(float(price) for regitem in regitems if regitem.registration.is_paid)
-            data['unpaid'] = sum(1 for regitem in regitems if not regitem.registration.is_paid)
-            data['unpaid_amount'] = sum(float(price) for regitem in regitems if not regitem.registration.is_paid)
+            data['paid'] = paid
+            data['paid_amount'] = float(price) * paid
+            data['unpaid'] = data['regs'] - paid
+            data['unpaid_amount'] = float(price) * (data['regs'] - paid)
         return DataItem(**data)
 
     def _build_choice_data(self, choice):
@@ -391,13 +500,12 @@ class AccommodationStats(FieldStats, StatsBase):
         return head
 
     def _get_main_row_cells(self, data_items, choice_caption, total_regs):
-        active_registrations = self._field.registration_form.active_registrations
+        num_registrations = self._num_registrations
         cancelled = any(d.cancelled for d in data_items)
         return [
             Cell(type='str', data=' ' + choice_caption, classes=['cancelled-item'] if cancelled else []),
-            Cell(type='progress', data=((total_regs / len(active_registrations),
-                                         f'{total_regs} / {len(active_registrations)}') if active_registrations
-                                        else None)),
+            Cell(type='progress', data=((total_regs / num_registrations, f'{total_regs} / {num_registrations}')
+                                        if num_registrations else None)),
             *self._get_occupancy(data_items)
         ]
 
@@ -0,0 +1,48 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+
+from indico.core import signals
+from indico.modules.events.registration.models.items import PersonalDataType
+from indico.modules.events.registration.models.registrations import RegistrationData, RegistrationState
+from indico.modules.events.registration.stats import OverviewStats
+
+
+pytest_plugins = 'indico.modules.events.registration.testing.fixtures'
+
+
+@pytest.mark.usefixtures('request_context')
+def test_overview_stats(db, dummy_regform, create_user, create_registration):
+    country_field = next(field for field in dummy_regform.active_fields
+                         if field.personal_data_type == PersonalDataType.country)
+
+    def _create_registration(n, country, state=RegistrationState.complete):
+        registration = create_registration(create_user(n), dummy_regform)
+        registration.state = state
+        registration.data.append(RegistrationData(field_data=country_field.current_data, data=country))
+        db.session.flush()
+        return registration
+
+    _create_registration(1, 'CH')
+    _create_registration(2, 'CH')
+    _create_registration(3, 'FR')
+    _create_registration(4, 'DE', RegistrationState.withdrawn)
+    _create_registration(5, '')
+    stats = OverviewStats(dummy_regform)
+    assert stats.num_registrations == 4
+    assert stats.countries == [(1, 'France'), (2, 'Switzerland')]
+    assert stats.num_countries == 2
+
+    # the aggregated data is cached until a registration changes
+    registration = _create_registration(6, 'FR')
+    assert OverviewStats(dummy_regform).num_registrations == 4
+    signals.event.registration_created.send(registration)
+    signals.core.after_commit.send()
+    stats = OverviewStats(dummy_regform)
+    assert stats.num_registrations == 5
+    assert stats.countries == [(2, 'Switzerland'), (2, 'France')]
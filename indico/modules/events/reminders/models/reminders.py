@@ -12,7 +12,7 @@ from indico.core import signals
 from indico.core.config import config
 from indico.core.db import db
 from indico.core.db.sqlalchemy import UTCDateTime
-from indico.core.notifications import make_email, send_email
+from indico.core.notifications import RenderedEmailTemplate, make_email, send_emails
 from indico.modules.core.settings import core_settings
 from indico.modules.events.contributions.models.persons import ContributionPersonLink, SubContributionPersonLink
 from indico.modules.events.contributions.models.subcontributions import SubContribution
@@ -225,7 +225,9 @@ class EventReminder(db.Model):
             logger.info('Notification %s has no recipients; not sending anything', self)
             return
         with self.event.force_event_locale():
-            email_tpl = make_reminder_email(self.event, self.include_summary, self.include_description, self.message)
+            # the email is the same for all recipients, so we only render it once
+            email_tpl = RenderedEmailTemplate(make_reminder_email(self.event, self.include_summary,
+                                                                  self.include_description, self.message))
         attachments = []
         if self.attach_ical:
             event_ical = event_to_ical(self.event, skip_access_check=True, method='REQUEST',
@@ -233,10 +235,14 @@ class EventReminder(db.Model):
             attachments.append(MIMECalendar('event.ics', event_ical))
 
         sender = self.event.get_verbose_email_sender(self.reply_to_address)
-        for recipient in recipients:
-            with self.event.force_event_locale():
-                email = self._make_email(sender, recipient, email_tpl, attachments)
-            send_email(email, self.event, 'Reminder', self.creator, log_metadata={'reminder_id': self.id})
+
+        def _iter_emails():
+            for recipient in recipients:
+                with self.event.force_event_locale():
+                    email = self._make_email(sender, recipient, email_tpl, attachments)
+                yield email, {'reminder_id': self.id}
+
+        send_emails(_iter_emails(), self.event, 'Reminder', self.creator)
 
     def __repr__(self):
         return format_repr(self, 'id', 'event_id', 'scheduled_dt', is_sent=False)
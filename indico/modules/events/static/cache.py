@@ -0,0 +1,109 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import json
+import os
+import shutil
+from datetime import timedelta
+from pathlib import Path
+from uuid import uuid4
+from zipfile import BadZipFile, ZipFile, ZipInfo
+
+from indico.core.config import config
+
+
+#: How long the previous build of an offline site is kept
+STATIC_SITE_CACHE_TTL = timedelta(days=7)
+
+
+def get_static_site_cache_dir():
+    """Get the directory containing the previous builds of offline sites."""
+    return Path(config.CACHE_DIR) / 'static-sites'
+
+
+def _copy_zip_info(info):
+    new_info = ZipInfo(info.filename, info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.external_attr = info.external_attr
+    new_info.file_size = info.file_size
+    return new_info
+
+
+class StaticSiteCache:
+    """Reuse files from the previous offline site of an event.
+
+    Files which are expensive to add to an offline site are added along
+    with a key identifying everything their content depends on.  When
+    the site is built again, files whose key did not change are copied
+    from the previous build instead of being generated again.
+
+    This is meant to be used as a context manager around the build of
+    the site, and :meth:`save` needs to be called with the finished ZIP
+    file so it can be used by the next build.
+    """
+
+    def __init__(self, event):
+        self.path = get_static_site_cache_dir() / str(event.id)
+        self.keys = {}
+        self._previous_keys = {}
+        self._previous_zip = None
+
+    def __enter__(self):
+        try:
+            manifest = json.loads((self.path / 'manifest.json').read_text())
+            self._previous_zip = ZipFile(self.path / manifest['filename'])
+        except (OSError, ValueError, KeyError, BadZipFile):
+            return self
+        self._previous_keys = manifest['keys']
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._previous_zip is not None:
+            self._previous_zip.close()
+            self._previous_zip = None
+
+    def add(self, name, key):
+        """Record the key of a file added to the site."""
+        self.keys[name] = key
+
+    def copy(self, zip_file, name, key):
+        """Copy a file from the previous build if its key did not change.
+
+        :param zip_file: The `ZipFile` of the site being built
+        :param name: The path of the file in the ZIP file
+        :param key: A string identifying the content of the file
+        :return: Whether the file has been copied
+        """
+        if self._previous_zip is None or self._previous_keys.get(name) != key:
+            return False
+        try:
+            info = self._previous_zip.getinfo(name)
+        except KeyError:
+            return False
+        with self._previous_zip.open(info) as src, zip_file.open(_copy_zip_info(info), 'w') as dst:
+            shutil.copyfileobj(src, dst)
+        self.add(name, key)
+        return True
+
+    def save(self, zip_path):
+        """Keep a finished site so the next build can use its files.
+
+        :param zip_path: The path of the ZIP file containing the site
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        filename = f'site-{uuid4()}.zip'
+        try:
+            os.link(zip_path, self.path / filename)
+        except OSError:
+            shutil.copyfile(zip_path, self.path / filename)
+        tmp_path = self.path / f'.manifest.json.{os.getpid()}.tmp'
+        tmp_path.write_text(json.dumps({'filename': filename, 'keys': self.keys}))
+        tmp_path.replace(self.path / 'manifest.json')
+        # builds which are still running keep their open file even if it is removed
+        for path in self.path.glob('site-*.zip'):
+            if path.name != filename:
+                path.unlink(missing_ok=True)
@@ -0,0 +1,69 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pytest
+
+from indico.legacy.pdfinterface.latex import ContribToPDF
+from indico.modules.events.static.cache import StaticSiteCache
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(patch_indico_config, tmp_path):
+    patch_indico_config('CACHE_DIR', str(tmp_path / 'cache'))
+
+
+def _build(event, path, files):
+    with StaticSiteCache(event) as cache, ZipFile(path, 'w', compression=ZIP_DEFLATED) as zip_file:
+        generated = []
+        for name, (key, content) in files.items():
+            if key is not None and cache.copy(zip_file, name, key):
+                continue
+            generated.append(name)
+            zip_file.writestr(name, content, compress_type=(ZIP_STORED if name.endswith('.pdf') else None))
+            if key is not None:
+                cache.add(name, key)
+    cache.save(path)
+    return generated
+
+
+def test_static_site_cache(dummy_event, tmp_path):
+    files = {
+        'site/index.html': (None, 'index'),
+        'site/material/1-slides.pdf': ('file:1', b'slides'),
+        'site/contrib.pdf': ('latex:abc', b'contrib'),
+    }
+    assert _build(dummy_event, tmp_path / 'first.zip', files) == list(files)
+    # unchanged files are copied from the previous build
+    files['site/contrib.pdf'] = ('latex:def', b'updated')
+    assert _build(dummy_event, tmp_path / 'second.zip', files) == ['site/index.html', 'site/contrib.pdf']
+    with ZipFile(tmp_path / 'second.zip') as zip_file:
+        assert zip_file.read('site/material/1-slides.pdf') == b'slides'
+        assert zip_file.getinfo('site/material/1-slides.pdf').compress_type == ZIP_STORED
+        assert zip_file.read('site/contrib.pdf') == b'updated'
+    cache_files = {p.name for p in StaticSiteCache(dummy_event).path.iterdir()}
+    assert len(cache_files) == 2
+    assert 'manifest.json' in cache_files
+    # the first build may be deleted without affecting the next one
+    (tmp_path / 'first.zip').unlink()
+    assert _build(dummy_event, tmp_path / 'third.zip', files) == ['site/index.html']
+
+
+@pytest.mark.usefixtures('request_context')
+def test_latex_cache_key(dummy_contribution):
+    event = dummy_contribution.event
+    event.logo = b'logo'
+    event.logo_metadata = {'content_type': 'image/png', 'filename': 'logo.png', 'size': 4, 'hash': 'x'}
+    pdf = ContribToPDF(dummy_contribution)
+    source = pdf.render_source()
+    # the random names of temporary files do not affect the key
+    other_pdf = ContribToPDF(dummy_contribution)
+    assert other_pdf.get_cache_key(other_pdf.render_source()) == pdf.get_cache_key(source)
+    event.logo = b'new logo'
+    other_pdf = ContribToPDF(dummy_contribution)
+    assert other_pdf.get_cache_key(other_pdf.render_source()) != pdf.get_cache_key(source)
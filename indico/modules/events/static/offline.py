@@ -13,12 +13,13 @@ import re
 from io import BytesIO
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 from flask import g, request, session
 from flask.helpers import get_root_path
 from werkzeug.utils import secure_filename
 
+import indico
 from indico.core.config import config
 from indico.core.plugins import plugin_engine
 from indico.legacy.pdfinterface.conference import ProgrammeToPDF
@@ -37,6 +38,7 @@ from indico.modules.events.registration.controllers.display import RHParticipant
 from indico.modules.events.sessions.controllers.display import RHDisplaySession
 from indico.modules.events.sessions.ical import session_to_ical
 from indico.modules.events.sessions.util import generate_session_pdf_timetable
+from indico.modules.events.static.cache import StaticSiteCache
 from indico.modules.events.static.util import collect_static_files, override_request_endpoint, rewrite_css_urls
 from indico.modules.events.static.views import (WPStaticAuthorList, WPStaticConferenceDisplay,
                                                 WPStaticConferencePrivacyDisplay, WPStaticConferenceProgram,
@@ -47,9 +49,11 @@ from indico.modules.events.static.views import (WPStaticAuthorList, WPStaticConf
 from indico.modules.events.timetable.controllers.display import RHTimetable
 from indico.modules.events.timetable.util import generate_pdf_timetable
 from indico.modules.events.tracks.controllers import RHDisplayTracks
+from indico.util.archives import get_compress_type
 from indico.util.fs import chmod_umask
 from indico.util.string import strip_tags
-from indico.web.assets.vars_js import generate_global_file, generate_i18n_file, generate_user_file
+from indico.web.assets.bundles import get_bundle_filename, get_bundle_path
+from indico.web.assets.vars_js import generate_global_file, generate_user_file
 from indico.web.flask.util import url_for
 from indico.web.rh import RH
 
@@ -83,6 +87,7 @@ class StaticEventCreator:
         self.event = event
         self._display_tz = self.event.display_tzinfo.zone
         self._zip_file = None
+        self._cache = None
         self._content_dir = _normalize_path(f'OfflineWebsite-{event.title}')
         self._web_dir = os.path.join(get_root_path('indico'), 'web')
         self._static_dir = os.path.join(self._web_dir, 'static')
@@ -93,46 +98,50 @@ class StaticEventCreator:
             prefix=f'static-{self.event.id}-', suffix='.zip', dir=config.TEMP_DIR,
             delete=False
         )
-        self._zip_file = ZipFile(temp_file.name, 'w', allowZip64=True)
+        self._zip_file = ZipFile(temp_file.name, 'w', compression=ZIP_DEFLATED, allowZip64=True)
 
-        with collect_static_files() as used_assets:
-            # create the home page html
-            html = self._create_home()
+        with StaticSiteCache(self.event) as self._cache:
+            with collect_static_files() as used_assets:
+                # create the home page html
+                html = self._create_home()
 
-            # Mathjax plugins can only be known in runtime
-            self._copy_folder(os.path.join(self._content_dir, 'static', 'dist', 'js', 'mathjax'),
-                              os.path.join(self._static_dir, 'dist', 'js', 'mathjax'))
+                # Mathjax plugins can only be known in runtime
+                self._copy_folder(os.path.join(self._content_dir, 'static', 'dist', 'js', 'mathjax'),
+                                  os.path.join(self._static_dir, 'dist', 'js', 'mathjax'))
 
-            # Materials and additional pages
-            self._copy_all_material()
-            self._create_other_pages()
+                # Materials and additional pages
+                self._copy_all_material()
+                self._create_other_pages()
 
-            # Create index.html file (main page for the event)
-            index_path = os.path.join(self._content_dir, 'index.html')
-            self._zip_file.writestr(index_path, html)
+                # Create index.html file (main page for the event)
+                index_path = os.path.join(self._content_dir, 'index.html')
+                self._zip_file.writestr(index_path, html)
 
-            self._write_generated_js()
+                self._write_generated_js()
 
-        # Copy static assets to ZIP file
-        self._copy_static_files(used_assets)
-        self._copy_plugin_files(used_assets)
-        if config.CUSTOMIZATION_DIR:
-            self._copy_customization_files(used_assets)
+            # Copy static assets to ZIP file
+            self._copy_static_files(used_assets)
+            self._copy_plugin_files(used_assets)
+            if config.CUSTOMIZATION_DIR:
+                self._copy_customization_files(used_assets)
 
-        chmod_umask(temp_file.name)
-        self._zip_file.close()
+            chmod_umask(temp_file.name)
+            self._zip_file.close()
+            self._cache.save(temp_file.name)
         return temp_file.name
 
     def _write_generated_js(self):
+        # the global file contains URLs which differ in static sites, but the i18n files
+        # are the same for every event, so we use the cached bundles for them
         global_js = generate_global_file()
         user_js = generate_user_file()
-        i18n_js = f'window.TRANSLATIONS = {generate_i18n_file(session.lang)};'
-        react_i18n_js = f'window.REACT_TRANSLATIONS = {generate_i18n_file(session.lang, react=True)};'
         gen_path = os.path.join(self._content_dir, 'assets')
         self._zip_file.writestr(os.path.join(gen_path, 'js-vars', 'global.js'), global_js)
         self._zip_file.writestr(os.path.join(gen_path, 'js-vars', 'user.js'), user_js)
-        self._zip_file.writestr(os.path.join(gen_path, 'i18n', session.lang + '.js'), i18n_js)
-        self._zip_file.writestr(os.path.join(gen_path, 'i18n', session.lang + '-react.js'), react_i18n_js)
+        self._zip_file.write(get_bundle_path(get_bundle_filename(f'i18n-{session.lang}')),
+                             os.path.join(gen_path, 'i18n', session.lang + '.js'))
+        self._zip_file.write(get_bundle_path(get_bundle_filename(f'i18nreact-{session.lang}')),
+                             os.path.join(gen_path, 'i18n', session.lang + '-react.js'))
 
     def _copy_static_files(self, used_assets):
         # add favicon
@@ -212,19 +221,24 @@ class StaticEventCreator:
                 if attachment.type == AttachmentType.file:
                     dst_path = posixpath.join(self._content_dir, 'material', type_,
                                               f'{attachment.id}-{attachment.file.filename}')
+                    # stored files never change, so the file from the previous build can be used
+                    key = f'file:{attachment.file.id}'
+                    if self._cache.copy(self._zip_file, dst_path, key):
+                        continue
                     with attachment.file.get_local_path() as file_path:
                         self._copy_file(dst_path, file_path)
+                    self._cache.add(dst_path, key)
 
     def _copy_file(self, dest, src):
         """Copy a file from a source path to a destination inside the ZIP."""
-        self._zip_file.write(src, dest)
+        self._zip_file.write(src, dest, compress_type=get_compress_type(dest))
 
     def _copy_folder(self, dest, src):
         for root, _dirs, files in os.walk(src):
             dst_dirpath = os.path.join(dest, os.path.relpath(root, src))
             for filename in files:
                 src_filepath = os.path.join(src, root, filename)
-                self._zip_file.write(src_filepath, os.path.join(dst_dirpath, filename))
+                self._copy_file(os.path.join(dst_dirpath, filename), src_filepath)
 
 
 class StaticConferenceCreator(StaticEventCreator):
@@ -259,12 +273,12 @@ class StaticConferenceCreator(StaticEventCreator):
             g.used_url_for_assets |= used_urls
             self._zip_file.writestr(os.path.join(self._content_dir, 'custom.css'), css)
             for image_file in used_images:
+                image_path = os.path.join(self._content_dir, f'images/{image_file.id}-{image_file.filename}')
                 with image_file.open() as f:
-                    self._zip_file.writestr(os.path.join(self._content_dir,
-                                                         f'images/{image_file.id}-{image_file.filename}'),
-                                            f.read())
+                    self._zip_file.writestr(image_path, f.read(), compress_type=get_compress_type(image_path))
         if self.event.has_logo:
-            self._zip_file.writestr(os.path.join(self._content_dir, 'logo.png'), self.event.logo)
+            self._zip_file.writestr(os.path.join(self._content_dir, 'logo.png'), self.event.logo,
+                                    compress_type=ZIP_STORED)
         return WPStaticConferenceDisplay(self._rh, self.event).display()
 
     def _create_other_pages(self):
@@ -386,8 +400,15 @@ class StaticConferenceCreator(StaticEventCreator):
             # Got legacy reportlab PDF generator instead of the LaTex-based one
             self._add_file(pdf.getPDFBin(), uh_or_endpoint, target)
         else:
-            with open(pdf.generate(), 'rb') as f:
+            # compiling LaTeX is slow, so we reuse the PDF from the previous build if the source did not change
+            source = pdf.render_source()
+            key = f'latex:{indico.__version__}:{pdf.get_cache_key(source)}'
+            filename = os.path.join(self._content_dir, self._get_url(uh_or_endpoint, target))
+            if self._cache.copy(self._zip_file, filename, key):
+                return
+            with open(pdf.generate(source=source), 'rb') as f:
                 self._add_file(f, uh_or_endpoint, target)
+            self._cache.add(filename, key)
 
     def _add_file(self, file_like_or_str, uh_or_endpoint, target):
         if isinstance(file_like_or_str, (str, bytes)):
@@ -395,4 +416,4 @@ class StaticConferenceCreator(StaticEventCreator):
         else:
             content = file_like_or_str.read()
         filename = os.path.join(self._content_dir, self._get_url(uh_or_endpoint, target))
-        self._zip_file.writestr(filename, content)
+        self._zip_file.writestr(filename, content, compress_type=get_compress_type(filename))
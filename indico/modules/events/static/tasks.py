@@ -15,9 +15,11 @@ from indico.core.db import db
 from indico.core.notifications import email_sender, make_email
 from indico.core.storage import StorageReadOnlyError
 from indico.modules.events.static import logger
+from indico.modules.events.static.cache import STATIC_SITE_CACHE_TTL, get_static_site_cache_dir
 from indico.modules.events.static.models.static import StaticSite, StaticSiteState
 from indico.modules.events.static.offline import create_static_site
 from indico.util.date_time import now_utc
+from indico.util.fs import cleanup_dir
 from indico.web.flask.templating import get_template_module
 from indico.web.flask.util import url_for
 from indico.web.rh import RH
@@ -68,6 +70,8 @@ def static_sites_cleanup(days=30):
                      .filter(StaticSite.requested_dt < (now_utc() - timedelta(days=days)),
                              StaticSite.state == StaticSiteState.success)
                      .all())
+    deleted = cleanup_dir(get_static_site_cache_dir(), STATIC_SITE_CACHE_TTL)
+    logger.info('Removed %d files of previous static site builds', len(deleted))
     logger.info('Removing %d expired static sites from the past %d days', len(expired_sites), days)
     try:
         for site in expired_sites:
@@ -0,0 +1,53 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import timedelta
+
+from flask import session
+
+from indico.core.cache import make_scoped_cache
+from indico.core.celery import celery
+from indico.core.db import db
+from indico.modules.events import logger
+from indico.modules.events.notifications import notify_event_creation
+from indico.modules.events.operations import clone_event_occurrences
+
+
+#: Progress of running bulk clone operations, keyed by task id
+clone_progress_cache = make_scoped_cache('event-cloning')
+CLONE_PROGRESS_TTL = timedelta(hours=6)
+
+
+def set_clone_progress(task_id, event, done, total, event_ids=None, failed=False):
+    clone_progress_cache.set(task_id, {'event_id': event.id, 'done': done, 'total': total, 'event_ids': event_ids,
+                                       'failed': failed},
+                             timeout=CLONE_PROGRESS_TTL)
+
+
+def get_clone_progress(task_id):
+    return clone_progress_cache.get(task_id)
+
+
+@celery.task(request_context=True)
+def clone_event_occurrences_task(event, dates, cloners, category, refresh_users, user):
+    session.set_session_user(user)
+    task_id = clone_event_occurrences_task.request.id
+    try:
+        logger.info('Cloning %r %d times', event, len(dates))
+        clones = clone_event_occurrences(
+            event, dates, cloners, category, refresh_users,
+            progress_callback=lambda done, total: set_clone_progress(task_id, event, done, total)
+        )
+        if clones:
+            notify_event_creation(clones[0], clones)
+        db.session.commit()
+    except Exception:
+        logger.exception('Cloning %r failed', event)
+        db.session.rollback()
+        set_clone_progress(task_id, event, 0, len(dates), failed=True)
+        raise
+    set_clone_progress(task_id, event, len(clones), len(dates), event_ids=[e.id for e in clones])
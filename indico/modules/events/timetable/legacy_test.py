@@ -0,0 +1,26 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import timedelta
+
+import pytest
+
+from indico.modules.events.timetable.legacy import TimetableSerializer
+from indico.testing.queries import query_budget
+
+
+@pytest.mark.usefixtures('request_context')
+@pytest.mark.parametrize('num_contribs', (1, 10))
+def test_serialize_timetable_query_budget(db, dummy_event, create_contribution, create_timetable_entry, num_contribs):
+    for i in range(num_contribs):
+        contrib = create_contribution(dummy_event, f'Contribution {i}')
+        create_timetable_entry(dummy_event, contrib, dummy_event.start_dt + timedelta(minutes=20 * i))
+    db.session.expire_all()
+    # the number of queries must not depend on the number of entries
+    with query_budget(11, max_repeats=2):
+        data = TimetableSerializer(dummy_event).serialize_timetable()
+    assert sum(len(entries) for entries in data.values()) == num_contribs
@@ -6,11 +6,12 @@
 # LICENSE file for more details.
 
 import posixpath
-from itertools import groupby
+from itertools import chain, groupby
 
 from flask import render_template, request
 
 from indico.core import signals
+from indico.core.db.sqlalchemy.descriptions import render_descriptions
 from indico.modules.events.layout import get_theme_global_settings, theme_settings
 from indico.modules.events.management.views import WPEventManagement
 from indico.modules.events.timetable.models.entries import TimetableEntryType
@@ -41,6 +42,19 @@ class WPDisplayTimetable(WPConferenceDisplayBase):
     menu_entry_name = 'timetable'
 
 
+def _render_entry_descriptions(entries, *, include_children=True):
+    objs = []
+    children = chain.from_iterable(entry.children for entry in entries) if include_children else ()
+    for entry in chain(entries, children):
+        if entry.type == TimetableEntryType.SESSION_BLOCK:
+            objs.append(entry.object.session)
+            continue
+        objs.append(entry.object)
+        if entry.type == TimetableEntryType.CONTRIBUTION:
+            objs.extend(entry.object.subcontributions)
+    render_descriptions(objs)
+
+
 @template_hook('meeting-body')
 def inject_meeting_body(event, **kwargs):
     event.preload_all_acl_entries()
@@ -53,6 +67,7 @@ def inject_meeting_body(event, **kwargs):
 
     entries = get_nested_timetable(event, include_notes=True, show_date=show_date, show_session=show_session)
     show_siblings_location, show_children_location = get_nested_timetable_location_conditions(entries)
+    _render_entry_descriptions(entries, include_children=(detail_level != 'session'))
     days = [(day, list(e)) for day, e in groupby(entries, lambda e: e.start_dt.astimezone(event_tz).date())]
     theme_id = get_theme(event, view)[0]
     theme = theme_settings.themes[theme_id]
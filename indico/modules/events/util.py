@@ -241,6 +241,9 @@ class ListGeneratorBase:
     list_link_type = None
     #: The default list configuration dictionary
     default_list_config = None
+    #: Query options needed to display the static columns of the list,
+    #: indexed by column; only those of the visible columns are used
+    static_item_options = {}
 
     def __init__(self, event, entry_parent=None):
         #: The event the list is associated with
@@ -295,6 +298,23 @@ class ListGeneratorBase:
         else:
             raise ValueError('Invalid separator_type')
 
+    def _get_static_item_options(self, item_ids):
+        """Get the query options needed to display some static columns.
+
+        This allows loading only the data of the visible columns instead
+        of eager-loading everything any of the columns could display.
+        """
+        options = (option for item_id in item_ids for option in self.static_item_options.get(item_id, ()))
+        return list(dict.fromkeys(options))
+
+    def _has_active_filters(self, filters):
+        """Check whether the user's filtering configuration excludes any entries.
+
+        If it does not, the filtered entries are all the entries of the
+        list so there is no need to count them separately.
+        """
+        return any(values for filter_group in filters.values() for values in filter_group.values())
+
     def _build_query(self):
         """Return the query of the list's entries.
 
@@ -710,21 +730,25 @@ class ZipGeneratorMixin:
     def _get_item_path(self, item):
         return item.get_local_path()
 
-    def _generate_zip_file(self, files_holder, name_prefix='material', name_suffix=None, return_file=False):
+    def _iter_zip_layout(self, files_holder):
+        """Yield the items to add to the zip file along with their paths in it."""
+        self.used_filenames = set()
+        for item in self._iter_items(files_holder):
+            name = self._prepare_folder_structure(item)
+            self.used_filenames.add(name)
+            yield name, item
+
+    def _generate_zip_file(self, files_holder, name_prefix='material', name_suffix=None):
         """Generate a zip file containing the files passed.
 
         :param files_holder: An iterable (or an iterable containing) object that
                              contains the files to be added in the zip file.
         :param name_prefix: The prefix to the zip file name
         :param name_suffix: The suffix to the zip file name
-        :param return_file: Return the temp file instead of a response
         """
         temp_file = NamedTemporaryFile(suffix='.zip', dir=config.TEMP_DIR, delete=False)  # noqa: SIM115
         with ZipFile(temp_file.name, 'w', allowZip64=True) as zip_handler:
-            self.used_filenames = set()
-            for item in self._iter_items(files_holder):
-                name = self._prepare_folder_structure(item)
-                self.used_filenames.add(name)
+            for name, item in self._iter_zip_layout(files_holder):
                 with self._get_item_path(item) as filepath:
                     if isinstance(filepath, BytesIO):
                         zip_handler.writestr(name, filepath.getvalue())
@@ -733,8 +757,6 @@ class ZipGeneratorMixin:
 
         zip_file_name = f'{name_prefix}-{name_suffix}.zip' if name_suffix else f'{name_prefix}.zip'
         chmod_umask(temp_file.name)
-        if return_file:
-            return temp_file
         return send_file(zip_file_name, temp_file.name, 'application/zip', inline=False)
 
     def _prepare_folder_structure(self, item):
@@ -22,6 +22,7 @@ from indico.core.oauth.models.personal_tokens import PersonalToken
 from indico.core.oauth.models.tokens import OAuthToken
 from indico.core.oauth.oauth2 import auth_server
 from indico.core.oauth.scopes import SCOPES
+from indico.core.oauth.util import invalidate_cached_application_tokens, invalidate_cached_tokens
 from indico.modules.admin import RHAdminBase
 from indico.modules.logs.models.entries import LogKind, UserLogRealm
 from indico.modules.oauth.forms import ApplicationForm, PersonalTokenForm
@@ -145,6 +146,7 @@ class RHOAuthAdminApplication(RHOAuthAdminApplicationBase):
         disabled_fields = set(self.application.system_app_type.enforced_data)
         if form.validate_on_submit():
             form.populate_obj(self.application)
+            invalidate_cached_application_tokens(self.application)
             logger.info('Application %s updated by %s', self.application, session.user)
             flash(_('Application {} was modified').format(self.application.name), 'success')
             return redirect(url_for('.apps'))
@@ -161,6 +163,7 @@ class RHOAuthAdminApplicationDelete(RHOAuthAdminApplicationBase):
             raise Forbidden('Cannot delete system app')
 
     def _process(self):
+        invalidate_cached_application_tokens(self.application)
         db.session.delete(self.application)
         logger.info('Application %s deleted by %s', self.application, session.user)
         flash(_('Application deleted successfully'), 'success')
@@ -197,6 +200,7 @@ class RHOAuthAdminApplicationRevoke(RHOAuthAdminApplicationBase):
     """Revoke all user tokens associated to the OAuth application."""
 
     def _process(self):
+        invalidate_cached_application_tokens(self.application)
         self.application.user_links.delete()
         logger.info('Deauthorizing app %r for all users', self.application)
         flash(_('App authorization revoked for all users.'), 'success')
@@ -234,6 +238,7 @@ class RHOAuthUserAppRevoke(RHUserBase):
             logger.info('Deauthorizing app %r for user %r (scopes: %r)', self.application, self.user, link.scopes)
             session.user.log(UserLogRealm.user, LogKind.negative, 'OAuth', f'App deauthorized: {self.application.name}',
                              meta={'app_id': self.application.id})
+            invalidate_cached_tokens(link.tokens)
             db.session.delete(link)
         flash(_("Access for '{}' has been successfully revoked.").format(self.application.name), 'success')
         return redirect(url_for('.user_apps'))
@@ -283,6 +288,7 @@ class RHEditPersonalToken(RHPersonalTokenBase):
         if form.validate_on_submit():
             old_name = self.token.name
             form.populate_obj(self.token)
+            invalidate_cached_tokens([self.token])
             logger.info('Updated token %r', self.token)
             self.user.log(UserLogRealm.user, LogKind.change, 'API Tokens', 'Token updated', session.user,
                           data={'ID': self.token.id, 'Name': self.token.name, 'Scopes': ', '.join(self.token._scopes)},
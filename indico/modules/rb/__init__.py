@@ -19,6 +19,7 @@ from indico.core.settings.converters import EnumConverter, ModelListConverter
 from indico.modules.categories.models.categories import Category
 from indico.modules.rb.models.locations import Location
 from indico.modules.rb.models.rooms import Room
+from indico.modules.rb.operations.bitmaps import connect_bitmap_signals
 from indico.modules.rb.util import rb_check_if_visible
 from indico.util.enum import RichIntEnum
 from indico.util.i18n import _, pgettext
@@ -29,6 +30,9 @@ from indico.web.menu import SideMenuItem, TopMenuItem
 logger = Logger.get('rb')
 rb_cache = make_scoped_cache('roombooking')
 
+# Keep the room availability bitmaps up to date
+connect_bitmap_signals()
+
 
 class BookingReasonRequiredOptions(RichIntEnum):
     __titles__ = [None, _('Never'), _('Always'), _('Not for events')]
@@ -61,6 +61,8 @@ _bp.add_url_rule('/api/user/favorite-rooms/<int:room_id>', 'favorite_rooms', roo
 
 # Calendar/timeline
 _bp.add_url_rule('/api/calendar', 'calendar', bookings.RHCalendar, methods=('GET', 'POST'))
+_bp.add_url_rule('/api/calendar/free-busy', 'calendar_free_busy', bookings.RHCalendarFreeBusy,
+                 methods=('GET', 'POST'))
 _bp.add_url_rule('/api/timeline', 'timeline', bookings.RHTimeline, methods=('GET', 'POST'))
 
 # Bookings
@@ -29,6 +29,7 @@ from indico.modules.rb.controllers.backend.common import search_room_args
 from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
 from indico.modules.rb.models.reservations import RepeatFrequency, Reservation
 from indico.modules.rb.models.rooms import Room
+from indico.modules.rb.operations.availability import get_rooms_free_busy
 from indico.modules.rb.operations.bookings import (get_active_bookings, get_booking_edit_calendar_data,
                                                    get_matching_events, get_room_calendar, get_rooms_availability,
                                                    has_same_slots, should_split_booking, split_booking)
@@ -44,6 +45,7 @@ from indico.util.date_time import now_utc, overlaps, server_to_utc, utc_to_serve
 from indico.util.i18n import _
 from indico.util.marshmallow import ModelField
 from indico.util.spreadsheets import send_csv, send_xlsx
+from indico.util.string import natural_sort_key
 from indico.web.args import use_args, use_kwargs, use_rh_args
 from indico.web.flask.util import url_for
 from indico.web.util import ExpectedError
@@ -114,6 +116,28 @@ class RHCalendar(RHRoomBookingBase):
         return jsonify(list(serialize_availability(calendar).values()))
 
 
+class RHCalendarFreeBusy(RHRoomBookingBase):
+    """Get compact free/busy information for the calendar of many rooms."""
+
+    @use_kwargs({
+        'start_date': fields.Date(load_default=lambda: date.today()),
+        'end_date': fields.Date(load_default=None),
+    }, location='query')
+    @use_kwargs({
+        'room_ids': fields.List(fields.Int(), load_default=None),
+    })
+    def _process(self, start_date, end_date, room_ids):
+        if end_date is None:
+            end_date = start_date
+        elif end_date < start_date:
+            raise BadRequest('Invalid date range')
+        query = Room.query.filter(~Room.is_deleted)
+        if room_ids is not None:
+            query = query.filter(Room.id.in_(room_ids))
+        rooms = sorted(query, key=lambda r: natural_sort_key(r.full_name))
+        return jsonify(get_rooms_free_busy(rooms, start_date, end_date))
+
+
 class RHActiveBookings(RHRoomBookingBase):
     @use_kwargs({
         'start_dt': fields.DateTime(load_default=None),
@@ -0,0 +1,163 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Compact free/busy information for many rooms.
+
+Instead of grouping bookings, blockings and nonbookable periods of each
+room by date, everything that makes a room unavailable is converted into
+intervals, and the intervals of all rooms are merged using a single
+sweep over their sorted boundaries.  The result is a flat list of
+integers per room, which is much cheaper to build and serialize than
+the nested structures used by the booking calendar.
+"""
+
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from indico.core.db import db
+from indico.core.db.sqlalchemy.util.queries import db_dates_overlap
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservations import Reservation, ReservationState
+from indico.modules.rb.operations.blockings import filter_blocked_rooms, get_rooms_blockings
+from indico.modules.rb.operations.misc import get_rooms_nonbookable_periods, get_rooms_unbookable_hours
+from indico.modules.rb.util import WEEKDAYS
+from indico.util.date_time import iterdays
+from indico.util.enum import IndicoIntEnum
+
+
+class AvailabilityState(IndicoIntEnum):
+    """The availability of a room during an interval.
+
+    If several states apply at the same time, the one with the highest
+    value is used.
+    """
+
+    free = 0
+    pre_booked = 1
+    booked = 2
+    overridable_blocking = 3
+    unbookable_hours = 4
+    nonbookable_period = 5
+    blocking = 6
+
+
+_states_by_priority = sorted(AvailabilityState, reverse=True)
+
+
+def sweep_availability(intervals, start_dt, end_dt):
+    """Merge the unavailability intervals of rooms.
+
+    :param intervals: An iterable of ``(room_id, start_dt, end_dt, state)``
+                      tuples; the intervals may overlap.
+    :param start_dt: The start of the time range
+    :param end_dt: The end of the time range
+    :return: A dict mapping room IDs to flat lists containing a
+             ``start, end, state`` triple for each interval in which the
+             room is not free.  The start and end are minutes since
+             `start_dt` and the intervals are sorted and do not overlap.
+    """
+    boundaries = []
+    for room_id, interval_start_dt, interval_end_dt, state in intervals:
+        interval_start_dt = max(interval_start_dt, start_dt)
+        interval_end_dt = min(interval_end_dt, end_dt)
+        if interval_start_dt < interval_end_dt:
+            boundaries.append((room_id, interval_start_dt, 1, state))
+            boundaries.append((room_id, interval_end_dt, -1, state))
+    boundaries.sort(key=itemgetter(0, 1))
+
+    availability = {}
+    for room_id, room_boundaries in groupby(boundaries, key=itemgetter(0)):
+        encoded = availability[room_id] = []
+        active = dict.fromkeys(AvailabilityState, 0)
+        current_state = AvailabilityState.free
+        current_start = None
+        for dt, dt_boundaries in groupby(room_boundaries, key=itemgetter(1)):
+            for __, __, delta, state in dt_boundaries:
+                active[state] += delta
+            state = next((s for s in _states_by_priority if active[s]), AvailabilityState.free)
+            if state == current_state:
+                continue
+            offset = int((dt - start_dt).total_seconds()) // 60
+            if current_state != AvailabilityState.free:
+                encoded += [current_start, offset, current_state.value]
+            current_state = state
+            current_start = offset
+    return availability
+
+
+def _iter_booking_intervals(room_ids, start_dt, end_dt):
+    query = (db.session.query(Reservation.room_id, ReservationOccurrence.start_dt, ReservationOccurrence.end_dt,
+                              Reservation.state)
+             .join(ReservationOccurrence.reservation)
+             .filter(Reservation.room_id.in_(room_ids),
+                     Reservation.state.in_([ReservationState.pending, ReservationState.accepted]),
+                     ReservationOccurrence.is_valid,
+                     db_dates_overlap(ReservationOccurrence, 'start_dt', start_dt, 'end_dt', end_dt)))
+    for room_id, occ_start_dt, occ_end_dt, state in query:
+        yield (room_id, occ_start_dt, occ_end_dt,
+               AvailabilityState.pre_booked if state == ReservationState.pending else AvailabilityState.booked)
+
+
+def _iter_blocking_intervals(rooms, start_dt, end_dt):
+    blocked_rooms = get_rooms_blockings(rooms, start_dt.date(), end_dt.date())
+    overridable = set(filter_blocked_rooms(blocked_rooms, overridable_only=True, explicit=True))
+    for blocked_room in blocked_rooms:
+        blocking = blocked_room.blocking
+        yield (blocked_room.room_id,
+               datetime.combine(blocking.start_date, time()),
+               datetime.combine(blocking.end_date + timedelta(days=1), time()),
+               (AvailabilityState.overridable_blocking if blocked_room in overridable
+                else AvailabilityState.blocking))
+
+
+def _iter_nonbookable_intervals(rooms, start_dt, end_dt):
+    for room_id, periods in get_rooms_nonbookable_periods(rooms, start_dt, end_dt).items():
+        for period in periods:
+            yield room_id, period.start_dt, period.end_dt, AvailabilityState.nonbookable_period
+
+
+def _iter_unbookable_hours_intervals(rooms, start_dt, end_dt):
+    unbookable_hours = get_rooms_unbookable_hours(rooms)
+    for day in iterdays(start_dt, end_dt - timedelta(minutes=1)):
+        day = day.date()
+        weekday = WEEKDAYS[day.weekday()]
+        for room_id, hours_by_weekday in unbookable_hours.items():
+            for hours in hours_by_weekday.get(weekday, ()):
+                # 23:59 is used for the end of the day
+                hours_end_dt = (datetime.combine(day + timedelta(days=1), time())
+                                if hours.end_time == time(23, 59) else datetime.combine(day, hours.end_time))
+                yield (room_id, datetime.combine(day, hours.start_time), hours_end_dt,
+                       AvailabilityState.unbookable_hours)
+
+
+def get_rooms_free_busy(rooms, start_date, end_date):
+    """Get the free/busy information of rooms.
+
+    :param rooms: The rooms to get the availability for
+    :param start_date: The first day of the time range
+    :param end_date: The last day of the time range
+    :return: A dict with the start of the time range (`start_dt`), the
+             `states` the values in the intervals correspond to, the
+             room IDs (`rooms`) and the busy intervals of each room
+             (`intervals`, in the same order as the room IDs) as returned
+             by :func:`sweep_availability`.
+    """
+    start_dt = datetime.combine(start_date, time())
+    end_dt = datetime.combine(end_date + timedelta(days=1), time())
+    room_ids = [room.id for room in rooms]
+    intervals = [
+        *_iter_booking_intervals(room_ids, start_dt, end_dt),
+        *_iter_blocking_intervals(rooms, start_dt, end_dt),
+        *_iter_nonbookable_intervals(rooms, start_dt, end_dt),
+        *_iter_unbookable_hours_intervals(rooms, start_dt, end_dt),
+    ]
+    availability = sweep_availability(intervals, start_dt, end_dt)
+    return {'start_dt': start_dt.isoformat(),
+            'states': [state.name for state in AvailabilityState],
+            'rooms': room_ids,
+            'intervals': [availability.get(room_id, []) for room_id in room_ids]}
@@ -0,0 +1,65 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import date, datetime, time
+
+import pytest
+
+from indico.core.db import db
+from indico.modules.rb.models.blocked_rooms import BlockedRoom
+from indico.modules.rb.models.reservations import ReservationState
+from indico.modules.rb.models.room_bookable_hours import BookableHours
+from indico.modules.rb.operations.availability import AvailabilityState, get_rooms_free_busy, sweep_availability
+
+
+def test_sweep_availability():
+    start_dt = datetime(2025, 1, 6)
+    end_dt = datetime(2025, 1, 7)
+    intervals = [
+        # overlapping bookings are merged
+        (1, datetime(2025, 1, 6, 8), datetime(2025, 1, 6, 10), AvailabilityState.booked),
+        (1, datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 11), AvailabilityState.booked),
+        # adjacent intervals with the same state are merged as well
+        (1, datetime(2025, 1, 6, 11), datetime(2025, 1, 6, 12), AvailabilityState.booked),
+        # the state with the higher priority wins
+        (1, datetime(2025, 1, 6, 14), datetime(2025, 1, 6, 18), AvailabilityState.pre_booked),
+        (1, datetime(2025, 1, 6, 15), datetime(2025, 1, 6, 16), AvailabilityState.nonbookable_period),
+        # intervals are clipped to the time range
+        (2, datetime(2025, 1, 5, 20), datetime(2025, 1, 6, 1), AvailabilityState.blocking),
+        (2, datetime(2025, 1, 6, 23), datetime(2025, 1, 7, 1), AvailabilityState.booked),
+        (3, datetime(2025, 1, 7, 8), datetime(2025, 1, 7, 9), AvailabilityState.booked),
+    ]
+    assert sweep_availability(intervals, start_dt, end_dt) == {
+        1: [480, 720, 2, 840, 900, 1, 900, 960, 5, 960, 1080, 1],
+        2: [0, 60, 6, 1380, 1440, 2],
+    }
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_rooms_free_busy(create_room, create_reservation, create_blocking):
+    room1 = create_room(number='1')
+    room2 = create_room(number='2')
+    room3 = create_room(number='3')
+    create_reservation(room=room1, start_dt=datetime(2025, 1, 6, 8, 30), end_dt=datetime(2025, 1, 6, 10))
+    create_reservation(room=room1, start_dt=datetime(2025, 1, 7, 9), end_dt=datetime(2025, 1, 7, 12),
+                       state=ReservationState.pending)
+    create_reservation(room=room2, start_dt=datetime(2025, 1, 6, 14), end_dt=datetime(2025, 1, 6, 15),
+                       state=ReservationState.rejected)
+    create_blocking(room=room2, start_date=date(2025, 1, 7), end_date=date(2025, 1, 9),
+                    state=BlockedRoom.State.accepted)
+    room3.bookable_hours = [BookableHours(start_time=time(8), end_time=time(18))]
+    db.session.flush()
+    data = get_rooms_free_busy([room1, room2, room3], date(2025, 1, 6), date(2025, 1, 7))
+    assert data['start_dt'] == '2025-01-06T00:00:00'
+    assert data['states'][AvailabilityState.booked] == 'booked'
+    assert data['rooms'] == [room1.id, room2.id, room3.id]
+    assert data['intervals'] == [
+        [510, 600, AvailabilityState.booked, 1980, 2160, AvailabilityState.pre_booked],
+        [1440, 2880, AvailabilityState.blocking],
+        [0, 480, AvailabilityState.unbookable_hours, 1080, 1920, AvailabilityState.unbookable_hours,
+         2520, 2880, AvailabilityState.unbookable_hours],
+    ]
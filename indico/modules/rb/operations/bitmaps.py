@@ -0,0 +1,166 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Per-day bitmaps of the booked time slots of all rooms.
+
+Each day is split into slots of :data:`SLOT_MINUTES` minutes, and for
+every room with accepted bookings on that day a bitmap of the slots
+overlapping one of its bookings is cached.  This allows excluding rooms
+which are certainly booked from a room search without having to check
+the bookings of every single room in the database.
+
+The bitmaps are only used to discard rooms, so the usual availability
+check still needs to be done for the remaining rooms.  New bookings may
+therefore be missing from the bitmaps, but whenever a booking is
+cancelled, rejected, modified or deleted the bitmaps of its days are
+discarded so the freed rooms show up in searches again.
+"""
+
+import math
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from indico.core import signals
+from indico.core.cache import make_scoped_cache
+from indico.core.db import db
+from indico.core.db.sqlalchemy.util.queries import db_dates_overlap
+from indico.core.db.sqlalchemy.util.session import AfterCommitQueue
+from indico.modules.rb.models.reservation_occurrences import ReservationOccurrence
+from indico.modules.rb.models.reservations import Reservation
+from indico.util.date_time import iterdays
+
+
+#: The length of a slot in the bitmaps
+SLOT_MINUTES = 15
+#: How long the bitmaps of a day are cached
+BITMAP_CACHE_TTL = timedelta(hours=1)
+
+_cache = make_scoped_cache('rb-availability-bitmaps')
+
+
+def _delete_bitmaps(days):
+    for day in days:
+        _cache.delete(day.isoformat())
+
+
+_outdated_days = AfterCommitQueue('outdated_rb_bitmaps', _delete_bitmaps)
+
+
+def connect_bitmap_signals():
+    _outdated_days.connect()
+    signals.rb.booking_state_changed.connect(_booking_changed)
+    signals.rb.booking_deleted.connect(_booking_changed)
+    signals.rb.booking_modified.connect(_booking_modified)
+    signals.rb.booking_occurrence_state_changed.connect(_occurrence_changed)
+
+
+def _mark_days_outdated(start_date, end_date):
+    _outdated_days.add(*(d.date() for d in iterdays(start_date, end_date)))
+
+
+def _booking_changed(booking, **kwargs):
+    _mark_days_outdated(booking.start_dt.date(), booking.end_dt.date())
+
+
+def _booking_modified(booking, changes, **kwargs):
+    # the booking may have been moved, so the old days need to be updated as well
+    start_date = min(booking.start_dt.date(), changes.get('start_dt/date', {}).get('old', date.max))
+    end_date = max(booking.end_dt.date(), changes.get('end_dt/date', {}).get('old', date.min))
+    _mark_days_outdated(start_date, end_date)
+
+
+def _occurrence_changed(occurrence, **kwargs):
+    _mark_days_outdated(occurrence.start_dt.date(), occurrence.start_dt.date())
+
+
+def _get_slot_mask(start_dt, end_dt, *, covered_only=False):
+    """Get a bitmap of the slots of a day overlapping a time range.
+
+    :param start_dt: The start of the time range
+    :param end_dt: The end of the time range; must be on the same day
+                   as `start_dt` or midnight of the following day
+    :param covered_only: Whether to only include slots which are fully
+                         covered by the time range
+    """
+    day_start_dt = datetime.combine(start_dt.date(), time())
+    start = (start_dt - day_start_dt).total_seconds() / 60 / SLOT_MINUTES
+    end = (end_dt - day_start_dt).total_seconds() / 60 / SLOT_MINUTES
+    if covered_only:
+        first, last = math.ceil(start), math.floor(end)
+    else:
+        first, last = math.floor(start), math.ceil(end)
+    if first >= last:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def _compute_day_bitmaps(days):
+    """Compute the bitmaps of several days using a single query.
+
+    Every occurrence is returned once for each of the requested days
+    it overlaps, so occurrences on days which are not requested (e.g.
+    between the days of a weekly booking) are never loaded.
+    """
+    day_table = db.func.unnest(db.cast(days, ARRAY(db.Date))).table_valued('day').render_derived()
+    day_start_dt = db.cast(day_table.c.day, db.DateTime)
+    query = (db.session.query(day_table.c.day, Reservation.room_id, ReservationOccurrence.start_dt,
+                              ReservationOccurrence.end_dt)
+             .select_from(ReservationOccurrence)
+             .join(ReservationOccurrence.reservation)
+             .join(day_table, db_dates_overlap(ReservationOccurrence, 'start_dt', day_start_dt,
+                                               'end_dt', day_start_dt + timedelta(days=1)))
+             .filter(Reservation.is_accepted,
+                     ReservationOccurrence.is_valid))
+    bitmaps = {day: defaultdict(int) for day in days}
+    for day, room_id, start_dt, end_dt in query:
+        day_start_dt = datetime.combine(day, time())
+        day_end_dt = day_start_dt + timedelta(days=1)
+        bitmaps[day][room_id] |= _get_slot_mask(max(start_dt, day_start_dt), min(end_dt, day_end_dt))
+    return {day: dict(day_bitmaps) for day, day_bitmaps in bitmaps.items()}
+
+
+def get_day_bitmaps(days):
+    """Get the bitmaps of the booked slots of all rooms.
+
+    :param days: The days to get the bitmaps for
+    :return: A dict mapping each day to a dict mapping room IDs to
+             bitmaps.  Rooms without bookings on a day are omitted.
+    """
+    days = sorted(set(days))
+    bitmaps = dict(zip(days, _cache.get_many(*(day.isoformat() for day in days)), strict=True))
+    if missing_days := [day for day, day_bitmaps in bitmaps.items() if day_bitmaps is None]:
+        missing = _compute_day_bitmaps(missing_days)
+        _cache.set_many({day.isoformat(): day_bitmaps for day, day_bitmaps in missing.items()},
+                        timeout=BITMAP_CACHE_TTL)
+        bitmaps.update(missing)
+    return bitmaps
+
+
+def get_booked_room_ids(start_dt, end_dt, repetition):
+    """Get the IDs of rooms which are certainly booked during a booking.
+
+    Only slots which are fully covered by the booking are taken into
+    account, so this never returns a room that would be available for
+    it.  However, rooms which are not returned are not guaranteed to be
+    available.
+
+    :param start_dt: The start of the booking
+    :param end_dt: The end of the booking
+    :param repetition: The repetition of the booking
+    """
+    occurrences = [(occ_start_dt, datetime.combine(occ_start_dt.date(), end_dt.time()))
+                   for occ_start_dt in ReservationOccurrence.iter_start_time(start_dt, end_dt, repetition)]
+    bitmaps = get_day_bitmaps(occ_start_dt.date() for occ_start_dt, __ in occurrences)
+    booked_room_ids = set()
+    for occ_start_dt, occ_end_dt in occurrences:
+        if not (mask := _get_slot_mask(occ_start_dt, occ_end_dt, covered_only=True)):
+            continue
+        booked_room_ids.update(room_id for room_id, bitmap in bitmaps[occ_start_dt.date()].items()
+                               if bitmap & mask)
+    return booked_room_ids
@@ -0,0 +1,80 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import date, datetime
+
+import pytest
+from flask import session
+
+from indico.core import signals
+from indico.modules.rb.models.reservations import RepeatFrequency, ReservationState
+from indico.modules.rb.operations import bitmaps
+from indico.modules.rb.operations.bitmaps import _get_slot_mask, get_booked_room_ids, get_day_bitmaps
+from indico.modules.rb.operations.rooms import search_for_rooms
+
+
+@pytest.mark.parametrize(('start', 'end', 'covered_only', 'expected'), (
+    ((0, 0), (0, 15), False, 0b1),
+    ((0, 0), (0, 15), True, 0b1),
+    ((0, 10), (0, 50), False, 0b1111),
+    ((0, 10), (0, 50), True, 0b0110),
+    ((0, 10), (0, 20), True, 0),
+    ((23, 45), (24, 0), False, 1 << 95),
+))
+def test_get_slot_mask(start, end, covered_only, expected):
+    start_dt = datetime(2025, 1, 6, *start)
+    end_dt = datetime(2025, 1, 7) if end == (24, 0) else datetime(2025, 1, 6, *end)
+    assert _get_slot_mask(start_dt, end_dt, covered_only=covered_only) == expected
+
+
+def test_get_booked_room_ids(create_room, create_reservation, mocker):
+    room1 = create_room(number='1')
+    room2 = create_room(number='2')
+    create_reservation(room=room1, start_dt=datetime(2025, 1, 6, 10), end_dt=datetime(2025, 1, 6, 11, 5))
+    create_reservation(room=room2, start_dt=datetime(2025, 1, 7, 10), end_dt=datetime(2025, 1, 7, 11),
+                       state=ReservationState.pending)
+    compute = mocker.spy(bitmaps, '_compute_day_bitmaps')
+    assert get_day_bitmaps([date(2025, 1, 6), date(2025, 1, 7)]) == {
+        date(2025, 1, 6): {room1.id: 0b11111 << 40},
+        date(2025, 1, 7): {},
+    }
+    # all missing days are computed at once
+    assert compute.call_count == 1
+    never = (RepeatFrequency.NEVER, 0, None)
+    assert get_booked_room_ids(datetime(2025, 1, 6, 10, 45), datetime(2025, 1, 6, 12), never) == {room1.id}
+    # the booking only overlaps the first slot partially, so the room may be available
+    assert get_booked_room_ids(datetime(2025, 1, 6, 11, 5), datetime(2025, 1, 6, 12), never) == set()
+    assert get_booked_room_ids(datetime(2025, 1, 5, 10), datetime(2025, 1, 7, 11),
+                               (RepeatFrequency.DAY, 1, None)) == {room1.id}
+    # the bitmaps of the two days are cached
+    assert compute.call_count == 2
+    assert compute.call_args.args == ([date(2025, 1, 5)],)
+
+
+@pytest.mark.usefixtures('request_context')
+def test_get_booked_room_ids_cancelled(create_reservation, dummy_room, dummy_user):
+    reservation = create_reservation(start_dt=datetime(2025, 1, 6, 10), end_dt=datetime(2025, 1, 6, 11))
+    args = (datetime(2025, 1, 6, 10), datetime(2025, 1, 6, 11), (RepeatFrequency.NEVER, 0, None))
+    assert get_booked_room_ids(*args) == {dummy_room.id}
+    reservation.cancel(dummy_user, silent=True)
+    signals.core.after_commit.send()
+    assert get_booked_room_ids(*args) == set()
+
+
+@pytest.mark.usefixtures('request_context')
+def test_search_for_rooms_availability(create_room, create_reservation, dummy_room, dummy_user):
+    session.set_session_user(dummy_user)
+    room1 = create_room(number='1')
+    room2 = create_room(number='2')
+    create_reservation(room=room1, start_dt=datetime(2025, 1, 6, 10), end_dt=datetime(2025, 1, 6, 11))
+    filters = {'start_dt': datetime(2025, 1, 6, 10, 30), 'end_dt': datetime(2025, 1, 6, 12),
+               'repeat_frequency': RepeatFrequency.NEVER, 'repeat_interval': 0}
+    assert search_for_rooms(filters, availability=True).all() == [room2, dummy_room]
+    assert search_for_rooms(filters, availability=False).all() == [room1]
+    # rooms not excluded by the bitmaps are still checked
+    filters['start_dt'] = datetime(2025, 1, 6, 10, 50)
+    assert search_for_rooms(filters, availability=True).all() == [room2, dummy_room]
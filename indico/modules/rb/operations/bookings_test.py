@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 import pytest
 
 from indico.modules.rb.models.reservations import RepeatFrequency
+from indico.modules.rb.operations.bookings import get_rooms_availability
+from indico.testing.queries import query_budget
 
 
 def test_bookings_are_split_on_time_changes(create_reservation):
@@ -70,3 +72,18 @@ def past_booking_occurrences_are_cancelled(dummy_user, create_reservation):
     number_of_cancelled_occurrences = [occ for occ in reservation.occurrences if occ.is_cancelled]
     assert number_of_cancelled_occurrences == 2
     assert len(new_reservation.occurrences) == 4
+
+
+@pytest.mark.parametrize('num_rooms', (1, 10))
+def test_rooms_availability_query_budget(create_room, create_reservation, num_rooms):
+    rooms = [create_room() for __ in range(num_rooms)]
+    for room in rooms:
+        create_reservation(room=room, start_dt=datetime.today().replace(hour=8, minute=30),
+                           end_dt=datetime.today().replace(hour=17, minute=30) + timedelta(days=5),
+                           repeat_frequency=RepeatFrequency.DAY)
+    start_dt = datetime.today().replace(hour=8, minute=0)
+    # the number of queries must not depend on the number of rooms
+    with query_budget(5, max_repeats=1):
+        __, availability = get_rooms_availability(rooms, start_dt, start_dt + timedelta(days=5, hours=2),
+                                                  RepeatFrequency.DAY, 1, None)
+    assert len(availability) == num_rooms
@@ -22,6 +22,7 @@ from indico.modules.rb.models.reservation_occurrences import ReservationOccurren
 from indico.modules.rb.models.reservations import Reservation
 from indico.modules.rb.models.room_features import RoomFeature
 from indico.modules.rb.models.rooms import Room
+from indico.modules.rb.operations.bitmaps import get_booked_room_ids
 from indico.modules.rb.statistics import calculate_rooms_occupancy
 from indico.modules.rb.util import rb_is_admin
 from indico.util.caching import memoize_redis
@@ -184,6 +185,11 @@ def search_for_rooms(filters, allow_admin=False, availability=None):
     start_dt, end_dt = filters['start_dt'], filters['end_dt']
     repeatability = (filters['repeat_frequency'], filters['repeat_interval'], filters.get('recurrence_weekdays'))
 
+    if availability:
+        # discard rooms which are certainly booked before checking the bookings of each room
+        if booked_room_ids := get_booked_room_ids(start_dt, end_dt, repeatability):
+            query = query.filter(~Room.id.in_(booked_room_ids))
+
     availability_filters = [Room.filter_available(start_dt, end_dt, repeatability,
                                                   include_blockings=False, include_pre_bookings=False)]
     if not (allow_admin and rb_is_admin(session.user)):
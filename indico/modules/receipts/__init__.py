@@ -15,6 +15,11 @@ from indico.web.flask.util import url_for
 from indico.web.menu import SideMenuItem
 
 
+@signals.core.import_tasks.connect
+def _import_tasks(sender, **kwargs):
+    import indico.modules.receipts.tasks  # noqa: F401
+
+
 @signals.menu.items.connect_via('admin-sidemenu')
 def _admin_sidemenu_items(sender, **kwargs):
     if session.user.is_admin:
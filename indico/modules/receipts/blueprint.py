@@ -74,3 +74,5 @@ _bp.add_url_rule('/event/<int:event_id>/manage/receipts/<int:template_id>/previe
                  event.RHPreviewReceipts, methods=('POST',))
 _bp.add_url_rule('/event/<int:event_id>/manage/receipts/<int:template_id>/generate', 'generate_receipts',
                  event.RHGenerateReceipts, methods=('POST',))
+_bp.add_url_rule('/event/<int:event_id>/manage/receipts/generate/<task_id>', 'generate_receipts_status',
+                 event.RHGenerateReceiptsStatus)
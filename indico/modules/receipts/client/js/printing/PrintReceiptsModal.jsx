@@ -13,7 +13,7 @@ import previewReceiptsURL from 'indico-url:receipts.receipts_preview';
 import PropTypes from 'prop-types';
 import React, {useState} from 'react';
 import {Field, FormSpy} from 'react-final-form';
-import {Button, Dropdown, Form, Grid, Header, Icon, Message, Segment} from 'semantic-ui-react';
+import {Button, Dropdown, Form, Grid, Header, Icon, Message, Progress, Segment} from 'semantic-ui-react';
 
 import {
   formatters,
@@ -83,6 +83,7 @@ const archiveFilename = {
 export default function PrintReceiptsModal({onClose, registrationIds, eventId}) {
   const [receiptIds, setReceiptIds] = useState([]);
   const [downloading, setDownloading] = useState(false);
+  const [progress, setProgress] = useState(null);
 
   const {data: templateList, loading} = useIndicoAxios(allTemplatesURL({event_id: eventId}), {
     trigger: eventId,
@@ -128,8 +129,10 @@ export default function PrintReceiptsModal({onClose, registrationIds, eventId})
         const {receiptIds: printedReceiptIds, error} = await printReceipt(
           eventId,
           registrationIds,
-          values
+          values,
+          (done, total) => setProgress({done, total})
         );
+        setProgress(null);
         if (error) {
           return error;
         } else if (printedReceiptIds.length > 0) {
@@ -176,6 +179,9 @@ export default function PrintReceiptsModal({onClose, registrationIds, eventId})
               </PluralTranslate>
             )}
           </Message>
+          {progress && (
+            <Progress value={progress.done} total={progress.total} progress="ratio" indicating />
+          )}
           <Grid columns={2} divided>
             <Grid.Column>
               <FinalDropdown
@@ -6,6 +6,7 @@
 // LICENSE file for more details.
 
 import printReceiptsURL from 'indico-url:receipts.generate_receipts';
+import printReceiptsStatusURL from 'indico-url:receipts.generate_receipts_status';
 
 import PropTypes from 'prop-types';
 import React, {useState} from 'react';
@@ -101,20 +102,40 @@ PrintingErrorsModal.propTypes = {
   ).isRequired,
 };
 
+/**
+ * Wait until the documents generated in the background are ready.
+ *
+ * @param {number} eventId - Event ID
+ * @param {string} taskId - ID of the task generating the documents
+ * @param {Function} onProgress - called with the number of generated documents and the total
+ */
+async function waitForReceipts(eventId, taskId, onProgress) {
+  const {data} = await indicoAxios.get(
+    printReceiptsStatusURL({event_id: eventId, task_id: taskId})
+  );
+  if (data.finished) {
+    return data;
+  }
+  onProgress(data.done, data.total);
+  await new Promise(resolve => setTimeout(resolve, 1000));
+  return waitForReceipts(eventId, taskId, onProgress);
+}
+
 /**
  * Handle the printing logic for a given template on a given event, based on previous user input.
  *
  * @param {number} eventId - Event ID
  * @param {Array.<String>} registrationIds - IDs of registrants to print
  * @param {Array.<Object>} values - custom field values to use in the template
+ * @param {Function} onProgress - called with the number of generated documents and the total
  */
-export async function printReceipt(eventId, registrationIds, values) {
+export async function printReceipt(eventId, registrationIds, values, onProgress = () => {}) {
   const printReceiptsRequest = async (registrations, force) => {
     const {template: templateId, ...data} = values;
     data.registration_ids = registrations;
     data.force = force;
     const resp = await indicoAxios.post(printReceiptsURL(snakifyKeys({eventId, templateId})), data);
-    return resp.data;
+    return waitForReceipts(eventId, resp.data.task_id, onProgress);
   };
   try {
     const data = await printReceiptsRequest(registrationIds, false);
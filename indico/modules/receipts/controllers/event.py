@@ -7,38 +7,35 @@
 
 import base64
 import os
-from datetime import datetime
 from io import BytesIO
+from uuid import uuid4
 
 from flask import g, jsonify, request, session
 from marshmallow import fields
 from PIL import Image
 from pypdf import PdfWriter
 from webargs.flaskparser import abort
-from werkzeug.exceptions import Forbidden
+from werkzeug.exceptions import Forbidden, NotFound, UnprocessableEntity
 
-from indico.core.db import db
+from indico.core.errors import IndicoError
 from indico.modules.categories.models.categories import Category
 from indico.modules.events.registration.controllers.management import RHManageRegFormsBase
 from indico.modules.events.registration.models.forms import RegistrationForm
 from indico.modules.events.registration.models.registrations import Registration
-from indico.modules.events.registration.notifications import notify_registration_receipt_created
 from indico.modules.events.util import ZipGeneratorMixin
-from indico.modules.files.models.files import File
-from indico.modules.logs.models.entries import EventLogRealm, LogKind
 from indico.modules.receipts.models.files import ReceiptFile
 from indico.modules.receipts.models.templates import ReceiptTemplate
 from indico.modules.receipts.schemas import ReceiptTemplateDBSchema
 from indico.modules.receipts.settings import receipt_defaults
-from indico.modules.receipts.util import (TemplateStackEntry, compile_jinja_code, create_pdf,
-                                          get_event_attachment_images, get_inherited_templates,
-                                          get_safe_template_context)
+from indico.modules.receipts.tasks import generate_receipts_task, get_receipts_progress, set_receipts_progress
+from indico.modules.receipts.util import (DocumentRenderer, TemplateStackEntry, compile_jinja_code,
+                                          compile_jinja_template, create_pdf, get_event_attachment_images,
+                                          get_inherited_templates, get_safe_template_context)
 from indico.util.caching import memoize_redis
 from indico.util.fs import secure_filename
 from indico.util.i18n import _
 from indico.util.images import square
 from indico.util.marshmallow import not_empty
-from indico.util.string import slugify
 from indico.web.args import use_kwargs
 from indico.web.flask.util import send_file
 
@@ -210,65 +207,40 @@ class RHGenerateReceipts(RenderReceiptsBase):
     })
     def _process(self, save_config, filename, publish, notify_users, force):
         custom_fields = self._get_custom_fields()
-
-        def _compile_receipt_for_reg(registration):
-            g.template_stack.append(TemplateStackEntry(registration))
-            safe_ctx = get_safe_template_context(self.event, registration, custom_fields)
-            return compile_jinja_code(self.template.html, safe_ctx, use_stack=True)
-
-        g.template_stack = []
-        html_sources = {registration: _compile_receipt_for_reg(registration) for registration in self.registrations}
-
-        errors = [
-            {
-                'registration': {'full_name': entry.registration.display_full_name, 'id': entry.registration.id},
-                'undefineds': list(entry.undefined)
-            }
-            for entry in g.template_stack if entry.undefined
-        ]
-        del g.template_stack
-        if errors and not force:
-            return jsonify(receipt_ids=[], errors=errors)
-
-        receipt_ids = []
-        for registration in self.registrations:
-            pdf_content = create_pdf(self.event, [html_sources[registration]], self.template.css)
-            timestamp = datetime.now().strftime('%Y%m%d-%H%M')
-            full_filename = slugify(filename, timestamp)
-            n = (ReceiptFile.query
-                 .join(File)
-                 .filter(ReceiptFile.registration == registration, File.filename.like(f'{full_filename}%.pdf'))
-                 .count())
-            if n > 0:
-                full_filename = f'{full_filename}-{n}'
-            f = File(
-                filename=secure_filename(f'{full_filename}.pdf', f'document-{timestamp}.pdf'),
-                content_type='application/pdf',
-                meta={'event_id': self.event.id}
-            )
-            context = ('event', self.event.id, 'registration', registration.id, 'receipts')
-            f.save(context, pdf_content)
-            f.claim()
-            receipt = ReceiptFile(
-                file=f,
-                registration=registration,
-                template=self.template,
-                template_params=custom_fields,
-                is_published=publish
-            )
-            db.session.add(receipt)
-            db.session.commit()
-            receipt_ids.append(receipt.file_id)
-            notify_registration_receipt_created(registration, receipt, notify_user=notify_users)
-            registration.log(EventLogRealm.management, LogKind.positive, 'Documents',
-                             f'Document "{f.filename}" generated', session.user,
-                             data={'Published': publish, 'Notified': notify_users})
+        # report errors in the template or stylesheet right away instead of failing in the background
+        compile_jinja_template(self.template.html, use_stack=True)
+        DocumentRenderer(self.event, self.template.css)
         if save_config:
             receipt_defaults.set_multi(self.event, {
                 f'custom_fields:{self.template.id}': self.custom_fields_raw,
                 f'filename:{self.template.id}': filename,
             })
-        return jsonify(receipt_ids=receipt_ids, errors=errors)
+        # rendering many PDFs takes a while, so we do it in the background
+        task_id = str(uuid4())
+        set_receipts_progress(task_id, self.event, 0, len(self.registrations))
+        generate_receipts_task.apply_async((self.event, self.template, [r.id for r in self.registrations],
+                                            custom_fields, filename, publish, notify_users, force, session.user),
+                                           task_id=task_id)
+        return jsonify(task_id=task_id)
+
+
+class RHGenerateReceiptsStatus(RHManageRegFormsBase):
+    """Get the progress of a document generation."""
+
+    def _process_args(self):
+        RHManageRegFormsBase._process_args(self)
+        self.progress = get_receipts_progress(request.view_args['task_id'])
+        if self.progress is None or self.progress['event_id'] != self.event.id:
+            raise NotFound
+
+    def _process(self):
+        if self.progress['error']:
+            raise UnprocessableEntity(self.progress['error'])
+        elif self.progress['failed']:
+            raise IndicoError(_('Generating the documents failed'))
+        elif self.progress['receipt_ids'] is None:
+            return jsonify(finished=False, done=self.progress['done'], total=self.progress['total'])
+        return jsonify(finished=True, receipt_ids=self.progress['receipt_ids'], errors=self.progress['errors'])
 
 
 class RHExportReceipts(ZipGeneratorMixin, RHManageRegFormsBase):
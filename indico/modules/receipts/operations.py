@@ -0,0 +1,135 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import datetime
+
+from flask import g, session
+from sqlalchemy.orm import joinedload, selectinload
+
+from indico.core.db import db
+from indico.modules.events.registration.models.forms import RegistrationForm
+from indico.modules.events.registration.models.registrations import Registration
+from indico.modules.events.registration.notifications import notify_registration_receipt_created
+from indico.modules.files.models.files import File
+from indico.modules.logs.models.entries import EventLogRealm, LogKind
+from indico.modules.receipts.models.files import ReceiptFile
+from indico.modules.receipts.util import (DocumentRenderer, TemplateStackEntry, compile_jinja_template,
+                                          get_safe_template_context, logger, render_jinja_template)
+from indico.util.fs import secure_filename
+from indico.util.string import slugify
+
+
+def render_receipt_sources(event, template, registrations, custom_fields):
+    """Render the HTML of a document template for many registrations.
+
+    The template is only compiled once and then rendered for each
+    registration.
+
+    :return: A tuple containing a dict mapping each registration to the
+             rendered HTML, and a list of errors for registrations whose
+             data is missing placeholders used in the template.
+    """
+    compiled_template = compile_jinja_template(template.html, use_stack=True)
+    g.template_stack = []
+    html_sources = {}
+    for registration in registrations:
+        g.template_stack.append(TemplateStackEntry(registration))
+        safe_ctx = get_safe_template_context(event, registration, custom_fields)
+        html_sources[registration] = render_jinja_template(compiled_template, safe_ctx)
+    errors = [
+        {
+            'registration': {'full_name': entry.registration.display_full_name, 'id': entry.registration.id},
+            'undefineds': list(entry.undefined)
+        }
+        for entry in g.template_stack if entry.undefined
+    ]
+    del g.template_stack
+    return html_sources, errors
+
+
+def _get_existing_filename_counts(registrations, full_filename):
+    query = (db.session.query(ReceiptFile.registration_id, db.func.count())
+             .join(File)
+             .filter(ReceiptFile.registration_id.in_([r.id for r in registrations]),
+                     File.filename.like(f'{full_filename}%.pdf'))
+             .group_by(ReceiptFile.registration_id))
+    return dict(query)
+
+
+def generate_receipts(event, template, registration_ids, custom_fields, filename, *, publish=False,
+                      notify_users=False, force=False, progress_callback=None):
+    """Generate and save documents for many registrations.
+
+    :param event: The event the registrations belong to
+    :param template: The `ReceiptTemplate` to use
+    :param registration_ids: The IDs of the registrations
+    :param custom_fields: The values of the custom fields of the template
+    :param filename: The filename of the documents (without extension)
+    :param publish: Whether to make the documents available to the registrants
+    :param notify_users: Whether to notify the registrants via email
+    :param force: Whether to generate the documents even if there are
+                  placeholders which could not be filled
+    :param progress_callback: A callable receiving the number of
+                              generated documents and the total number
+                              of documents after each document
+    :return: A tuple containing the IDs of the generated documents and
+             a list of templating errors.  If there are any errors and
+             `force` is not set, no documents are generated.
+    """
+    registrations = (Registration.query
+                     .join(RegistrationForm, Registration.registration_form_id == RegistrationForm.id)
+                     .filter(Registration.id.in_(registration_ids),
+                             RegistrationForm.event == event)
+                     .options(joinedload('registration_form'),
+                              selectinload('data'))
+                     .order_by(Registration.id)
+                     .all())
+    html_sources, errors = render_receipt_sources(event, template, registrations, custom_fields)
+    if errors and not force:
+        return [], errors
+
+    renderer = DocumentRenderer(event, template.css)
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M')
+    full_filename = slugify(filename, timestamp)
+    existing_counts = _get_existing_filename_counts(registrations, full_filename)
+    receipts = []
+    try:
+        for i, registration in enumerate(registrations, 1):
+            pdf_content = renderer.render([html_sources[registration]])
+            reg_filename = f'{full_filename}-{n}' if (n := existing_counts.get(registration.id)) else full_filename
+            f = File(
+                filename=secure_filename(f'{reg_filename}.pdf', f'document-{timestamp}.pdf'),
+                content_type='application/pdf',
+                meta={'event_id': event.id}
+            )
+            context = ('event', event.id, 'registration', registration.id, 'receipts')
+            f.save(context, pdf_content)
+            f.claim()
+            receipts.append(ReceiptFile(
+                file=f,
+                registration=registration,
+                template=template,
+                template_params=custom_fields,
+                is_published=publish
+            ))
+            if progress_callback:
+                progress_callback(i, len(registrations))
+
+        db.session.add_all(receipts)
+        db.session.flush()
+    except Exception:
+        # nothing will reference the files which have already been stored
+        for receipt in receipts:
+            receipt.file.delete()
+        raise
+    logger.info('Generated %d documents for %r using %r', len(receipts), event, template)
+    for receipt in receipts:
+        notify_registration_receipt_created(receipt.registration, receipt, notify_user=notify_users)
+        receipt.registration.log(EventLogRealm.management, LogKind.positive, 'Documents',
+                                 f'Document "{receipt.file.filename}" generated', session.user,
+                                 data={'Published': publish, 'Notified': notify_users})
+    return [receipt.file_id for receipt in receipts], errors
@@ -0,0 +1,97 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from io import BytesIO
+
+import pytest
+from flask import session
+
+from indico.modules.files.models.files import File
+from indico.modules.receipts import operations
+from indico.modules.receipts.models.files import ReceiptFile
+from indico.modules.receipts.operations import generate_receipts
+from indico.modules.receipts.tasks import generate_receipts_task, get_receipts_progress
+from indico.modules.receipts.util import DocumentRenderer, compile_jinja_template
+
+
+pytest_plugins = 'indico.modules.events.registration.testing.fixtures'
+
+
+@pytest.fixture
+def registrations(db, dummy_regform, create_registration, create_user):
+    registrations = [create_registration(create_user(i), dummy_regform) for i in range(1, 4)]
+    db.session.flush()
+    return registrations
+
+
+@pytest.mark.usefixtures('request_context')
+def test_generate_receipts_errors(dummy_event, dummy_event_template, registrations, mocker):
+    render = mocker.patch.object(DocumentRenderer, 'render')
+    dummy_event_template.html = '{{ custom_fields.missing }}'
+    receipt_ids, errors = generate_receipts(dummy_event, dummy_event_template, [r.id for r in registrations], {},
+                                            'document')
+    assert receipt_ids == []
+    assert [e['registration']['id'] for e in errors] == [r.id for r in registrations]
+    assert all(e['undefineds'] == ['missing'] for e in errors)
+    assert not render.called
+
+
+@pytest.mark.usefixtures('request_context')
+def test_generate_receipts(dummy_event, dummy_event_template, registrations, dummy_user, mocker):
+    session.set_session_user(dummy_user)
+    render = mocker.patch.object(DocumentRenderer, 'render', side_effect=lambda sources: BytesIO(b'%PDF'))
+    compile_template = mocker.spy(operations, 'compile_jinja_template')
+    progress = []
+    dummy_event_template.html = 'Hello {{ registration.id }}'
+    reg_ids = [r.id for r in registrations]
+    receipt_ids, errors = generate_receipts(dummy_event, dummy_event_template, reg_ids, {}, 'document',
+                                            progress_callback=lambda done, total: progress.append((done, total)))
+    assert errors == []
+    assert compile_template.call_count == 1
+    assert [c.args[0] for c in render.call_args_list] == [[f'Hello {reg_id}'] for reg_id in reg_ids]
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    receipts = ReceiptFile.query.filter(ReceiptFile.file_id.in_(receipt_ids)).all()
+    assert {r.registration for r in receipts} == set(registrations)
+    assert all(r.file.filename.startswith('document-') for r in receipts)
+    # generating the documents again gives them a unique filename
+    receipt_ids = generate_receipts(dummy_event, dummy_event_template, reg_ids[:1], {}, 'document')[0]
+    assert ReceiptFile.query.filter_by(file_id=receipt_ids[0]).one().file.filename.endswith('-1.pdf')
+
+
+def test_compile_jinja_template():
+    template = compile_jinja_template('{{ a }}-{{ b|format_placeholders(x="y") }}')
+    assert template.render(a=1, b='{x}') == '1-y'
+    assert compile_jinja_template('{{ a }}') is not template
+
+
+@pytest.mark.usefixtures('request_context')
+def test_generate_receipts_failed(dummy_event, dummy_event_template, registrations, dummy_user, mocker):
+    session.set_session_user(dummy_user)
+    render = mocker.patch.object(DocumentRenderer, 'render',
+                                 side_effect=[BytesIO(b'%PDF'), BytesIO(b'%PDF'), ValueError('boom')])
+    delete = mocker.spy(File, 'delete')
+    dummy_event_template.html = 'Hello {{ registration.id }}'
+    with pytest.raises(ValueError):
+        generate_receipts(dummy_event, dummy_event_template, [r.id for r in registrations], {}, 'document')
+    assert render.call_count == 3
+    # the files stored before the failure are deleted again
+    assert delete.call_count == 2
+
+
+@pytest.mark.usefixtures('request_context')
+def test_generate_receipts_task_template_error(dummy_event, dummy_event_template, registrations, dummy_user):
+    dummy_event_template.html = '{{ registration.id|unknown_filter }}'
+    generate_receipts_task.push_request(id='task')
+    try:
+        generate_receipts_task.run(dummy_event, dummy_event_template, [r.id for r in registrations], {}, 'document',
+                                   False, False, False, dummy_user)
+    finally:
+        generate_receipts_task.pop_request()
+    progress = get_receipts_progress('task')
+    assert progress['failed']
+    assert 'unknown_filter' in progress['error']
+    assert progress['event_id'] == dummy_event.id
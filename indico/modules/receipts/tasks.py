@@ -0,0 +1,64 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from datetime import timedelta
+
+from flask import session
+from werkzeug.exceptions import UnprocessableEntity
+
+from indico.core.cache import make_scoped_cache
+from indico.core.celery import celery
+from indico.core.db import db
+from indico.modules.receipts.operations import generate_receipts
+from indico.modules.receipts.util import logger
+
+
+#: Progress of running document generations, keyed by task id
+receipts_progress_cache = make_scoped_cache('receipts-generation')
+RECEIPTS_PROGRESS_TTL = timedelta(hours=6)
+
+
+def set_receipts_progress(task_id, event, done, total, receipt_ids=None, errors=None, error=None, failed=False):
+    receipts_progress_cache.set(task_id, {'event_id': event.id, 'done': done, 'total': total,
+                                          'receipt_ids': receipt_ids, 'errors': errors, 'error': error,
+                                          'failed': failed},
+                                timeout=RECEIPTS_PROGRESS_TTL)
+
+
+def get_receipts_progress(task_id):
+    return receipts_progress_cache.get(task_id)
+
+
+def _get_error_message(exc):
+    if messages := (getattr(exc, 'data', None) or {}).get('messages'):
+        return '\n'.join(msg for field_messages in messages.values() for msg in field_messages)
+    return str(exc.description)
+
+
+@celery.task(request_context=True)
+def generate_receipts_task(event, template, registration_ids, custom_fields, filename, publish, notify_users,
+                           force, user):
+    session.set_session_user(user)
+    task_id = generate_receipts_task.request.id
+    total = len(registration_ids)
+    try:
+        receipt_ids, errors = generate_receipts(
+            event, template, registration_ids, custom_fields, filename, publish=publish, notify_users=notify_users,
+            force=force, progress_callback=lambda done, total: set_receipts_progress(task_id, event, done, total)
+        )
+        db.session.commit()
+    except UnprocessableEntity as exc:
+        # an error in the template, which is shown to the user
+        db.session.rollback()
+        set_receipts_progress(task_id, event, 0, total, error=_get_error_message(exc), failed=True)
+        return
+    except Exception:
+        logger.exception('Generating documents for %r using %r failed', event, template)
+        db.session.rollback()
+        set_receipts_progress(task_id, event, 0, total, failed=True)
+        raise
+    set_receipts_progress(task_id, event, len(receipt_ids), total, receipt_ids=receipt_ids, errors=errors)
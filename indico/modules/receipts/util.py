@@ -15,7 +15,7 @@ from urllib.parse import urlparse
 
 import yaml
 from flask import current_app, g
-from jinja2 import TemplateRuntimeError, Undefined
+from jinja2 import Template, TemplateRuntimeError, Undefined
 from jinja2.exceptions import SecurityError, TemplateSyntaxError
 from jinja2.sandbox import SandboxedEnvironment
 from markupsafe import Markup
@@ -41,6 +41,7 @@ from indico.modules.events.registration.models.registrations import Registration
 from indico.modules.receipts.models.files import ReceiptFile
 from indico.modules.receipts.models.templates import ReceiptTemplate
 from indico.modules.receipts.settings import receipts_settings
+from indico.util.caching import memoize
 from indico.util.date_time import format_currency, format_date, format_datetime, format_interval, format_time, now_utc
 from indico.util.i18n import _
 from indico.util.iterables import materialize_iterable
@@ -146,33 +147,59 @@ def _format_placeholders(value, **kwargs):
     return value
 
 
-def compile_jinja_code(code: str, template_context: dict, *, use_stack: bool = False) -> str:
-    """Compile Jinja template of receipt in a sandboxed environment."""
+_template_errors = (TemplateSyntaxError, TemplateRuntimeError, SecurityError, LookupError, TypeError, ValueError)
+
+
+@memoize
+def _get_jinja_env(use_stack: bool) -> SandboxedEnvironment:
+    undefined_config = {'undefined': SilentUndefined} if use_stack else {}
+    env = SandboxedEnvironment(**undefined_config, autoescape=True)
+    env.filters.update({
+        'format_date': format_date,
+        'format_datetime': format_datetime,
+        'format_time': format_time,
+        'format_currency': format_currency,
+        'format_placeholders': _format_placeholders,
+    })
+    env.globals.update({
+        'format_interval': format_interval,
+    })
+    return env
+
+
+def compile_jinja_template(code: str, *, use_stack: bool = False) -> Template:
+    """Compile Jinja template of receipt in a sandboxed environment.
+
+    The compiled template can be rendered for any number of registrations
+    using :func:`render_jinja_template`.
+    """
     try:
-        undefined_config = {'undefined': SilentUndefined} if use_stack else {}
-        env = SandboxedEnvironment(**undefined_config, autoescape=True)
-        env.filters.update({
-            'format_date': format_date,
-            'format_datetime': format_datetime,
-            'format_time': format_time,
-            'format_currency': format_currency,
-            'format_placeholders': _format_placeholders,
-        })
-        env.globals.update({
-            'format_interval': format_interval,
-        })
-        return env.from_string(code).render(
-            **template_context,
-            now_utc=now_utc
-        )
-    except (TemplateSyntaxError, TemplateRuntimeError, SecurityError, LookupError, TypeError, ValueError) as e:
+        return _get_jinja_env(use_stack).from_string(code)
+    except _template_errors as e:
         raise UnprocessableEntity(e)
 
 
-def sandboxed_url_fetcher(event: Event, allow_event_images: bool = False) -> t.Callable[[str], dict]:
+def render_jinja_template(template: Template, template_context: dict) -> str:
+    """Render a template compiled using :func:`compile_jinja_template`."""
+    try:
+        return template.render(**template_context, now_utc=now_utc)
+    except _template_errors as e:
+        raise UnprocessableEntity(e)
+
+
+def compile_jinja_code(code: str, template_context: dict, *, use_stack: bool = False) -> str:
+    """Compile and render Jinja template of receipt in a sandboxed environment."""
+    return render_jinja_template(compile_jinja_template(code, use_stack=use_stack), template_context)
+
+
+def sandboxed_url_fetcher(event: Event, allow_event_images: bool = False, *,
+                          cache: dict | None = None) -> t.Callable[[str], dict]:
     """Fetch also "event-local" URLs.
 
     More info on fetchers: https://doc.courtbouillon.org/weasyprint/stable/first_steps.html#url-fetchers
+
+    :param cache: A dict in which fetched resources are kept, so they are
+                  only fetched once when rendering many documents
     """
     allow_external_urls = receipts_settings.get('allow_external_urls')
 
@@ -226,7 +253,57 @@ def sandboxed_url_fetcher(event: Event, allow_event_images: bool = False) -> t.C
 
         return default_url_fetcher(url)
 
-    return _fetcher
+    if cache is None:
+        return _fetcher
+
+    def _cached_fetcher(url: str) -> dict:
+        if url not in cache:
+            resource = _fetcher(url)
+            if 'file_obj' in resource:
+                with resource.pop('file_obj') as f:
+                    resource['string'] = f.read()
+            cache[url] = resource
+        return dict(cache[url])
+
+    return _cached_fetcher
+
+
+class DocumentRenderer:
+    """Render PDF documents using the same stylesheet.
+
+    The stylesheet is only parsed once and any images used in the
+    documents are only fetched once, so a single renderer should be
+    used when generating documents for many registrations.
+
+    :param event: The `Event` the PDFs relate to
+    :param css: CSS stylesheet to include
+    """
+
+    def __init__(self, event: Event, css: str):
+        self.event = event
+        self.url_fetcher = sandboxed_url_fetcher(event, allow_event_images=True, cache={})
+        try:
+            self.stylesheet = CSS(string=f'{css}{DEFAULT_CSS}', url_fetcher=sandboxed_url_fetcher(event))
+        except IndexError:
+            # error happens when parsing `flex: ;` in the stylesheet
+            # https://github.com/Kozea/WeasyPrint/issues/2012
+            abort(422, messages={'css': [_('Could not parse stylesheet')]})
+
+    def render(self, html_sources: list[str]) -> BytesIO:
+        """Create a PDF based on the given HTML sources.
+
+        :param html_sources: list of HTML pages (source) which will be rendered into the final document
+        :return: a the rendered PDF blob
+        """
+        documents = [
+            HTML(string=source, url_fetcher=self.url_fetcher).render(stylesheets=(self.stylesheet,))
+            for source in html_sources
+        ]
+        all_pages = [p for doc in documents for p in doc.pages]
+        f = BytesIO()
+        documents[0].copy(all_pages).write_pdf(f)
+        f.seek(0)
+        return f
 
 
 def create_pdf(event: Event, html_sources: list[str], css: str) -> BytesIO:
@@ -237,23 +314,7 @@ def create_pdf(event: Event, html_sources: list[str], css: str) -> BytesIO:
     :param css: CSS stylesheet to include
     :return: a the rendered PDF blob
     """
-    css_url_fetcher = sandboxed_url_fetcher(event)
-    html_url_fetcher = sandboxed_url_fetcher(event, allow_event_images=True)
-    try:
-        css = CSS(string=f'{css}{DEFAULT_CSS}', url_fetcher=css_url_fetcher)
-    except IndexError:
-        # error happens when parsing `flex: ;` in the stylesheet
-        # https://github.com/Kozea/WeasyPrint/issues/2012
-        abort(422, messages={'css': [_('Could not parse stylesheet')]})
-    documents = [
-        HTML(string=source, url_fetcher=html_url_fetcher).render(stylesheets=(css,))
-        for source in html_sources
-    ]
-    all_pages = [p for doc in documents for p in doc.pages]
-    f = BytesIO()
-    documents[0].copy(all_pages).write_pdf(f)
-    f.seek(0)
-    return f
+    return DocumentRenderer(event, css).render(html_sources)
 
 
 def get_safe_template_context(event: Event, registration: Registration, custom_fields: dict) -> dict:
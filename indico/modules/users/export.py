@@ -5,12 +5,12 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from pathlib import Path, PurePath
-from tempfile import NamedTemporaryFile
 from uuid import uuid4
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, BadZipFile, ZipFile
 
+import pytz
 import yaml
 from sqlalchemy.orm import joinedload, selectinload, subqueryload
 
@@ -34,12 +34,18 @@ from indico.modules.files.models.files import File
 from indico.modules.receipts.models.files import ReceiptFile
 from indico.modules.users import logger
 from indico.modules.users.models.export import DataExportOptions, DataExportRequest, DataExportRequestState
+from indico.util.archives import get_compress_type, read_stored_files
 from indico.util.date_time import now_utc
 from indico.util.fs import secure_filename
+from indico.util.string import crc32
 from indico.web.flask.templating import get_template_module
 from indico.web.flask.util import url_for
 
 
+#: How long the partial archive of a failed export may be reused
+PARTIAL_EXPORT_TTL = timedelta(days=1)
+
+
 def export_user_data(user, options, include_files):
     """Generate a zip file containing user data and files and save it in `user.data_export_request`."""
     export_request = user.data_export_request
@@ -76,31 +82,108 @@ def initialize_new_request(user, options, include_files):
 
 
 def generate_zip(user, data, files, max_size):
-    temp_file = NamedTemporaryFile(suffix='.zip', dir=config.TEMP_DIR, delete=False)  # noqa: SIM115
+    path = _get_partial_zip_path(user, data)
+    rv = _generate_zip(user, data, files, max_size, path)
+    # if anything failed, the partial archive is kept so another export can reuse the files in it
+    path.unlink(missing_ok=True)
+    return rv
+
+
+def _get_partial_zip_path(user, data):
+    key = crc32(','.join(sorted(data)))
+    return Path(config.TEMP_DIR) / f'user-data-export-{user.id}-{key}.zip'
+
+
+def _get_existing_files(path, names, data_names):
+    """Get the files which are already in a partially generated archive.
+
+    The archive is only reused if it is recent and does not contain
+    anything that does not belong to the current export.  Data files
+    from a previous attempt are removed from it since they are written
+    again with the current data.
+    """
+    try:
+        mtime = _get_mtime(path)
+    except FileNotFoundError:
+        return set()
+    existing = None
+    if mtime > now_utc() - PARTIAL_EXPORT_TTL:
+        try:
+            with ZipFile(path) as zip_file:
+                existing = set(zip_file.namelist())
+        except (OSError, BadZipFile):
+            pass
+    if existing is None or not existing <= (names | data_names):
+        path.unlink()
+        return set()
+    if outdated := existing & data_names:
+        _remove_from_zip(path, outdated)
+    return existing - outdated
+
+
+def _remove_from_zip(path, names):
+    tmp_path = path.with_name(f'{path.name}.tmp')
     try:
-        return _generate_zip(user, data, files, max_size, temp_file)
-    finally:
-        Path(temp_file.name).unlink(missing_ok=True)
+        with ZipFile(path) as src, ZipFile(tmp_path, 'w', allowZip64=True) as dst:
+            for info in src.infolist():
+                if info.filename not in names:
+                    dst.writestr(info, src.read(info))
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    tmp_path.replace(path)
 
 
-def _generate_zip(user, data, files, max_size, temp_file):
+def _get_mtime(path):
+    return datetime.fromtimestamp(path.stat().st_mtime, pytz.UTC)
+
+
+def delete_old_partial_exports():
+    """Delete the partial archives of failed exports which are too old to be reused.
+
+    :return: The number of deleted files
+    """
+    threshold = now_utc() - PARTIAL_EXPORT_TTL
+    count = 0
+    for path in Path(config.TEMP_DIR).glob('user-data-export-*.zip*'):
+        try:
+            if _get_mtime(path) > threshold:
+                continue
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        count += 1
+    return count
+
+
+def _generate_zip(user, data, files, max_size, path):
+    # decide which files fit before reading any of them
     max_size_exceeded = False
-    with ZipFile(temp_file, 'w', allowZip64=True) as zip_file:
+    paths = {}
+    written = 0
+    for file in files:
+        written += getattr(file, 'file', file).size
+        if written > max_size:
+            max_size_exceeded = True
+            break
+        paths.setdefault(build_storage_path(file), getattr(file, 'file', file))
+
+    data_names = {f'{key}.yaml' for key in data}
+    existing = _get_existing_files(path, set(paths), data_names)
+    if existing:
+        logger.info('Reusing %d files from partial user data export of %r', len(existing), user)
+    items = ((name, file) for name, file in paths.items() if name not in existing)
+    # if writing fails, closing the archive still writes its central directory
+    # so the files added so far can be reused by the next export
+    with ZipFile(path, 'a', allowZip64=True) as zip_file:
+        for name, content in read_stored_files(items):
+            zip_file.writestr(name, content, compress_type=get_compress_type(name))
         for key, subdata in data.items():
-            zip_file.writestr(f'{key}.yaml', convert_to_yaml(subdata))
-
-        written = 0
-        for file in files:
-            written += getattr(file, 'file', file).size
-            if written <= max_size:
-                write_file(zip_file, file)
-            else:
-                max_size_exceeded = True
-                break
-
-    temp_file.seek(0)
+            zip_file.writestr(f'{key}.yaml', convert_to_yaml(subdata), compress_type=ZIP_DEFLATED)
+
     file = File(filename='data-export.zip', content_type='application/zip')
-    file.save(('user', user.id), temp_file)
+    with path.open('rb') as f:
+        file.save(('user', user.id), f)
     file.claim()
     return file, max_size_exceeded
 
@@ -125,13 +208,6 @@ def options_to_fields(options):
     return fields
 
 
-def write_file(zip_file, file):
-    path = build_storage_path(file)
-    file = getattr(file, 'file', file)
-    with file.open() as f:
-        zip_file.writestr(path, f.read())
-
-
 def get_user_files(export_request):
     """Get all files tied to a given user."""
     user = export_request.user
@@ -5,9 +5,8 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
-from datetime import datetime
-from io import BytesIO
-from pathlib import Path
+import os
+from datetime import datetime, timedelta
 from zipfile import ZipFile
 
 import pytest
@@ -19,10 +18,11 @@ from indico.modules.events.contributions.models.persons import ContributionPerso
 from indico.modules.events.editing.models.revisions import RevisionType
 from indico.modules.events.models.persons import EventPerson
 from indico.modules.files.models.files import File
-from indico.modules.users.export import (build_storage_path, convert_to_yaml, export_user_data, get_abstracts,
-                                         get_attachments, get_contributions, get_editables, get_old_requests,
-                                         get_papers, get_registration_documents, get_registration_files,
-                                         get_subcontributions, options_to_fields, serialize_user_data)
+from indico.modules.users.export import (_get_partial_zip_path, build_storage_path, convert_to_yaml,
+                                         delete_old_partial_exports, export_user_data, get_abstracts, get_attachments,
+                                         get_contributions, get_editables, get_old_requests, get_papers,
+                                         get_registration_documents, get_registration_files, get_subcontributions,
+                                         options_to_fields, serialize_user_data)
 from indico.modules.users.models.export import DataExportOptions, DataExportRequest, DataExportRequestState
 from indico.util.date_time import now_utc
 
@@ -31,27 +31,12 @@ pytest_plugins = ('indico.modules.events.registration.testing.fixtures',
                   'indico.modules.users.testing.fixtures')
 
 
-@pytest.fixture
-def mock_io(mocker):
-    class MockNamedTemporaryFile(BytesIO):
-        name = '/tmp/somefile'  # noqa: S108
-
-        def __init__(self, *args, **kwargs):
-            super().__init__()
-
-    # We don't want to write to the disk
-    mocker.patch('indico.modules.users.export.NamedTemporaryFile', MockNamedTemporaryFile)
-    # We don't want to delete anything from the disk either
-    mocker.patch.object(Path, 'unlink')
-
-
 @pytest.fixture
 def all_data_yamls():
     fields = options_to_fields(list(DataExportOptions))
     return [f'{x}.yaml' for x in fields]
 
 
-@pytest.mark.usefixtures('mock_io')
 def test_export_user_data_existing_request(mocker, db, dummy_user):
     mock = mocker.patch('indico.modules.users.export.generate_zip')
 
@@ -61,7 +46,6 @@ def test_export_user_data_existing_request(mocker, db, dummy_user):
     mock.assert_not_called()
 
 
-@pytest.mark.usefixtures('mock_io')
 def test_export_user_data_error(mocker, dummy_user):
     success = mocker.patch('indico.modules.users.export.notify_data_export_success')
     failure = mocker.patch('indico.modules.users.export.notify_data_export_failure')
@@ -76,7 +60,7 @@ def test_export_user_data_error(mocker, dummy_user):
     success.assert_not_called()
 
 
-@pytest.mark.usefixtures('mock_io', 'dummy_attachment', 'dummy_abstract_file', 'dummy_paper_file',
+@pytest.mark.usefixtures('dummy_attachment', 'dummy_abstract_file', 'dummy_paper_file',
                          'dummy_editing_revision_file', 'dummy_reg_with_file_field')
 def test_export_user_data(mocker, dummy_user, all_data_yamls):
     success = mocker.patch('indico.modules.users.export.notify_data_export_success')
@@ -95,17 +79,17 @@ def test_export_user_data(mocker, dummy_user, all_data_yamls):
     with file.open() as f:
         zip_file = ZipFile(f)
         assert zip_file.namelist() == [
-            *all_data_yamls,
             'attachments/420_dummy_file.txt',
             ('abstracts/0_dummy0/420_Broken_Symmetry_and_the_Mass_of_Gauge_Vector_Mesons/'
              '420_dummy_abstract_file.txt'),
             'papers/0_dummy0/420_Dummy_Contribution/420_dummy_file.txt',
             'editables/paper/0_dummy0/420_Dummy_Contribution/420_dummy_file.txt',
-            'registrations/0_dummy0/730_730_registration_upload.txt'
+            'registrations/0_dummy0/730_730_registration_upload.txt',
+            *all_data_yamls,
         ]
 
 
-@pytest.mark.usefixtures('mock_io', 'dummy_attachment', 'dummy_abstract_file', 'dummy_paper_file',
+@pytest.mark.usefixtures('dummy_attachment', 'dummy_abstract_file', 'dummy_paper_file',
                          'dummy_editing_revision_file', 'dummy_reg_with_file_field')
 def test_export_user_data_no_files(mocker, dummy_user, all_data_yamls):
     success = mocker.patch('indico.modules.users.export.notify_data_export_success')
@@ -179,7 +163,39 @@ def test_export_user_data_max_size_exceeded_2(mocker, dummy_user, dummy_attachme
     file = File.query.filter(File.filename == 'data-export.zip').first()
     with file.open() as f:
         zip_file = ZipFile(f)
-        assert zip_file.namelist() == [*all_data_yamls, 'attachments/420_dummy_file.txt']
+        assert zip_file.namelist() == ['attachments/420_dummy_file.txt', *all_data_yamls]
+
+
+@pytest.mark.usefixtures('dummy_attachment', 'dummy_abstract_file')
+@pytest.mark.parametrize(('partial_names', 'reused'), (
+    (['attachments/420_dummy_file.txt'], True),
+    (['attachments/420_dummy_file.txt', 'personal_data.yaml'], True),
+    (['attachments/420_dummy_file.txt', 'attachments/1_deleted.txt'], False),
+))
+def test_export_user_data_partial(mocker, dummy_user, all_data_yamls, partial_names, reused):
+    mocker.patch('indico.modules.users.export.notify_data_export_success')
+    options = list(DataExportOptions)
+    data = dict.fromkeys(options_to_fields(options))
+    # a previous export failed after having added some files
+    with ZipFile(_get_partial_zip_path(dummy_user, data), 'w') as zip_file:
+        for name in partial_names:
+            zip_file.writestr(name, b'from partial export')
+
+    export_user_data(dummy_user, options, include_files=True)
+
+    assert dummy_user.data_export_request.state == DataExportRequestState.success
+    assert not _get_partial_zip_path(dummy_user, data).exists()
+    with dummy_user.data_export_request.file.open() as f:
+        zip_file = ZipFile(f)
+        assert zip_file.namelist() == [
+            'attachments/420_dummy_file.txt',
+            ('abstracts/0_dummy0/420_Broken_Symmetry_and_the_Mass_of_Gauge_Vector_Mesons/'
+             '420_dummy_abstract_file.txt'),
+            *all_data_yamls,
+        ]
+        content = zip_file.read('attachments/420_dummy_file.txt')
+        assert content == (b'from partial export' if reused else b'hello world')
+        assert zip_file.read('personal_data.yaml') != b'from partial export'
 
 
 def test_serialize_user_data(dummy_user):
@@ -400,3 +416,16 @@ def test_get_old_requests(db, dummy_user, create_file):
                       requested_dt=now_utc(),
                       state=DataExportRequestState.failed)
     assert not get_old_requests(days=10)
+
+
+def test_delete_old_partial_exports(patch_indico_config, tmp_path):
+    patch_indico_config('TEMP_DIR', str(tmp_path))
+    old_time = (now_utc() - timedelta(days=2)).timestamp()
+    paths = {name: tmp_path / name for name in ('user-data-export-1-123.zip', 'user-data-export-2-456.zip',
+                                                'user-data-export-3-789.zip.tmp', 'something-else.zip')}
+    for name, path in paths.items():
+        path.write_bytes(b'data')
+        if name != 'user-data-export-2-456.zip':
+            os.utime(path, (old_time, old_time))
+    assert delete_old_partial_exports() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['something-else.zip', 'user-data-export-2-456.zip']
@@ -11,6 +11,7 @@ from sqlalchemy.orm.attributes import flag_modified
 from indico.core.celery import celery
 from indico.core.db import db
 from indico.modules.users import logger
+from indico.modules.users.export import delete_old_partial_exports
 from indico.modules.users.export import export_user_data as _export_user_data
 from indico.modules.users.export import get_old_requests
 from indico.modules.users.models.export import DataExportRequestState
@@ -70,3 +71,6 @@ def user_data_export_cleanup(days=30):
         if request.file:
             request.file.claimed = False
     db.session.commit()
+
+    if num_partial := delete_old_partial_exports():
+        logger.info('Deleted %d partial user data exports', num_partial)
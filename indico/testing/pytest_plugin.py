@@ -12,6 +12,7 @@ import sys
 import tempfile
 
 import py
+import pytest
 
 
 # Ignore config file in case there is one
@@ -39,6 +40,8 @@ def pytest_configure(config):
     logging.root.addHandler(logging.NullHandler())
     # Silence the annoying pycountry logger
     logging.getLogger('pycountry.db').addHandler(logging.NullHandler())
+    config.addinivalue_line('markers', 'query_budget(max_queries=None, *, max_repeats=None, max_query_duration=None, '
+                                       'warn=False): limit the SQL queries executed by the test')
 
 
 def pytest_unconfigure(config):
@@ -47,3 +50,14 @@ def pytest_unconfigure(config):
 
 def pytest_addoption(parser):
     parser.addini('indico_plugins', 'List of indico plugins to load')
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # Only the test itself is checked, queries executed by fixtures do not count
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        return (yield)
+    from indico.testing.queries import query_budget
+    with query_budget(*marker.args, **marker.kwargs):
+        return (yield)
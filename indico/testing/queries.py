@@ -0,0 +1,127 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.event import listen, remove
+
+from indico.web.flask.profiler import fingerprint_sql, get_sql_call_site
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when code executes more queries than allowed."""
+
+
+class QueryBudgetWarning(UserWarning):
+    """Emitted instead of failing when a query budget is only advisory."""
+
+
+class QueryRecorder:
+    """Record all SQL statements executed while active.
+
+    This uses the same engine events as the request stats, but works
+    outside requests as well (e.g. in tests or benchmarks)::
+
+        with QueryRecorder() as recorder:
+            do_something()
+        assert recorder.count < 10
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        listen(Engine, 'before_cursor_execute', self._before_cursor_execute, named=True)
+        listen(Engine, 'after_cursor_execute', self._after_cursor_execute, named=True)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        remove(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        remove(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, context, **unused):
+        context._query_recorder_start_time = time.perf_counter()
+
+    def _after_cursor_execute(self, context, statement, **unused):
+        duration = time.perf_counter() - context._query_recorder_start_time
+        self.queries.append((fingerprint_sql(statement), duration, get_sql_call_site()))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for __, duration, __ in self.queries)
+
+    def get_repeated(self, threshold):
+        """Get statements executed more than `threshold` times.
+
+        :return: A list of ``(fingerprint, count, call_sites)`` tuples.
+        """
+        counts = Counter(fingerprint for fingerprint, __, __ in self.queries)
+        return [(fingerprint, count, sorted({cs for fp, __, cs in self.queries if fp == fingerprint and cs}))
+                for fingerprint, count in counts.most_common()
+                if count > threshold]
+
+    def get_slow(self, threshold):
+        """Get the statements which took longer than `threshold` seconds."""
+        return [(fingerprint, duration, call_site) for fingerprint, duration, call_site in self.queries
+                if duration > threshold]
+
+    def check_budget(self, max_queries=None, max_repeats=None, max_query_duration=None):
+        """Check whether the recorded queries are within a budget.
+
+        :param max_queries: The maximum number of queries
+        :param max_repeats: How often the same statement may be executed
+        :param max_query_duration: The maximum duration (in seconds) of a
+                                   single query
+        :return: A list of messages describing any budget violations
+        """
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f'{self.count} queries executed, the budget is {max_queries}')
+        if max_repeats is not None:
+            for fingerprint, count, call_sites in self.get_repeated(max_repeats):
+                problems.append(f'{count}x (more than {max_repeats}x) from {", ".join(call_sites) or "unknown"}: '
+                                f'{fingerprint}')
+        if max_query_duration is not None:
+            for fingerprint, duration, call_site in self.get_slow(max_query_duration):
+                problems.append(f'{duration * 1000:.1f}ms (more than {max_query_duration * 1000:.1f}ms) from '
+                                f'{call_site or "unknown"}: {fingerprint}')
+        return problems
+
+
+@contextmanager
+def query_budget(max_queries=None, *, max_repeats=None, max_query_duration=None, warn=False):
+    """Ensure that a block of code stays within a query budget.
+
+    Exceeding the budget raises a :exc:`QueryBudgetExceeded` error, or
+    emits a :exc:`QueryBudgetWarning` if `warn` is set.  When using pytest,
+    the ``query_budget`` marker with the same arguments can be used to apply
+    a budget to a whole test (excluding its fixtures).
+
+    :param max_queries: The maximum number of queries
+    :param max_repeats: How often the same statement may be executed (this is
+                        typically an N+1 query pattern)
+    :param max_query_duration: The maximum duration (in seconds) of a single query
+    :param warn: Whether to only warn instead of failing
+    """
+    with QueryRecorder() as recorder:
+        yield recorder
+    problems = recorder.check_budget(max_queries, max_repeats, max_query_duration)
+    if not problems:
+        return
+    msg = 'Query budget exceeded:\n' + '\n'.join(f'  - {p}' for p in problems)
+    if warn:
+        warnings.warn(msg, QueryBudgetWarning, stacklevel=3)
+    else:
+        raise QueryBudgetExceeded(msg)
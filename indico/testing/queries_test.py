@@ -0,0 +1,57 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+
+from indico.modules.users import User
+from indico.testing.queries import QueryBudgetExceeded, QueryBudgetWarning, QueryRecorder, query_budget
+
+
+def _load_users(db, ids):
+    for user_id in ids:
+        db.session.get(User, user_id, populate_existing=True)
+
+
+def test_query_recorder(db, dummy_user):
+    with QueryRecorder() as recorder:
+        _load_users(db, [dummy_user.id] * 3)
+    _load_users(db, [dummy_user.id])
+    assert recorder.count == 3
+    (fingerprint, count, call_sites), = recorder.get_repeated(2)
+    assert count == 3
+    assert fingerprint.startswith('SELECT ')
+    assert fingerprint.endswith('WHERE users.users.id = ?')
+    assert call_sites == ['indico/testing/queries_test.py:16']
+    assert not recorder.get_repeated(3)
+    assert recorder.get_slow(0) == recorder.queries
+    assert not recorder.get_slow(60)
+
+
+def test_query_budget(db, dummy_user):
+    with query_budget(3, max_repeats=3):
+        _load_users(db, [dummy_user.id] * 3)
+    with pytest.raises(QueryBudgetExceeded, match='4 queries executed, the budget is 3'):
+        with query_budget(3):
+            _load_users(db, [dummy_user.id] * 4)
+    with pytest.raises(QueryBudgetExceeded, match=r'3x \(more than 2x\) from indico/testing/queries_test.py:16'):
+        with query_budget(max_repeats=2):
+            _load_users(db, [dummy_user.id] * 3)
+    with pytest.raises(QueryBudgetExceeded, match=r'more than 0.0ms'):
+        with query_budget(max_query_duration=0):
+            _load_users(db, [dummy_user.id])
+
+
+def test_query_budget_warn(db, dummy_user):
+    with pytest.warns(QueryBudgetWarning, match='2 queries executed, the budget is 1'):
+        with query_budget(1, warn=True):
+            _load_users(db, [dummy_user.id] * 2)
+
+
+@pytest.mark.query_budget(2, max_repeats=2)
+def test_query_budget_marker(db, dummy_user):
+    # fixtures do not count towards the budget
+    _load_users(db, [dummy_user.id] * 2)
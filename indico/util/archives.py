@@ -0,0 +1,73 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import ZIP_DEFLATED, ZIP_STORED
+
+
+#: File types which are already compressed and thus stored as they are
+COMPRESSED_EXTENSIONS = frozenset({'.7z', '.docx', '.gif', '.gz', '.jpeg', '.jpg', '.mp3', '.mp4', '.odp', '.ods',
+                                   '.odt', '.pdf', '.png', '.pptx', '.webm', '.webp', '.woff', '.woff2', '.xlsx',
+                                   '.zip'})
+#: The number of threads used to read stored files
+READ_WORKERS = 4
+#: The maximum amount of file data which has been read but not consumed yet
+MAX_PENDING_SIZE = 64 * 1024 * 1024
+
+
+def get_compress_type(filename):
+    """Get the ZIP compression method to use for a file.
+
+    Compressing files which are already compressed takes a lot of
+    time without making them noticeably smaller, so such files are
+    stored as they are.
+    """
+    return ZIP_STORED if os.path.splitext(filename)[1].lower() in COMPRESSED_EXTENSIONS else ZIP_DEFLATED
+
+
+def _read_file(storage, storage_file_id):
+    with storage.open(storage_file_id) as f:
+        return f.read()
+
+
+def read_stored_files(items, *, max_workers=READ_WORKERS, max_pending_size=MAX_PENDING_SIZE):
+    """Read the content of many stored files concurrently.
+
+    The files are read in a thread pool, which is much faster than
+    reading them one after another when the storage backend has some
+    latency (e.g. S3).  To keep the memory usage bounded, no new files
+    are read while the files which have been read but not consumed yet
+    exceed `max_pending_size` (unless there are none).
+
+    :param items: An iterable of ``(obj, file)`` tuples, where `file` is
+                  a :class:`~indico.core.storage.StoredFileMixin` and
+                  `obj` is anything the caller needs to process the file.
+    :param max_workers: The number of threads reading files
+    :param max_pending_size: The maximum size of the pending files
+    :return: An iterator yielding ``(obj, data)`` tuples in the same
+             order as `items`
+    """
+    pending = deque()
+    pending_size = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for obj, file in items:
+            while pending and pending_size + file.size > max_pending_size:
+                pending_obj, size, future = pending.popleft()
+                pending_size -= size
+                yield pending_obj, future.result()
+            # the storage is resolved here since this may need the app context
+            future = executor.submit(_read_file, file.storage, file.storage_file_id)
+            pending.append((obj, file.size, future))
+            pending_size += file.size
+        while pending:
+            pending_obj, __, future = pending.popleft()
+            yield pending_obj, future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
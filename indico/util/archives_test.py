@@ -0,0 +1,39 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from io import BytesIO
+from types import SimpleNamespace
+from zipfile import ZIP_DEFLATED, ZIP_STORED
+
+import pytest
+
+from indico.util.archives import get_compress_type, read_stored_files
+
+
+class _MockStorage:
+    def open(self, file_id):
+        return BytesIO(file_id.encode())
+
+
+@pytest.mark.parametrize(('filename', 'expected'), (
+    ('slides.pdf', ZIP_STORED),
+    ('photo.JPG', ZIP_STORED),
+    ('data.yaml', ZIP_DEFLATED),
+    ('README', ZIP_DEFLATED),
+))
+def test_get_compress_type(filename, expected):
+    assert get_compress_type(filename) == expected
+
+
+@pytest.mark.parametrize('max_pending_size', (0, 3, 1000))
+def test_read_stored_files(max_pending_size):
+    storage = _MockStorage()
+    files = [SimpleNamespace(storage=storage, storage_file_id=f'file-{i}', size=6) for i in range(20)]
+    items = ((i, f) for i, f in enumerate(files))
+    assert list(read_stored_files(items, max_pending_size=max_pending_size)) == [
+        (i, f'file-{i}'.encode()) for i in range(20)
+    ]
@@ -5,7 +5,9 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import statistics
 import time
+from contextlib import nullcontext
 from math import isinf
 
 import click
@@ -67,3 +69,96 @@ class Benchmark:
             click.secho(str(self), fg='yellow', bold=True)
         else:
             click.secho(str(self), fg='green', bold=True)
+
+
+class BenchmarkSuite:
+    """A collection of benchmarks producing comparable results.
+
+    Benchmarks are registered using the :meth:`add` decorator.  The
+    decorated function performs any setup and returns a callable which
+    is then executed (and timed) several times::
+
+        suite = BenchmarkSuite()
+
+        @suite.add('something')
+        def _bench_something():
+            obj = load_something()
+            return lambda: obj.do_something()
+    """
+
+    def __init__(self):
+        self.benchmarks = {}
+
+    def add(self, name):
+        def decorator(fn):
+            self.benchmarks[name] = fn
+            return fn
+        return decorator
+
+    def run(self, names=None, *, repeat=5, warmup=1, context=nullcontext, callback=None):
+        """Run the benchmarks.
+
+        :param names: The names of the benchmarks to run (default: all)
+        :param repeat: How often each benchmark is timed
+        :param warmup: How often each benchmark is executed before
+                       timing it, e.g. to populate caches
+        :param context: A callable returning a context manager in which
+                        each execution of a benchmark takes place
+        :param callback: A callable invoked with the name and result of
+                         each benchmark once it finished
+        :return: A dict mapping benchmark names to their results
+        """
+        from indico.testing.queries import QueryRecorder
+
+        results = {}
+        for name, fn in self.benchmarks.items():
+            if names and name not in names:
+                continue
+            func = fn()
+            for __ in range(warmup):
+                with context():
+                    func()
+            durations = []
+            query_counts = []
+            for __ in range(repeat):
+                with context(), QueryRecorder() as recorder, Benchmark() as b:
+                    func()
+                durations.append(float(b))
+                query_counts.append(recorder.count)
+            results[name] = {
+                'min': min(durations),
+                'max': max(durations),
+                'mean': statistics.mean(durations),
+                'median': statistics.median(durations),
+                'stdev': statistics.stdev(durations) if len(durations) > 1 else 0,
+                'queries': max(query_counts),
+            }
+            if callback:
+                callback(name, results[name])
+        return results
+
+
+def compare_benchmark_results(old, new, threshold=0.1):
+    """Compare two sets of benchmark results.
+
+    :param old: The results of the reference run
+    :param new: The results of the current run
+    :param threshold: The relative slowdown (of the median) which is
+                      considered a regression
+    :return: A list of dicts containing the change for each benchmark
+             present in both runs.
+    """
+    rv = []
+    for name, result in new.items():
+        if name not in old:
+            continue
+        old_result = old[name]
+        change = (result['median'] - old_result['median']) / old_result['median'] if old_result['median'] else 0
+        rv.append({'name': name,
+                   'old_median': old_result['median'],
+                   'new_median': result['median'],
+                   'change': change,
+                   'old_queries': old_result['queries'],
+                   'new_queries': result['queries'],
+                   'regression': change > threshold or result['queries'] > old_result['queries']})
+    return rv
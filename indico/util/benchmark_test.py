@@ -0,0 +1,64 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+from contextlib import contextmanager
+
+from indico.modules.users import User
+from indico.util.benchmark import BenchmarkSuite, compare_benchmark_results
+
+
+def test_benchmark_suite(db, dummy_user):
+    suite = BenchmarkSuite()
+    calls = []
+    contexts = []
+
+    @suite.add('users')
+    def _bench_users():
+        calls.append('setup')
+
+        def _run():
+            calls.append('run')
+            db.session.get(User, dummy_user.id, populate_existing=True)
+            db.session.get(User, dummy_user.id, populate_existing=True)
+
+        return _run
+
+    @suite.add('other')
+    def _bench_other():
+        return lambda: calls.append('other')
+
+    @contextmanager
+    def _context():
+        contexts.append(True)
+        yield
+
+    results = suite.run(['users'], repeat=3, context=_context,
+                        callback=lambda name, result: calls.append(f'done:{name}'))
+    assert calls == ['setup', 'run', 'run', 'run', 'run', 'done:users']
+    assert len(contexts) == 4
+    result = results['users']
+    assert set(result) == {'min', 'max', 'mean', 'median', 'stdev', 'queries'}
+    assert result['min'] <= result['median'] <= result['max']
+    assert result['queries'] == 2
+
+
+def test_compare_benchmark_results():
+    old = {'a': {'median': 1.0, 'queries': 10},
+           'b': {'median': 1.0, 'queries': 10},
+           'c': {'median': 1.0, 'queries': 10},
+           'removed': {'median': 1.0, 'queries': 10}}
+    new = {'a': {'median': 1.05, 'queries': 10},
+           'b': {'median': 1.5, 'queries': 5},
+           'c': {'median': 0.5, 'queries': 11},
+           'added': {'median': 1.0, 'queries': 10}}
+    rv = {x['name']: x for x in compare_benchmark_results(old, new, threshold=0.1)}
+    assert set(rv) == {'a', 'b', 'c'}
+    assert not rv['a']['regression']
+    assert rv['b']['regression']
+    assert rv['b']['change'] == 0.5
+    assert rv['c']['regression']
+    assert rv['c']['change'] == -0.5
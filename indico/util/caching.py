@@ -5,7 +5,11 @@
 # modify it under the terms of the MIT License; see the
 # LICENSE file for more details.
 
+import time
+from collections import namedtuple
+from datetime import timedelta
 from functools import wraps
+from importlib import import_module
 from inspect import getcallargs
 
 from flask import current_app, g, has_request_context
@@ -13,6 +17,16 @@ from flask import current_app, g, has_request_context
 
 _notset = object()
 
+#: How often memoized values using refresh-ahead are checked and recomputed
+REFRESH_AHEAD_INTERVAL = timedelta(minutes=5)
+
+# Functions memoized with refresh-ahead, indexed by their registry key
+_refresh_ahead_functions = {}
+# The cache key containing the registry keys of all functions with cached values
+_refresh_ahead_index_key = '_refresh_ahead_index_'
+
+_RefreshAheadEntry = namedtuple('_RefreshAheadEntry', ('value', 'computed_ts', 'accessed'))
+
 
 def make_hashable(obj):
     if isinstance(obj, list):
@@ -57,7 +71,7 @@ def memoize_request(f):
     return memoizer
 
 
-def memoize_redis(ttl, *, versioned=False):
+def memoize_redis(ttl, *, versioned=False, refresh_ahead=False):
     """Memoize a function in redis.
 
     The cached value can be cleared by calling the method
@@ -66,20 +80,41 @@ def memoize_redis(ttl, *, versioned=False):
     whether a value has been cached call ``is_cached()`` in the
     same way.
 
+    When using refresh-ahead, the ``refresh_memoized`` task recomputes
+    cached values in the background shortly before they expire, so
+    users do not need to wait for them.  Only values which have been
+    used since they were last computed are recomputed; other ones
+    expire normally.  The function needs to be defined at the module
+    level and its arguments must be picklable.
+
     :param ttl: How long the result should be cached.  May be a
                 timedelta or a number (seconds).
+    :param versioned: Whether to support invalidating all cached
+                      values using ``bump_version()``.
+    :param refresh_ahead: Whether to recompute cached values in the
+                          background before they expire.
     """
     from indico.core.cache import make_scoped_cache
     cache = make_scoped_cache('memoize')
+    ttl_seconds = ttl.total_seconds() if isinstance(ttl, timedelta) else ttl
+    if refresh_ahead and ttl_seconds <= REFRESH_AHEAD_INTERVAL.total_seconds():
+        raise ValueError('The ttl must be longer than the refresh-ahead interval')
 
     def decorator(f):
         version_key = '_version_', f.__module__, f.__name__
+        registry_key = '_refresh_ahead_', f.__module__, f.__qualname__
 
-        def _get_key(args, kwargs):
+        def _make_key(callargs):
             version_parts = ()
             if versioned:
                 version_parts = (cache.get(version_key, 0),)
-            return *version_parts, f.__module__, f.__name__, make_hashable(getcallargs(f, *args, **kwargs))
+            if refresh_ahead:
+                # values cached with refresh-ahead are stored differently
+                version_parts += ('refresh-ahead',)
+            return *version_parts, f.__module__, f.__name__, callargs
+
+        def _get_key(args, kwargs):
+            return _make_key(make_hashable(getcallargs(f, *args, **kwargs)))
 
         def _clear_cached(*args, **kwargs):
             cache.delete(_get_key(args, kwargs))
@@ -92,12 +127,52 @@ def memoize_redis(ttl, *, versioned=False):
                 new_version = cache.get(version_key, 0) + 1
             cache.set(version_key, new_version)
 
+        def _register(callargs, args, kwargs):
+            # this is not atomic, but losing an entry just means that it
+            # expires normally, and the next call registers it again
+            registry = cache.get(registry_key) or {}
+            registry[callargs] = (args, kwargs)
+            cache.set(registry_key, registry)
+            index = cache.get(_refresh_ahead_index_key) or set()
+            if registry_key not in index:
+                cache.set(_refresh_ahead_index_key, index | {registry_key})
+
+        def _compute(key, args, kwargs):
+            value = f(*args, **kwargs)
+            cache.set(key, _RefreshAheadEntry(value, time.time(), False), timeout=ttl)
+            return value
+
+        def _refresh_expiring():
+            registry = cache.get(registry_key) or {}
+            threshold = time.time() - ttl_seconds + REFRESH_AHEAD_INTERVAL.total_seconds()
+            for callargs, (args, kwargs) in list(registry.items()):
+                key = _make_key(callargs)
+                entry = cache.get(key)
+                if entry is None:
+                    del registry[callargs]
+                elif entry.accessed and entry.computed_ts <= threshold:
+                    _compute(key, args, kwargs)
+            cache.set(registry_key, registry)
+
         @wraps(f)
         def memoizer(*args, **kwargs):
             if current_app.config['TESTING'] or current_app.config.get('REPL'):
                 # No memoization during tests or in the shell
                 return f(*args, **kwargs)
 
+            if refresh_ahead:
+                callargs = make_hashable(getcallargs(f, *args, **kwargs))
+                key = _make_key(callargs)
+                entry = cache.get(key)
+                if entry is None:
+                    value = _compute(key, args, kwargs)
+                    _register(callargs, args, kwargs)
+                    return value
+                if not entry.accessed:
+                    remaining = ttl_seconds - (time.time() - entry.computed_ts)
+                    cache.set(key, entry._replace(accessed=True), timeout=max(1, int(remaining)))
+                return entry.value
+
             key = _get_key(args, kwargs)
             value = cache.get(key, _notset)
             if value is _notset:
@@ -109,6 +184,31 @@ def memoize_redis(ttl, *, versioned=False):
         memoizer.is_cached = _is_cached
         if versioned:
             memoizer.bump_version = _bump_version
+        if refresh_ahead:
+            memoizer.refresh_expiring = _refresh_expiring
+            _refresh_ahead_functions[registry_key] = memoizer
         return memoizer
 
     return decorator
+
+
+def refresh_memoized_values():
+    """Recompute memoized values using refresh-ahead which expire soon."""
+    from indico.core.cache import make_scoped_cache
+    from indico.core.logger import Logger
+    cache = make_scoped_cache('memoize')
+    index = cache.get(_refresh_ahead_index_key) or set()
+    for registry_key in sorted(index):
+        __, module, name = registry_key
+        try:
+            # the function is registered when its module is imported
+            import_module(module)
+            func = _refresh_ahead_functions[registry_key]
+        except (ImportError, KeyError):
+            # the function does not exist anymore
+            cache.set(_refresh_ahead_index_key, (cache.get(_refresh_ahead_index_key) or set()) - {registry_key})
+            continue
+        try:
+            func.refresh_expiring()
+        except Exception:
+            Logger.get('cache').exception('Could not refresh memoized values of %s.%s', module, name)
@@ -7,7 +7,7 @@
 
 import pytest
 
-from indico.util.caching import memoize_request
+from indico.util.caching import _refresh_ahead_functions, memoize_redis, memoize_request, refresh_memoized_values
 
 
 @pytest.fixture
@@ -46,3 +46,70 @@ def test_memoize_request_args():
     assert calls[0] == 3
     fn(a=2, b=2, foo='bar')
     assert calls[0] == 3
+
+
+@pytest.mark.usefixtures('not_testing')
+def test_memoize_redis_refresh_ahead(mocker):
+    calls = []
+    mocked_time = mocker.patch('indico.util.caching.time')
+    mocked_time.time.return_value = 1000
+
+    @memoize_redis(3600, refresh_ahead=True)
+    def fn(a, b=1):
+        calls.append(a)
+        return a + b + len(calls) * 100
+
+    try:
+        assert fn(1) == 102
+        assert fn(1, b=1) == 102
+        assert fn(2) == 203
+        assert calls == [1, 2]
+        # nothing is recomputed long before expiry
+        mocked_time.time.return_value = 2000
+        refresh_memoized_values()
+        assert calls == [1, 2]
+        # shortly before expiry, only values which have been used again are recomputed
+        mocked_time.time.return_value = 4500
+        refresh_memoized_values()
+        assert calls == [1, 2, 1]
+        assert fn(1) == 302
+        assert fn(2) == 203
+        assert calls == [1, 2, 1]
+        # cleared values are not recomputed
+        fn.clear_cached(1)
+        mocked_time.time.return_value = 8000
+        refresh_memoized_values()
+        assert calls == [1, 2, 1, 2]
+        assert not fn.is_cached(1)
+    finally:
+        del _refresh_ahead_functions[('_refresh_ahead_', fn.__module__, fn.__qualname__)]
+
+
+@pytest.mark.usefixtures('not_testing')
+def test_memoize_redis_refresh_ahead_old_value():
+    @memoize_redis(3600)
+    def fn(a):
+        return 'old'
+
+    old_fn = fn
+
+    @memoize_redis(3600, refresh_ahead=True)
+    def fn(a):
+        return 'new'
+
+    try:
+        # a value cached before refresh-ahead was enabled for the function is not used
+        assert old_fn(1) == 'old'
+        assert fn(1) == 'new'
+        refresh_memoized_values()
+        assert old_fn(1) == 'old'
+        assert fn(1) == 'new'
+    finally:
+        old_fn.clear_cached(1)
+        fn.clear_cached(1)
+        del _refresh_ahead_functions[('_refresh_ahead_', fn.__module__, fn.__qualname__)]
+
+
+def test_memoize_redis_refresh_ahead_ttl():
+    with pytest.raises(ValueError):
+        memoize_redis(60, refresh_ahead=True)
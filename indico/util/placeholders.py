@@ -199,19 +199,40 @@ def get_sorted_placeholders(context, **kwargs):
     return sorted(get_placeholders(context, **kwargs).values(), key=attrgetter('name'))
 
 
-def replace_placeholders(context, text, escape_html=True, **kwargs):
+def replace_placeholders(context, text, escape_html=True, *, placeholders=None, **kwargs):
     """Replace placeholders in a string.
 
     :param context: the context where the placeholders are used
     :param text: the text to replace placeholders in
     :param escape_html: whether HTML escaping should be done
+    :param placeholders: the placeholders to replace; if omitted, all
+                         placeholders available in the context are
+                         used.  When replacing the placeholders of the
+                         same text for many recipients, the result of
+                         :func:`get_used_placeholders` should be passed
+                         here to avoid looking them up every time.
     :param kwargs: arguments specific to the context
     """
-    for placeholder in get_placeholders(context, **kwargs).values():
+    if placeholders is None:
+        placeholders = get_placeholders(context, **kwargs).values()
+    for placeholder in placeholders:
         text = placeholder.replace(text, escape_html=escape_html, **kwargs)
     return text
 
 
+def get_used_placeholders(context, *texts, **kwargs):
+    """Get the placeholders which are used in any of the given strings.
+
+    :param context: the context where the placeholders are used
+    :param texts: the texts containing some placeholders
+    :param kwargs: arguments specific to the context; these should be
+                   the ones of an actual recipient since the available
+                   placeholders may depend on them
+    """
+    return [placeholder for placeholder in get_placeholders(context, **kwargs).values()
+            if any(placeholder.is_in(text, **kwargs) for text in texts)]
+
+
 def get_empty_placeholders(context, text, **kwargs):
     """Get a list of placeholders that evaluate to an empty string.
 
@@ -8,9 +8,11 @@
 """String manipulation functions."""
 
 import binascii
+import hashlib
 import os
 import re
 import string
+import threading
 import typing as t
 import unicodedata
 from collections import OrderedDict
@@ -28,6 +30,7 @@ import html5lib
 import markdown
 import translitcodec
 from bleach.css_sanitizer import CSSSanitizer
+from bleach.sanitizer import Cleaner
 from flask import has_app_context
 from html2text import HTML2Text
 from jinja2.filters import do_striptags
@@ -245,18 +248,80 @@ def strip_tags(text):
     return do_striptags(text)
 
 
-def render_markdown(text, escape_latex_math=True, md=None, extra_html=False, **kwargs):
-    """Mako markdown to HTML filter.
+#: The maximum number of rendered markdown snippets kept in memory
+MARKDOWN_CACHE_SIZE = 2000
 
-    :param text: Markdown source to convert to HTML
-    :param escape_latex_math: Whether math expression should be left untouched or a function that will be called
-                              to replace math-mode segments.
-    :param md: An alternative markdown processor (can be used
-               to generate e.g. a different format)
-    :param extra_html: Whether to allow a bigger set of HTML tags
-    :param kwargs: Extra arguments to pass on to the markdown
-                   processor
+# markdown processors and bleach cleaners are not thread-safe, so each thread keeps its own ones
+_markdown_local = threading.local()
+_markdown_cache = OrderedDict()
+_markdown_cache_lock = threading.Lock()
+
+
+def _get_markdown_options_key(extensions, kwargs):
+    """Get a key identifying the markdown processor for the given options.
+
+    Extension objects cannot be compared, so there is no key if any of
+    the extensions is not specified by name.
     """
+    if not all(isinstance(ext, str) for ext in extensions):
+        return None
+    try:
+        return frozenset(extensions), frozenset(kwargs.items())
+    except TypeError:
+        return None
+
+
+def _get_markdown_processor(extensions, kwargs, options_key):
+    extensions = [*extensions, 'fenced_code', TildeStrikeExtension(), MarkExtension()]
+    if options_key is None:
+        return markdown.Markdown(extensions=extensions, **kwargs)
+    processors = _markdown_local.__dict__.setdefault('processors', {})
+    if (md := processors.get(options_key)) is None:
+        md = processors[options_key] = markdown.Markdown(extensions=extensions, **kwargs)
+    return md.reset()
+
+
+def _get_cleaner(*, extra_html=False, allow_cid=False):
+    cleaners = _markdown_local.__dict__.setdefault('cleaners', {})
+    key = (extra_html, allow_cid)
+    if (cleaner := cleaners.get(key)) is not None:
+        return cleaner
+    css_sanitizer = IndicoCSSSanitizer(allowed_css_properties=BLEACH_ALLOWED_STYLES_HTML)
+    if extra_html:
+        protocols = set(bleach.ALLOWED_PROTOCOLS)
+        if allow_cid:
+            protocols.add('cid')
+        cleaner = Cleaner(tags=BLEACH_ALLOWED_TAGS_HTML, attributes=BLEACH_ALLOWED_ATTRIBUTES_HTML,
+                          protocols=protocols, css_sanitizer=css_sanitizer)
+    else:
+        cleaner = Cleaner(tags=BLEACH_ALLOWED_TAGS, attributes=BLEACH_ALLOWED_ATTRIBUTES, css_sanitizer=css_sanitizer)
+    cleaners[key] = cleaner
+    return cleaner
+
+
+def _get_markdown_cache_key(text, escape_latex_math, extra_html, options_key):
+    if options_key is None or not isinstance(escape_latex_math, bool):
+        return None
+    return hashlib.sha256(text.encode()).digest(), escape_latex_math, extra_html, options_key
+
+
+def _get_cached_markdown(key):
+    with _markdown_cache_lock:
+        try:
+            _markdown_cache.move_to_end(key)
+        except KeyError:
+            return None
+        return _markdown_cache[key]
+
+
+def _set_cached_markdown(key, html):
+    with _markdown_cache_lock:
+        _markdown_cache[key] = html
+        while len(_markdown_cache) > MARKDOWN_CACHE_SIZE:
+            _markdown_cache.popitem(last=False)
+
+
+def _render_markdown(text, escape_latex_math, convert):
     if escape_latex_math:
         math_segments = []
 
@@ -269,20 +334,7 @@ def render_markdown(text, escape_latex_math=True, md=None, extra_html=False, **k
 
         text = re.sub(r'\$[^\$]+\$|\$\$(^\$)\$\$', _math_replace, text)
 
-    if md is None:
-        extensions = set(kwargs.pop('extensions', ()))
-        extensions.add('fenced_code')
-        extensions.add(TildeStrikeExtension())
-        extensions.add(MarkExtension())
-        result = markdown.markdown(text, extensions=tuple(extensions), **kwargs)
-        if extra_html:
-            result = sanitize_html(result)
-        else:
-            css_sanitizer = IndicoCSSSanitizer(allowed_css_properties=BLEACH_ALLOWED_STYLES_HTML)
-            result = bleach.clean(result, tags=BLEACH_ALLOWED_TAGS, attributes=BLEACH_ALLOWED_ATTRIBUTES,
-                                  css_sanitizer=css_sanitizer)
-    else:
-        result = md(text, **kwargs)
+    result = convert(text)
 
     if escape_latex_math:
         return re.sub(LATEX_MATH_PLACEHOLDER, lambda _: math_segments.pop(0), result)
@@ -290,6 +342,64 @@ def render_markdown(text, escape_latex_math=True, md=None, extra_html=False, **k
         return result
 
 
+def render_markdown(text, escape_latex_math=True, md=None, extra_html=False, **kwargs):
+    """Mako markdown to HTML filter.
+
+    The markdown processors are reused within each thread, and the
+    resulting HTML is kept in a small in-memory cache unless custom
+    extension objects or a custom processor are used.
+
+    :param text: Markdown source to convert to HTML
+    :param escape_latex_math: Whether math expression should be left untouched or a function that will be called
+                              to replace math-mode segments.
+    :param md: An alternative markdown processor (can be used
+               to generate e.g. a different format)
+    :param extra_html: Whether to allow a bigger set of HTML tags
+    :param kwargs: Extra arguments to pass on to the markdown
+                   processor
+    """
+    if md is not None:
+        return _render_markdown(text, escape_latex_math, lambda text: md(text, **kwargs))
+    return render_markdown_many([text], escape_latex_math=escape_latex_math, extra_html=extra_html, **kwargs)[0]
+
+
+def render_markdown_many(texts, escape_latex_math=True, extra_html=False, **kwargs):
+    """Convert many markdown strings to HTML.
+
+    This is meant for lists containing many (often identical) texts
+    which are rendered with the same options.  Every distinct text is
+    only rendered once, and the results are cached just like those of
+    :func:`render_markdown`.
+
+    :param texts: An iterable of markdown sources
+    :param escape_latex_math: Whether math expression should be left untouched or a function that will be called
+                              to replace math-mode segments.
+    :param extra_html: Whether to allow a bigger set of HTML tags
+    :param kwargs: Extra arguments to pass on to the markdown
+                   processor
+    :return: A list containing the HTML of each markdown source
+    """
+    extensions = tuple(kwargs.pop('extensions', ()))
+    options_key = _get_markdown_options_key(extensions, kwargs)
+
+    def _convert(text):
+        result = _get_markdown_processor(extensions, kwargs, options_key).convert(text)
+        return _get_cleaner(extra_html=extra_html).clean(result)
+
+    rendered = {}
+    results = []
+    for text in texts:
+        if text not in rendered:
+            cache_key = _get_markdown_cache_key(text, escape_latex_math, extra_html, options_key)
+            if cache_key is None or (result := _get_cached_markdown(cache_key)) is None:
+                result = _render_markdown(text, escape_latex_math, _convert)
+                if cache_key is not None:
+                    _set_cached_markdown(cache_key, result)
+            rendered[text] = result
+        results.append(rendered[text])
+    return results
+
+
 def html_to_markdown(html):
     """Convert basic HTML to Markdown.
 
@@ -615,12 +725,7 @@ class IndicoCSSSanitizer(CSSSanitizer):
 
 
 def sanitize_html(string, *, allow_cid=False):
-    css_sanitizer = IndicoCSSSanitizer(allowed_css_properties=BLEACH_ALLOWED_STYLES_HTML)
-    protocols = set(bleach.ALLOWED_PROTOCOLS)
-    if allow_cid:
-        protocols.add('cid')
-    return bleach.clean(string, tags=BLEACH_ALLOWED_TAGS_HTML, attributes=BLEACH_ALLOWED_ATTRIBUTES_HTML,
-                        protocols=protocols, css_sanitizer=css_sanitizer)
+    return _get_cleaner(extra_html=True, allow_cid=allow_cid).clean(string)
 
 
 def html_to_plaintext(string):
@@ -676,8 +781,19 @@ class RichMarkup(Markup):
 class MarkdownText(Markup):
     """Unicode/Markup class that renders markdown."""
 
+    extensions = ('nl2br', 'tables')
+
     def __html__(self):
-        return render_markdown(str(self), extensions=('nl2br', 'tables'))
+        return render_markdown(str(self), extensions=self.extensions)
+
+    @classmethod
+    def render_many(cls, texts):
+        """Render many markdown texts at once.
+
+        Since the rendered HTML is cached, this can be used to render
+        all texts of a list at once before displaying them.
+        """
+        return render_markdown_many([str(text) for text in texts], extensions=cls.extensions)
 
 
 class PlainText(Markup):
@@ -9,13 +9,14 @@ import textwrap
 from enum import Enum
 from itertools import count
 
+import markdown
 import pytest
 
 from indico.util.string import (AutoLinkExtension, HTMLLinker, camelize, camelize_keys, crc32, format_email_with_name,
                                 format_repr, has_relative_links, html_to_plaintext, make_unique_token,
-                                normalize_linebreaks, normalize_phone_number, render_markdown, sanitize_email,
-                                sanitize_for_platypus, sanitize_html, seems_html, slugify, snakify, snakify_keys,
-                                strip_tags, text_to_repr)
+                                normalize_linebreaks, normalize_phone_number, render_markdown, render_markdown_many,
+                                sanitize_email, sanitize_for_platypus, sanitize_html, seems_html, slugify, snakify,
+                                snakify_keys, strip_tags, text_to_repr)
 
 
 def test_seems_html():
@@ -238,6 +239,26 @@ def test_markdown_sanitize_css():
     assert render_markdown(input) == output
 
 
+def test_markdown_many(mocker):
+    convert = mocker.spy(markdown.Markdown, 'convert')
+    texts = ['**uncached 1**', 'uncached\n2', '**uncached 1**', '<script>alert(1)</script>']
+    assert render_markdown_many(texts, extensions=('nl2br',)) == [
+        '<p><strong>uncached 1</strong></p>',
+        '<p>uncached<br>\n2</p>',
+        '<p><strong>uncached 1</strong></p>',
+        '&lt;script&gt;alert(1)&lt;/script&gt;',
+    ]
+    # identical texts are only rendered once, and rendered texts are cached
+    assert convert.call_count == 3
+    assert render_markdown('**uncached 1**', extensions=('nl2br',)) == '<p><strong>uncached 1</strong></p>'
+    assert convert.call_count == 3
+    # the cache depends on the options
+    assert render_markdown('**uncached 1**') == '<p><strong>uncached 1</strong></p>'
+    assert convert.call_count == 4
+    # the processor is reused
+    assert len({id(call.args[0]) for call in convert.call_args_list}) == 2
+
+
 def test_sanitize_html_imagemaps():
     html = '''
         <img src="example.jpg" usemap="#image-map">
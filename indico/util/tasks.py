@@ -14,11 +14,13 @@ in here but in your module instead.
 """
 
 
+import os
 from datetime import timedelta
 
 from celery.schedules import crontab
 
 from indico.core.celery import celery
+from indico.util.caching import refresh_memoized_values
 from indico.util.fs import cleanup_dir
 
 
@@ -33,7 +35,15 @@ def temp_cleanup():
     from indico.core.config import config
     from indico.core.logger import Logger
     logger = Logger.get()
-    deleted = cleanup_dir(config.CACHE_DIR, timedelta(days=1))
+    # previous builds of offline sites are kept longer and cleaned up by `static_sites_cleanup`
+    deleted = cleanup_dir(config.CACHE_DIR, timedelta(days=1),
+                          exclude=lambda path: path.split(os.sep)[0] == 'static-sites')
     _log_deleted(logger, 'Deleted from cache: %s', deleted)
     deleted = cleanup_dir(config.TEMP_DIR, timedelta(days=1))
     _log_deleted(logger, 'Deleted from temp: %s', deleted)
+
+
+@celery.periodic_task(name='refresh_memoized', run_every=crontab(minute='*/5'))
+def refresh_memoized():
+    """Recompute memoized values which are about to expire."""
+    refresh_memoized_values()
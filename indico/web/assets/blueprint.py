@@ -6,22 +6,24 @@
 # LICENSE file for more details.
 
 import os
-from pathlib import Path
+from datetime import timedelta
 
 from flask import Response, current_app, redirect, request, send_from_directory
 from werkzeug.exceptions import NotFound
 
-import indico
 from indico.core.config import config
 from indico.core.plugins import plugin_engine
 from indico.util.i18n import get_all_locales
-from indico.web.assets.vars_js import generate_global_file, generate_i18n_file, generate_user_file
+from indico.web.assets.bundles import get_bundle_filename, get_bundle_path
+from indico.web.assets.vars_js import generate_user_file
 from indico.web.flask.util import send_file, url_for
 from indico.web.flask.wrappers import IndicoBlueprint
 
 
 assets_blueprint = IndicoBlueprint('assets', __name__, url_prefix='/assets')
 
+BUNDLE_MAX_AGE = int(timedelta(days=365).total_seconds())
+
 assets_blueprint.add_url_rule('!/css/<path:filename>', 'css', build_only=True)
 assets_blueprint.add_url_rule('!/images/<path:filename>', 'image', build_only=True)
 assets_blueprint.add_url_rule('!/fonts/<path:filename>', 'fonts', build_only=True)
@@ -57,13 +59,23 @@ def js_vars_global():
 
     Useful for server-wide config options, URLs, etc...
     """
-    cache_file = Path(config.CACHE_DIR) / f'assets_global_{indico.__version__}_{config.hash}.js'
+    cache_file = get_bundle_path(get_bundle_filename('global'))
+    return send_file('global.js', cache_file, mimetype='application/javascript', conditional=True)
 
-    if config.DEBUG or not cache_file.exists():
-        data = generate_global_file()
-        cache_file.write_text(data)
 
-    return send_file('global.js', cache_file, mimetype='application/javascript', conditional=True)
+@assets_blueprint.route('/js-bundles/<filename>')
+def js_bundle(filename):
+    """Provide a precompiled JS bundle.
+
+    Bundle filenames contain a hash of their contents, so they can be
+    cached by the browser forever.
+    """
+    path = get_bundle_path(filename)
+    if path is None:
+        raise NotFound
+    rv = send_file(filename, path, mimetype='application/javascript', no_cache=False, max_age=BUNDLE_MAX_AGE)
+    rv.cache_control.immutable = True
+    return rv
 
 
 @assets_blueprint.route('/js-vars/user.js')
@@ -97,18 +109,9 @@ def _get_i18n_locale(locale_name, react=False):
 
     react_suffix = '-react' if react else ''
     try:
-        cache_file = (
-            Path(config.CACHE_DIR) / f'assets_i18n_{locale_name}{react_suffix}_{indico.__version__}_{config.hash}.js'
-        )
+        cache_file = get_bundle_path(get_bundle_filename(f'i18n{"react" if react else ""}-{locale_name}'))
     except UnicodeEncodeError:
         raise NotFound
-
-    if config.DEBUG or not cache_file.exists():
-        i18n_data = generate_i18n_file(locale_name, react=react)
-        if i18n_data is None:
-            raise NotFound
-        cache_file.write_text('window.{} = {};'.format('REACT_TRANSLATIONS' if react else 'TRANSLATIONS', i18n_data))
-
     return send_file(f'{locale_name}{react_suffix}.js', cache_file, mimetype='application/javascript',
                      conditional=True)
 
@@ -0,0 +1,156 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Content-hashed JS bundles with translations and global variables.
+
+The bundles are generated once (ideally using ``indico build-js-bundles``
+during deployment) and stored in the cache dir.  Since their filenames
+contain a hash of their content, they can be cached by browsers forever.
+A file lock ensures that multiple worker processes never generate the
+same bundle at the same time.
+"""
+
+import fcntl
+import hashlib
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+from flask import current_app, g
+
+import indico
+from indico.core.config import config
+from indico.util.i18n import get_all_locales
+from indico.web.flask.util import url_for
+
+
+def get_bundle_dir():
+    """Get the directory containing the bundles of the current version/config."""
+    path = Path(config.CACHE_DIR) / f'js-bundles-{indico.__version__}-{config.hash}'
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def _generate_i18n_bundle(locale_name, react=False):
+    from indico.web.assets.vars_js import generate_i18n_file
+    i18n_data = generate_i18n_file(locale_name, react=react)
+    return 'window.{} = {};'.format('REACT_TRANSLATIONS' if react else 'TRANSLATIONS', i18n_data)
+
+
+def _get_bundle_generator(name):
+    if name == 'global':
+        from indico.web.assets.vars_js import generate_global_file
+        return generate_global_file
+    kind, locale_name = name.split('-', 1)
+    if kind == 'i18n':
+        return lambda: _generate_i18n_bundle(locale_name)
+    elif kind == 'i18nreact':
+        return lambda: _generate_i18n_bundle(locale_name, react=True)
+    raise ValueError(f'Invalid bundle: {name}')
+
+
+def get_bundle_names():
+    """Get the names of all JS bundles."""
+    # en_GB is our source locale and thus always available
+    locales = sorted(set(get_all_locales()) | {'en_GB'})
+    return ['global', *(f'i18n-{locale}' for locale in locales), *(f'i18nreact-{locale}' for locale in locales)]
+
+
+@contextmanager
+def _bundle_lock(name):
+    with (get_bundle_dir() / f'{name}.lock').open('w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _get_current_filename(name):
+    bundle_dir = get_bundle_dir()
+    try:
+        filename = (bundle_dir / f'{name}.current').read_text()
+    except FileNotFoundError:
+        return None
+    return filename if (bundle_dir / filename).exists() else None
+
+
+def _write_atomic(path, data):
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+
+def build_bundle(name):
+    """Generate a bundle and store it under its content-hashed filename.
+
+    :return: The filename of the bundle.
+    """
+    bundle_dir = get_bundle_dir()
+    data = _get_bundle_generator(name)().encode()
+    filename = f'{name}.{hashlib.sha256(data).hexdigest()[:16]}.js'
+    if not (bundle_dir / filename).exists():
+        _write_atomic(bundle_dir / filename, data)
+    _write_atomic(bundle_dir / f'{name}.current', filename.encode())
+    return filename
+
+
+def get_bundle_filename(name):
+    """Get the filename of a bundle, generating it if necessary.
+
+    In debug mode the bundle is always regenerated, so changes to
+    translations or the config are picked up immediately.
+    """
+    if not config.DEBUG and (filename := _get_current_filename(name)):
+        return filename
+    with _bundle_lock(name):
+        # another process may have built it while we were waiting for the lock
+        if not config.DEBUG and (filename := _get_current_filename(name)):
+            return filename
+        return build_bundle(name)
+
+
+def get_bundle_path(filename):
+    """Get the path of an existing bundle file or ``None``."""
+    path = get_bundle_dir() / filename
+    if path.parent != get_bundle_dir() or path.suffix != '.js' or not path.is_file():
+        return None
+    return path
+
+
+def url_for_js_bundle(kind, locale_name=None):
+    """Get the URL of a JS bundle.
+
+    Rendering a page never builds a bundle: If it has not been built yet
+    (or in debug mode), the URL of the endpoint generating the bundle on
+    demand is used instead.
+
+    :param kind: ``'global'``, ``'i18n'`` or ``'i18n-react'``
+    :param locale_name: The locale of an i18n bundle
+    """
+    if kind == 'global':
+        name = 'global'
+        fallback_url = url_for('assets.js_vars_global')
+    else:
+        name = f'{kind.replace("-", "")}-{locale_name}'
+        endpoint = 'assets.i18n_locale_react' if kind == 'i18n-react' else 'assets.i18n_locale'
+        fallback_url = url_for(endpoint, locale_name=locale_name)
+    # offline copies contain the generated files under their old names
+    if config.DEBUG or g.get('static_site') or not (filename := _get_current_filename(name)):
+        return fallback_url
+    return url_for('assets.js_bundle', filename=filename)
+
+
+def build_js_bundles_cmd(verbose=False):
+    with current_app.test_request_context(base_url=config.BASE_URL):
+        for name in get_bundle_names():
+            with _bundle_lock(name):
+                filename = build_bundle(name)
+            if verbose:
+                click.echo(f'  * {click.style(filename, fg="yellow")}')
+    click.echo(click.style(f'JS bundles built in {get_bundle_dir()}', fg='green'))
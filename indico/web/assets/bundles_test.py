@@ -0,0 +1,77 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import pytest
+
+from indico.web.assets import bundles
+from indico.web.assets.bundles import get_bundle_dir, get_bundle_filename, get_bundle_path, url_for_js_bundle
+
+
+@pytest.fixture(autouse=True)
+def _bundle_dir(patch_indico_config, tmp_path):
+    patch_indico_config('CACHE_DIR', str(tmp_path))
+
+
+@pytest.fixture
+def mock_generator(mocker):
+    content = ['foo']
+    generator = mocker.patch.object(bundles, '_get_bundle_generator')
+    generator.return_value = lambda: content[0]
+    return content, generator
+
+
+def test_bundle_content_hashed(mock_generator):
+    content, generator = mock_generator
+    filename = get_bundle_filename('global')
+    assert filename.startswith('global.')
+    assert filename.endswith('.js')
+    assert get_bundle_path(filename).read_text() == 'foo'
+    # existing bundles are reused
+    assert get_bundle_filename('global') == filename
+    assert generator.call_count == 1
+    # rebuilding with different content results in a different file
+    content[0] = 'bar'
+    bundles.build_bundle('global')
+    new_filename = get_bundle_filename('global')
+    assert new_filename != filename
+    assert get_bundle_path(new_filename).read_text() == 'bar'
+
+
+def test_bundle_rebuilt_if_missing(mock_generator):
+    __, generator = mock_generator
+    filename = get_bundle_filename('global')
+    get_bundle_path(filename).unlink()
+    assert get_bundle_filename('global') == filename
+    assert get_bundle_path(filename).exists()
+    assert generator.call_count == 2
+
+
+def test_bundle_debug(mock_generator, patch_indico_config):
+    __, generator = mock_generator
+    patch_indico_config('DEBUG', True)
+    get_bundle_filename('global')
+    get_bundle_filename('global')
+    assert generator.call_count == 2
+
+
+@pytest.mark.usefixtures('request_context')
+def test_url_for_js_bundle(mock_generator, patch_indico_config):
+    __, generator = mock_generator
+    # bundles are never built while rendering a page
+    assert url_for_js_bundle('global') == '/assets/js-vars/global.js'
+    assert url_for_js_bundle('i18n-react', 'fr_FR') == '/assets/i18n/fr_FR-react.js'
+    assert not generator.called
+    filename = get_bundle_filename('global')
+    assert url_for_js_bundle('global') == f'/assets/js-bundles/{filename}'
+    patch_indico_config('DEBUG', True)
+    assert url_for_js_bundle('global') == '/assets/js-vars/global.js'
+
+
+@pytest.mark.parametrize('filename', ('../foo.js', 'global.current', 'missing.js'))
+def test_get_bundle_path_invalid(filename):
+    (get_bundle_dir() / 'global.current').write_text('x')
+    assert get_bundle_path(filename) is None
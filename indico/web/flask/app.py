@@ -48,7 +48,9 @@ from indico.util.i18n import (_, babel, get_all_locales, get_current_locale, get
 from indico.util.mimetypes import icon_from_mimetype
 from indico.util.signals import values_from_signal
 from indico.util.string import RichMarkup, alpha_enum, crc32, html_to_plaintext, sanitize_html, slugify
+from indico.web.assets.bundles import url_for_js_bundle
 from indico.web.flask.errors import errors_bp
+from indico.web.flask.profiler import setup_request_profiler
 from indico.web.flask.stats import get_request_stats, setup_request_stats
 from indico.web.flask.templating import (call_template_hook, decodeprincipal, dedent, groupby, instanceof, markdown,
                                          natsort, plusdelta, subclassof, underline)
@@ -200,6 +202,7 @@ def setup_jinja(app):
     app.add_template_global(url_for)
     app.add_template_global(url_for_plugin)
     app.add_template_global(url_rule_to_js)
+    app.add_template_global(url_for_js_bundle)
     app.add_template_global(IndicoConfig(exc=Exception), 'indico_config')
     app.add_template_global(call_template_hook, 'template_hook')
     app.add_template_global(is_single_line_field, '_is_single_line_field')
@@ -429,6 +432,7 @@ def make_app(testing=False, config_override=None):
         extend_url_map(app)
         add_handlers(app)
         setup_request_stats(app)
+        setup_request_profiler(app)
         add_blueprints(app)
         plugin_engine.init_app(app, Logger.get('plugins'))
         if not plugin_engine.load_plugins(app):
@@ -0,0 +1,299 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""Structured per-request profiling.
+
+Profiling is enabled for a random sample of requests (``PROFILE_SAMPLE_RATE``)
+or explicitly by admins sending an ``X-Indico-Profile`` header.  A profile
+contains the time spent in the various stages of a RH and every SQL statement
+executed during the request, which allows spotting N+1 query patterns.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from operator import itemgetter
+
+import sqlalchemy
+from flask import before_render_template, current_app, g, request, session, template_rendered
+from redis import RedisError
+
+from indico.core.cache import get_redis_client
+from indico.core.config import config
+from indico.core.logger import Logger
+from indico.core.plugins import plugin_engine
+from indico.web.flask import stats
+
+
+logger = Logger.get('profiler')
+
+#: The request header admins can send to profile a specific request
+PROFILE_HEADER = 'X-Indico-Profile'
+#: How often the same statement must run from the same place to be reported as N+1
+N_PLUS_ONE_THRESHOLD = 5
+#: The sections of a request that are timed
+SECTIONS = ('process_args', 'check_access', 'process', 'template', 'commit')
+
+_metrics_prefix = 'indico-profiling'
+_ignored_files = {__file__, stats.__file__}
+_sqlalchemy_path = os.path.dirname(sqlalchemy.__file__) + os.sep
+
+_string_re = re.compile(r"'(?:[^']|'')*'")
+_number_re = re.compile(r'\b\d+(?:\.\d+)?\b')
+_param_re = re.compile(r'%\([^)]+\)s|%s|\$\d+')
+_in_list_re = re.compile(r'\bIN \((?:\?(?:, )?)+\)', re.IGNORECASE)
+_whitespace_re = re.compile(r'\s+')
+
+
+def fingerprint_sql(statement):
+    """Normalize an SQL statement so equivalent queries compare equal.
+
+    Literals and bound parameters are replaced with placeholders and
+    ``IN`` lists are collapsed, so the same query executed with different
+    arguments always results in the same fingerprint.
+    """
+    statement = _whitespace_re.sub(' ', statement).strip()
+    statement = _string_re.sub('?', statement)
+    statement = _param_re.sub('?', statement)
+    statement = _number_re.sub('?', statement)
+    return _in_list_re.sub('IN (...)', statement)
+
+
+def _get_source_paths():
+    return [current_app.root_path] + [p.root_path for p in plugin_engine.get_active_plugins().values()]
+
+
+def get_sql_call_site():
+    """Get the location in Indico (or a plugin) which triggered an SQL query.
+
+    This must be called from an SQLAlchemy cursor execution event handler.
+    """
+    paths = _get_source_paths()
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (any(filename.startswith(p) for p in paths) and not filename.startswith(_sqlalchemy_path) and
+                filename not in _ignored_files):
+            return f'{os.path.relpath(filename, os.path.dirname(paths[0]))}:{frame.f_lineno}'
+        frame = frame.f_back
+    return None
+
+
+class RequestProfile:
+    """The profiling data collected during a single request."""
+
+    def __init__(self, rh, requested=False):
+        self.rh = type(rh).__name__
+        #: Whether an admin explicitly requested profiling this request
+        self.requested = requested
+        self.endpoint = request.endpoint
+        self.method = request.method
+        self.start_ts = time.time()
+        self.duration = None
+        self.sections = dict.fromkeys(SECTIONS, 0)
+        self.queries = []
+        self._template_depth = 0
+        self._template_start = None
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] += time.perf_counter() - start
+
+    def template_started(self):
+        if not self._template_depth:
+            self._template_start = time.perf_counter()
+        self._template_depth += 1
+
+    def template_finished(self):
+        self._template_depth -= 1
+        if not self._template_depth and self._template_start is not None:
+            self.sections['template'] += time.perf_counter() - self._template_start
+            self._template_start = None
+
+    def add_query(self, statement, duration):
+        self.queries.append((fingerprint_sql(statement), duration, get_sql_call_site()))
+
+    @property
+    def query_duration(self):
+        return sum(duration for __, duration, __ in self.queries)
+
+    def get_n_plus_one(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Find statements executed repeatedly from the same place.
+
+        :return: A list of dicts with the fingerprint, call site and
+                 number of executions, most frequent first.
+        """
+        counts = Counter((fingerprint, call_site) for fingerprint, __, call_site in self.queries)
+        return [{'fingerprint': fingerprint, 'call_site': call_site, 'count': count}
+                for (fingerprint, call_site), count in counts.most_common()
+                if count >= threshold]
+
+    def get_query_summary(self):
+        """Aggregate the queries by fingerprint."""
+        summary = defaultdict(lambda: {'count': 0, 'duration': 0, 'call_sites': set()})
+        for fingerprint, duration, call_site in self.queries:
+            entry = summary[fingerprint]
+            entry['count'] += 1
+            entry['duration'] += duration
+            if call_site:
+                entry['call_sites'].add(call_site)
+        return sorted(({'fingerprint': fingerprint, 'count': data['count'], 'duration': data['duration'],
+                        'call_sites': sorted(data['call_sites'])}
+                       for fingerprint, data in summary.items()),
+                      key=itemgetter('duration'), reverse=True)
+
+    def to_dict(self):
+        return {
+            'rh': self.rh,
+            'endpoint': self.endpoint,
+            'method': self.method,
+            'timestamp': self.start_ts,
+            'duration': self.duration,
+            'sections': self.sections,
+            'query_count': len(self.queries),
+            'query_duration': self.query_duration,
+            'queries': self.get_query_summary(),
+            'n_plus_one': self.get_n_plus_one(),
+        }
+
+    def get_server_timing(self):
+        """Get the profile in the format of a ``Server-Timing`` header."""
+        timings = [f'{name};dur={duration * 1000:.1f}' for name, duration in self.sections.items()]
+        timings.append(f'sql;dur={self.query_duration * 1000:.1f};desc="{len(self.queries)} queries"')
+        timings.append(f'total;dur={self.duration * 1000:.1f}')
+        return ', '.join(timings)
+
+
+def _is_profiling_requested():
+    return bool(request.headers.get(PROFILE_HEADER)) and session.user is not None and session.user.is_admin
+
+
+def _is_request_sampled():
+    return bool(config.PROFILE_SAMPLE_RATE) and random.random() < config.PROFILE_SAMPLE_RATE
+
+
+def start_request_profile(rh):
+    """Start profiling the current request if it is sampled or requested."""
+    requested = _is_profiling_requested()
+    if not requested and not _is_request_sampled():
+        return None
+    g.request_profile = profile = RequestProfile(rh, requested=requested)
+    return profile
+
+
+def get_request_profile():
+    """Get the profile of the current request, if it is being profiled."""
+    return g.get('request_profile')
+
+
+@contextmanager
+def profile_section(name):
+    """Time a section of the current request if it is being profiled."""
+    if (profile := g.get('request_profile')) is None:
+        yield
+        return
+    with profile.section(name):
+        yield
+
+
+def finish_request_profile(response):
+    """Finish profiling the current request and export the data."""
+    profile = g.pop('request_profile', None)
+    if profile is None:
+        return
+    profile.duration = time.time() - profile.start_ts
+    if profile.requested:
+        # timing data is only exposed to admins who explicitly asked for it
+        response.headers['Server-Timing'] = profile.get_server_timing()
+    data = profile.to_dict()
+    if data['n_plus_one']:
+        logger.warning('Possible N+1 queries in %s: %s', profile.rh,
+                       ', '.join('{call_site} ({count}x)'.format(**x) for x in data['n_plus_one']))
+    if config.PROFILE_LOG_FILE:
+        _write_profile(data)
+    if config.PROFILE_METRICS_TOKEN:
+        _record_metrics(profile)
+
+
+def _write_profile(data):
+    try:
+        with open(config.PROFILE_LOG_FILE, 'a') as f:
+            f.write(json.dumps(data) + '\n')
+    except OSError:
+        logger.exception('Could not write profile')
+
+
+def _record_metrics(profile):
+    client = get_redis_client()
+    key = f'{_metrics_prefix}/{profile.rh}'
+    try:
+        with client.pipeline(transaction=False) as pipe:
+            pipe.sadd(f'{_metrics_prefix}:rhs', profile.rh)
+            pipe.hincrby(key, 'requests', 1)
+            pipe.hincrbyfloat(key, 'duration', profile.duration)
+            for name, duration in profile.sections.items():
+                pipe.hincrbyfloat(key, f'section:{name}', duration)
+            pipe.hincrby(key, 'queries', len(profile.queries))
+            pipe.hincrbyfloat(key, 'query_duration', profile.query_duration)
+            pipe.hincrby(key, 'n_plus_one', len(profile.get_n_plus_one()))
+            pipe.execute()
+    except RedisError:
+        logger.exception('Could not record profiling metrics')
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def get_prometheus_metrics():
+    """Get the aggregated profiling metrics in the Prometheus text format."""
+    client = get_redis_client()
+    rhs = sorted(x.decode() for x in client.smembers(f'{_metrics_prefix}:rhs'))
+    with client.pipeline(transaction=False) as pipe:
+        for rh in rhs:
+            pipe.hgetall(f'{_metrics_prefix}/{rh}')
+        all_data = pipe.execute()
+    metrics = {
+        'requests': ('indico_profiled_requests_total', 'Number of profiled requests'),
+        'duration': ('indico_profiled_request_seconds_total', 'Total time spent in profiled requests'),
+        'queries': ('indico_profiled_queries_total', 'Number of SQL queries in profiled requests'),
+        'query_duration': ('indico_profiled_query_seconds_total', 'Time spent in SQL queries in profiled requests'),
+        'n_plus_one': ('indico_profiled_n_plus_one_total', 'Number of N+1 query patterns in profiled requests'),
+    }
+    lines = []
+    for field, (name, help_text) in metrics.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for rh, data in zip(rhs, all_data, strict=True):
+            lines.append(f'{name}{{rh="{_escape_label(rh)}"}} {float(data.get(field.encode(), 0))}')
+    name = 'indico_profiled_section_seconds_total'
+    lines += [f'# HELP {name} Time spent in the various stages of profiled requests', f'# TYPE {name} counter']
+    for rh, data in zip(rhs, all_data, strict=True):
+        for section in SECTIONS:
+            value = float(data.get(f'section:{section}'.encode(), 0))
+            lines.append(f'{name}{{rh="{_escape_label(rh)}",section="{section}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def setup_request_profiler(app):
+    @before_render_template.connect_via(app)
+    def _before_render_template(sender, **kwargs):
+        if profile := g.get('request_profile'):
+            profile.template_started()
+
+    @template_rendered.connect_via(app)
+    def _template_rendered(sender, **kwargs):
+        if profile := g.get('request_profile'):
+            profile.template_finished()
@@ -0,0 +1,115 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import json
+import os
+
+import pytest
+from flask import render_template_string
+
+from indico.core.db import db
+from indico.modules.users import User
+from indico.web.flask.profiler import _sqlalchemy_path, fingerprint_sql, get_prometheus_metrics, get_sql_call_site
+from indico.web.rh import RH
+
+
+@pytest.mark.parametrize(('statement', 'expected'), (
+    ('SELECT * FROM users.users WHERE id = %(id_1)s', 'SELECT * FROM users.users WHERE id = ?'),
+    ("SELECT *\n  FROM events.events\n  WHERE title = 'foo''s' AND id = 123",
+     'SELECT * FROM events.events WHERE title = ? AND id = ?'),
+    ('SELECT * FROM x WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)', 'SELECT * FROM x WHERE id IN (...)'),
+    ('SELECT * FROM x WHERE id IN (%(id_1_1)s)', 'SELECT * FROM x WHERE id IN (...)'),
+))
+def test_fingerprint_sql(statement, expected):
+    assert fingerprint_sql(statement) == expected
+
+
+class RHProfiled(RH):
+    def _process_args(self):
+        self.user_ids = [u.id for u in User.query.all()]
+
+    def _process(self):
+        # an N+1 query pattern
+        names = [db.session.get(User, user_id, populate_existing=True).full_name for user_id in self.user_ids]
+        return render_template_string('{{ names|join(", ") }}', names=names)
+
+
+@pytest.fixture
+def profiled_client(app, make_test_client, dummy_user, create_user, no_csrf_check):
+    for i in range(5):
+        create_user(i + 10)
+    db.session.flush()
+    if 'test_profiled' not in app.view_functions:
+        app.add_url_rule('/test/profiled', 'test_profiled', RHProfiled().process)
+    with make_test_client() as client:
+        yield client
+
+
+@pytest.mark.usefixtures('app_context')
+def test_get_sql_call_site(app):
+    def _handler():
+        # called like the event handler of a query
+        return get_sql_call_site()
+
+    def _call_from(filename):
+        namespace = {'_handler': _handler}
+        exec(compile('def query():\n    return _handler()\n', filename, 'exec'), namespace)  # noqa: S102
+        return namespace['query']()
+
+    # indico's own sqlalchemy utilities are not skipped
+    filename = os.path.join(app.root_path, 'core', 'db', 'sqlalchemy', 'fake.py')
+    assert _call_from(filename) == 'indico/core/db/sqlalchemy/fake.py:2'
+    # but sqlalchemy itself is
+    assert _call_from(os.path.join(_sqlalchemy_path, 'fake.py')).startswith('indico/web/flask/profiler_test.py:')
+
+
+def test_profile_admin_header(profiled_client, dummy_user):
+    rv = profiled_client.get('/test/profiled', headers={'X-Indico-Profile': '1'})
+    assert rv.status_code == 200
+    assert 'Server-Timing' not in rv.headers
+    dummy_user.is_admin = True
+    with profiled_client.session_transaction() as sess:
+        sess.set_session_user(dummy_user)
+    rv = profiled_client.get('/test/profiled', headers={'X-Indico-Profile': '1'})
+    timings = dict(x.split(';', 1) for x in rv.headers['Server-Timing'].split(', '))
+    assert set(timings) == {'process_args', 'check_access', 'process', 'template', 'commit', 'sql', 'total'}
+    assert 'queries' in timings['sql']
+
+
+def test_profile_sampled_log_file(profiled_client, patch_indico_config, tmp_path):
+    log_file = tmp_path / 'profile.log'
+    patch_indico_config('PROFILE_SAMPLE_RATE', 1)
+    patch_indico_config('PROFILE_LOG_FILE', str(log_file))
+    rv = profiled_client.get('/test/profiled')
+    assert 'Server-Timing' not in rv.headers
+    # sampled requests of non-admins never expose timing data
+    rv = profiled_client.get('/test/profiled', headers={'X-Indico-Profile': '1'})
+    assert 'Server-Timing' not in rv.headers
+    data = json.loads(log_file.read_text().splitlines()[0])
+    assert data['rh'] == 'RHProfiled'
+    assert data['query_count'] >= 7
+    assert data['sections']['process'] >= data['sections']['template'] > 0
+    n_plus_one, = data['n_plus_one']
+    assert n_plus_one['count'] >= 6
+    assert n_plus_one['call_site'].startswith('indico/web/flask/profiler_test.py:')
+    assert n_plus_one['fingerprint'].startswith('SELECT ')
+
+
+def test_profile_metrics(profiled_client, patch_indico_config):
+    patch_indico_config('PROFILE_SAMPLE_RATE', 1)
+    patch_indico_config('PROFILE_METRICS_TOKEN', 'secret')
+    profiled_client.get('/test/profiled')
+    profiled_client.get('/test/profiled')
+    metrics = get_prometheus_metrics()
+    assert 'indico_profiled_requests_total{rh="RHProfiled"}' in metrics
+    assert 'indico_profiled_section_seconds_total{rh="RHProfiled",section="process"}' in metrics
+    assert profiled_client.get('/admin/profiling/metrics').status_code == 401
+    rv = profiled_client.get('/admin/profiling/metrics', headers={'Authorization': 'Token wrong'})
+    assert rv.status_code == 401
+    rv = profiled_client.get('/admin/profiling/metrics', headers={'Authorization': 'Token secret'})
+    assert rv.status_code == 200
+    assert 'indico_profiled_n_plus_one_total{rh="RHProfiled"}' in rv.text
@@ -33,12 +33,14 @@ def setup_request_stats(app):
         context._query_start_time = time.time()
 
     @listens_for(Engine, 'after_cursor_execute', named=True)
-    def after_cursor_execute(context, **unused):
+    def after_cursor_execute(context, statement, **unused):
         if not g.get('request_stats_initialized'):
             return
         total = time.time() - context._query_start_time
         g.query_count += 1
         g.query_duration += total
+        if profile := g.get('request_profile'):
+            profile.add_query(statement, total)
 
 
 def get_request_stats():
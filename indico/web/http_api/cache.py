@@ -0,0 +1,158 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+"""HTTP API - Result cache."""
+
+import json
+import time
+import zlib
+from datetime import date, datetime
+
+from indico.core.cache import make_scoped_cache
+from indico.core.logger import Logger
+
+
+logger = Logger.get('httpapi')
+
+
+def _encode_value(obj):
+    if isinstance(obj, datetime):
+        return {'__datetime__': obj.isoformat()}
+    elif isinstance(obj, date):
+        return {'__date__': obj.isoformat()}
+    elif isinstance(obj, set | frozenset):
+        return list(obj)
+    raise TypeError(f'Cannot cache {type(obj).__name__} objects')
+
+
+def _decode_value(obj):
+    if len(obj) == 1:
+        if (value := obj.get('__datetime__')) is not None:
+            return datetime.fromisoformat(value)
+        elif (value := obj.get('__date__')) is not None:
+            return date.fromisoformat(value)
+    return obj
+
+
+def dump_cache_entry(value, ts):
+    """Serialize a cache entry to compressed JSON."""
+    data = json.dumps({'value': value, 'ts': ts}, default=_encode_value, separators=(',', ':'))
+    return zlib.compress(data.encode())
+
+
+def load_cache_entry(data):
+    """Deserialize a cache entry created with :func:`dump_cache_entry`.
+
+    :return: A ``(value, ts)`` tuple
+    """
+    entry = json.loads(zlib.decompress(data), object_hook=_decode_value)
+    return entry['value'], entry['ts']
+
+
+class APIResultCache:
+    """Cache for the results of HTTP API exports.
+
+    Results are stored as compressed JSON and kept for twice their TTL.
+    Once the TTL has passed, a result is stale: the first request to see
+    it recomputes the result, while concurrent requests for the same key
+    keep getting the stale one until it has been refreshed.  On a cache
+    miss, only one request computes the result while the others wait for
+    it to become available.
+
+    :param scope: The scope of the underlying cache
+    :param lock_timeout: How long (in seconds) the lock held while a
+                         result is being computed may be held at most
+    :param wait_timeout: How long (in seconds) to wait for a result being
+                         computed by another request before computing it
+                         anyway
+    """
+
+    poll_interval = 0.1
+
+    def __init__(self, scope, *, lock_timeout=300, wait_timeout=30):
+        self.cache = make_scoped_cache(scope)
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+
+    def _get(self, key):
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            return load_cache_entry(data)
+        except (ValueError, TypeError, zlib.error):
+            logger.warning('Could not load cached result for %s', key)
+            return None
+
+    def _lock_key(self, key):
+        return f'lock:{key}'
+
+    def _acquire(self, key):
+        return self.cache.add(self._lock_key(key), True, timeout=self.lock_timeout)
+
+    def _release(self, key):
+        self.cache.delete(self._lock_key(key))
+
+    def _wait(self, key):
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            if (entry := self._get(key)) is not None:
+                return entry
+            if self.cache.get(self._lock_key(key)) is None:
+                # the other request finished without caching a result
+                break
+        return None
+
+    def set(self, key, value, ttl):
+        """Store a result in the cache.
+
+        Values which cannot be serialized are not cached.
+        """
+        try:
+            data = dump_cache_entry(value, time.time())
+        except (TypeError, ValueError) as exc:
+            logger.warning('Not caching result for %s: %s', key, exc)
+            return
+        self.cache.set(key, data, timeout=ttl * 2)
+
+    def get_or_compute(self, key, ttl, func, *, force=False):
+        """Get a cached result or compute it.
+
+        :param key: The cache key
+        :param ttl: How long (in seconds) a result is considered fresh
+        :param func: A callable computing the result; it returns a
+                     ``(value, cacheable)`` tuple
+        :param force: Whether to recompute the result even if a fresh
+                      one is cached
+        :return: The cached or computed value
+        """
+        if force:
+            return self._compute(key, ttl, func)
+
+        if (entry := self._get(key)) is not None:
+            value, ts = entry
+            if time.time() - ts < ttl or not self._acquire(key):
+                # fresh, or stale while another request is already refreshing it
+                return value
+            return self._compute(key, ttl, func, locked=True)
+
+        if self._acquire(key):
+            return self._compute(key, ttl, func, locked=True)
+        if (entry := self._wait(key)) is not None:
+            return entry[0]
+        return self._compute(key, ttl, func)
+
+    def _compute(self, key, ttl, func, *, locked=False):
+        try:
+            value, cacheable = func()
+            if cacheable:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if locked:
+                self._release(key)
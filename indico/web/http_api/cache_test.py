@@ -0,0 +1,95 @@
+# This file is part of Indico.
+# Copyright (C) 2002 - 2025 CERN
+#
+# Indico is free software; you can redistribute it and/or
+# modify it under the terms of the MIT License; see the
+# LICENSE file for more details.
+
+import time
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+from pytz import utc
+
+from indico.web.http_api.cache import APIResultCache, dump_cache_entry, load_cache_entry
+
+
+@pytest.fixture
+def api_cache(app):
+    cache = APIResultCache(f'test-http-api-{uuid4()}', wait_timeout=0.3)
+    cache.poll_interval = 0.01
+    return cache
+
+
+def _make_func(value, calls, cacheable=True):
+    def _func():
+        calls.append(value)
+        return value, cacheable
+
+    return _func
+
+
+def test_cache_entry_serialization():
+    value = [{'startDate': datetime(2025, 1, 2, 13, 37, tzinfo=utc), 'day': date(2025, 1, 2), 'tags': {'a'}},
+             {'x': None, 'y': [1, 2.5, 'foo'], 'z': {'__date__': 'not-a-date', 'other': 1}}, True, {}]
+    rv, ts = load_cache_entry(dump_cache_entry(value, 123.0))
+    assert ts == 123.0
+    assert rv == [{'startDate': datetime(2025, 1, 2, 13, 37, tzinfo=utc), 'day': date(2025, 1, 2), 'tags': ['a']},
+                  {'x': None, 'y': [1, 2.5, 'foo'], 'z': {'__date__': 'not-a-date', 'other': 1}}, True, {}]
+    with pytest.raises(TypeError):
+        dump_cache_entry(object(), 123.0)
+
+
+def test_get_or_compute(api_cache):
+    calls = []
+    assert api_cache.get_or_compute('foo', 60, _make_func('a', calls)) == 'a'
+    assert api_cache.get_or_compute('foo', 60, _make_func('b', calls)) == 'a'
+    assert calls == ['a']
+    # forcing a refresh recomputes and updates the cached value
+    assert api_cache.get_or_compute('foo', 60, _make_func('c', calls), force=True) == 'c'
+    assert api_cache.get_or_compute('foo', 60, _make_func('d', calls)) == 'c'
+    assert calls == ['a', 'c']
+    # uncacheable results are not stored
+    assert api_cache.get_or_compute('bar', 60, _make_func('e', calls, cacheable=False)) == 'e'
+    assert api_cache.get_or_compute('bar', 60, _make_func('f', calls)) == 'f'
+    assert calls == ['a', 'c', 'e', 'f']
+    assert not api_cache.cache.get('lock:foo')
+    assert not api_cache.cache.get('lock:bar')
+
+
+def test_get_or_compute_stale(api_cache):
+    calls = []
+    api_cache.cache.set('foo', dump_cache_entry('old', time.time() - 120))
+    # another request is already refreshing the result, so we get the stale one
+    assert api_cache._acquire('foo')
+    assert api_cache.get_or_compute('foo', 60, _make_func('new', calls)) == 'old'
+    assert not calls
+    # once nobody is refreshing it, we recompute it
+    api_cache._release('foo')
+    assert api_cache.get_or_compute('foo', 60, _make_func('new', calls)) == 'new'
+    assert api_cache.get_or_compute('foo', 60, _make_func('newer', calls)) == 'new'
+    assert calls == ['new']
+
+
+def test_get_or_compute_wait(api_cache, mocker):
+    calls = []
+    assert api_cache._acquire('foo')
+    # while waiting for another request, the result becomes available
+    orig_get = api_cache._get
+    mocker.patch.object(api_cache, '_get', side_effect=[None, None, ('other', time.time())])
+    assert api_cache.get_or_compute('foo', 60, _make_func('mine', calls)) == 'other'
+    assert not calls
+    # the other request takes too long, so we compute it ourselves
+    mocker.patch.object(api_cache, '_get', side_effect=orig_get)
+    assert api_cache.get_or_compute('foo', 60, _make_func('mine', calls)) == 'mine'
+    assert calls == ['mine']
+
+
+def test_get_or_compute_error(api_cache):
+    def _fail():
+        raise ValueError('oops')
+
+    with pytest.raises(ValueError, match='oops'):
+        api_cache.get_or_compute('foo', 60, _fail)
+    assert not api_cache.cache.get('lock:foo')
@@ -20,7 +20,6 @@ from authlib.oauth2 import OAuth2Error
 from flask import current_app, g, request, session
 from werkzeug.exceptions import BadRequest, NotFound
 
-from indico.core.cache import make_scoped_cache
 from indico.core.db import db
 from indico.core.logger import Logger
 from indico.core.oauth import require_oauth
@@ -28,6 +27,7 @@ from indico.modules.api import APIMode, api_settings
 from indico.modules.api.models.keys import APIKey
 from indico.util.signals import make_interceptable
 from indico.web.http_api import HTTPAPIHook
+from indico.web.http_api.cache import APIResultCache
 from indico.web.http_api.metadata.serializer import Serializer
 from indico.web.http_api.responses import HTTPAPIError, HTTPAPIResult, HTTPAPIResultSchema
 from indico.web.http_api.util import get_query_parameter
@@ -36,7 +36,7 @@ from indico.web.http_api.util import get_query_parameter
 # Remove the extension at the end or before the querystring
 RE_REMOVE_EXTENSION = re.compile(r'\.(\w+)(?:$|(?=\?))')
 
-API_CACHE = make_scoped_cache('legacy-http-api')
+API_CACHE = APIResultCache('legacy-http-api')
 
 
 def normalizeQuery(path, query, remove=('signature',), separate=False):
@@ -210,29 +210,29 @@ def handler(prefix, path):
         if onlyAuthed and not user:
             raise HTTPAPIError('Not authenticated', 403)
 
-        addToCache = not hook.NO_CACHE
+        ttl = api_settings.get('cache_ttl')
         cacheKey = RE_REMOVE_EXTENSION.sub('', cacheKey)
-        if not noCache:
-            obj = API_CACHE.get(cacheKey)
-            if obj is not None:
-                result, extra, ts, complete, typeMap = obj
-                addToCache = False
-        if result is None:
+
+        def _export():
+            nonlocal is_response
             g.current_api_user = user
             # Perform the actual exporting
             res = hook(user)
             if isinstance(res, current_app.response_class):
-                addToCache = False
                 is_response = True
-                result, extra, complete, typeMap = res, {}, True, {}
+                return (res, {}, ts, True, {}), False
             elif isinstance(res, tuple) and len(res) == 4:
                 result, extra, complete, typeMap = res
             else:
                 result, extra, complete, typeMap = res, {}, True, {}
-        if result is not None and addToCache:
-            ttl = api_settings.get('cache_ttl')
-            if ttl > 0:
-                API_CACHE.set(cacheKey, (result, extra, ts, complete, typeMap), ttl)
+            return (result, extra, ts, complete, typeMap), result is not None
+
+        if hook.NO_CACHE or ttl <= 0:
+            (result, extra, ts, __, typeMap), __ = _export()
+        else:
+            # concurrent requests for an expired or missing result are collapsed into a single
+            # export, and while a stale result is being refreshed, other requests still get it
+            result, extra, ts, __, typeMap = API_CACHE.get_or_compute(cacheKey, ttl, _export, force=noCache)
     except HTTPAPIError as e:
         error = e
         if e.code:
@@ -242,15 +242,14 @@ def handler(prefix, path):
         raise NotFound
     else:
         if ak and error is None:
-            # Commit only if there was an API key and no error
+            # The key usage is only buffered (see `APIKey.register_used`) and
+            # flushed to the database periodically
             norm_path, norm_query = normalizeQuery(path, query, remove=('signature', 'timestamp'), separate=True)
             uri = '?'.join(_f for _f in (norm_path, norm_query) if _f)
             ak.register_used(request.remote_addr, uri, not onlyPublic)
-            db.session.commit()
-        else:
-            # No need to commit stuff if we didn't use an API key (nothing was written)
-            # XXX do we even need this?
-            db.session.rollback()
+        # No need to commit stuff since nothing was written
+        # XXX do we even need this?
+        db.session.rollback()
 
         # Log successful POST api requests
         if error is None and request.method == 'POST':
@@ -12,6 +12,7 @@ from werkzeug.exceptions import BadRequest, Forbidden
 
 from indico.core.errors import IndicoError
 from indico.core.oauth.protector import IndicoAuthlibHTTPError, IndicoResourceProtector
+from indico.core.oauth.util import invalidate_cached_tokens
 from indico.modules.events.contributions.models.persons import ContributionPersonLink
 from indico.modules.events.models.persons import EventPerson
 from indico.web.flask.util import make_view_func
@@ -475,6 +476,7 @@ def test_get_request_user_complete(dummy_user, app, test_client, dummy_token, du
     dummy_token._scopes.append('read:everything')
     dummy_token.app_user_link.scopes.append('read:everything')
     dummy_token.app_user_link.application.allowed_scopes.append('read:everything')
+    invalidate_cached_tokens([dummy_token])
 
     resp = test_client.get('/test/default', headers=oauth_headers)
     assert resp.status_code == 200
@@ -507,6 +509,7 @@ def test_get_request_user_complete(dummy_user, app, test_client, dummy_token, du
     dummy_token._scopes.append('full:everything')
     dummy_token.app_user_link.scopes.append('full:everything')
     dummy_token.app_user_link.application.allowed_scopes.append('full:everything')
+    invalidate_cached_tokens([dummy_token])
 
     resp = test_client.post('/test/default', headers=oauth_headers)
     assert resp.status_code == 200
@@ -514,6 +517,7 @@ def test_get_request_user_complete(dummy_user, app, test_client, dummy_token, du
 
     # personal token + signature is not allowed
     dummy_personal_token._scopes.append('read:everything')
+    invalidate_cached_tokens([dummy_personal_token])
     resp = test_client.get(signed_url_for_user(dummy_user, 'test_signed'), headers=personal_oauth_headers)
     assert resp.status_code == 400
     assert b'OAuth tokens and signed URLs cannot be mixed' in resp.data